@@ -20,4 +20,5 @@ from . import elements
 from .elements import *
 from .line import Line
 from .interface import AtomicData
+from .cache import CachedAtomicData
 from .rates import *
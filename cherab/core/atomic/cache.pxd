@@ -0,0 +1,96 @@
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+from cherab.core.atomic.interface cimport AtomicData
+from cherab.core.atomic.rates cimport *
+
+
+cdef class _RateCache:
+
+    cdef:
+        readonly int size
+        readonly long long hits, misses
+        int _mask, _arguments, _slot
+        double _log_tolerance
+        bint _clear_on_full
+        long long[:, ::1] _keys
+        double[::1] _values
+        unsigned char[::1] _used
+
+    cpdef clear(self)
+
+    cdef bint quantise(self, double value, long long *key, double *centre)
+
+    cdef bint lookup(self, long long *key, double *value)
+
+    cdef void insert(self, long long *key, double value)
+
+
+cdef class _CachedImpactExcitationRate(ImpactExcitationRate):
+
+    cdef:
+        ImpactExcitationRate _rate
+        _RateCache _cache
+
+
+cdef class _CachedRecombinationRate(RecombinationRate):
+
+    cdef:
+        RecombinationRate _rate
+        _RateCache _cache
+
+
+cdef class _CachedBeamStoppingRate(BeamStoppingRate):
+
+    cdef:
+        BeamStoppingRate _rate
+        _RateCache _cache
+
+
+cdef class _CachedBeamPopulationRate(BeamPopulationRate):
+
+    cdef:
+        BeamPopulationRate _rate
+        _RateCache _cache
+
+
+cdef class _CachedBeamEmissionRate(BeamEmissionRate):
+
+    cdef:
+        BeamEmissionRate _rate
+        _RateCache _cache
+
+
+cdef class _CachedBeamCXRate(BeamCXRate):
+
+    cdef:
+        BeamCXRate _rate
+        _RateCache _cache
+
+
+cdef class CachedAtomicData(AtomicData):
+
+    cdef:
+        readonly AtomicData source
+        readonly double tolerance
+        readonly int size
+        readonly str eviction
+        dict _rates
+        list _caches
+
+    cdef _RateCache _new_cache(self, int arguments)
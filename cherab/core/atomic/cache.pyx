@@ -0,0 +1,465 @@
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+import numpy as np
+from libc.math cimport log, exp, floor
+from cherab.core.atomic.elements cimport Element
+cimport cython
+
+
+# the number of consecutive table slots searched for a key
+DEF PROBE_LENGTH=4
+
+# FNV-1a hash parameters, the prime is 2^40 + 435
+DEF HASH_OFFSET=1469598103934665603
+DEF HASH_PRIME_SHIFT=40
+DEF HASH_PRIME_OFFSET=435
+
+# key of a zero valued argument, log quantised keys never reach this value
+DEF ZERO_KEY=-9223372036854775807
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+@cython.cdivision(True)
+cdef class _RateCache:
+    """
+    Bounded memo table for rate evaluations.
+
+    The rate arguments are quantised in log space, arguments with a relative
+    difference below the tolerance share a key. On a miss the rate is
+    evaluated at the centre of the quantisation cell so the cached values do
+    not depend on the order of the evaluations.
+
+    The table is a hash table with a fixed number of entries. If the slots
+    available for a new key are occupied, the eviction policy 'replace'
+    overwrites the home slot of the key (the first slot probed), 'clear'
+    empties the whole table.
+
+    :param int arguments: The number of rate arguments.
+    :param float tolerance: The relative quantisation tolerance.
+    :param int size: The number of table entries.
+    :param str eviction: The eviction policy, 'replace' or 'clear'.
+    """
+
+    def __init__(self, int arguments, double tolerance, int size, str eviction):
+
+        if tolerance <= 0:
+            raise ValueError('The cache tolerance must be greater than zero.')
+
+        if size < PROBE_LENGTH:
+            raise ValueError('The cache size must be at least {}.'.format(PROBE_LENGTH))
+
+        if eviction not in ('replace', 'clear'):
+            raise ValueError("The cache eviction policy must be one of ['replace', 'clear'].")
+
+        # round size up to a power of two so the slot can be found with a mask
+        self.size = PROBE_LENGTH
+        while self.size < size:
+            self.size <<= 1
+        self._mask = self.size - 1
+        self._arguments = arguments
+        self._log_tolerance = log(1 + tolerance)
+        self._clear_on_full = eviction == 'clear'
+
+        self._keys = np.empty((self.size, arguments), dtype=np.int64)
+        self._values = np.empty(self.size)
+        self._used = np.zeros(self.size, dtype=np.uint8)
+        self._slot = -1
+
+        self.hits = 0
+        self.misses = 0
+
+    cpdef clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+
+        self._used[:] = 0
+        self.hits = 0
+        self.misses = 0
+
+    cdef bint quantise(self, double value, long long *key, double *centre):
+        """
+        Calculates the key and the cell centre of an argument.
+
+        Returns False if the argument can not be quantised, in which case
+        the rate must be evaluated directly.
+        """
+
+        cdef long long index
+
+        if value > 0:
+            index = <long long> floor(log(value) / self._log_tolerance + 0.5)
+            key[0] = index
+            centre[0] = exp(index * self._log_tolerance)
+            return True
+
+        if value == 0:
+            key[0] = ZERO_KEY
+            centre[0] = 0
+            return True
+
+        return False
+
+    cdef bint lookup(self, long long *key, double *value):
+        """
+        Searches the table for a key.
+
+        Returns True and sets the value if the key is found. Otherwise the
+        slot for the key is reserved for the following call to insert().
+        """
+
+        cdef:
+            unsigned long long hash = HASH_OFFSET
+            unsigned long long prime = (<unsigned long long> 1 << HASH_PRIME_SHIFT) + HASH_PRIME_OFFSET
+            int i, j, slot
+            bint match
+
+        for j in range(self._arguments):
+            hash = (hash ^ <unsigned long long> key[j]) * prime
+        hash ^= hash >> 29
+
+        self._slot = -1
+        for i in range(PROBE_LENGTH):
+
+            slot = (hash + i) & self._mask
+            if not self._used[slot]:
+                self._slot = slot
+                break
+
+            match = True
+            for j in range(self._arguments):
+                if self._keys[slot, j] != key[j]:
+                    match = False
+                    break
+
+            if match:
+                self.hits += 1
+                value[0] = self._values[slot]
+                return True
+
+        # no free slot, evict
+        if self._slot == -1:
+            self._slot = hash & self._mask
+            if self._clear_on_full:
+                self._used[:] = 0
+
+        self.misses += 1
+        return False
+
+    cdef void insert(self, long long *key, double value):
+        """
+        Stores a value in the slot reserved by the last call to lookup().
+        """
+
+        cdef int j
+
+        for j in range(self._arguments):
+            self._keys[self._slot, j] = key[j]
+        self._values[self._slot] = value
+        self._used[self._slot] = 1
+
+
+cdef inline double _evaluate_pec(_RateCache cache, _PECRate rate, double density, double temperature) except? -1e999:
+
+    cdef:
+        long long key[2]
+        double centre[2]
+        double value
+
+    if not (cache.quantise(density, &key[0], &centre[0]) and cache.quantise(temperature, &key[1], &centre[1])):
+        cache.misses += 1
+        return rate.evaluate(density, temperature)
+
+    if cache.lookup(key, &value):
+        return value
+
+    value = rate.evaluate(centre[0], centre[1])
+    cache.insert(key, value)
+    return value
+
+
+cdef inline double _evaluate_beam(_RateCache cache, _BeamRate rate, double energy, double density, double temperature) except? -1e999:
+
+    cdef:
+        long long key[3]
+        double centre[3]
+        double value
+
+    if not (cache.quantise(energy, &key[0], &centre[0]) and cache.quantise(density, &key[1], &centre[1])
+            and cache.quantise(temperature, &key[2], &centre[2])):
+        cache.misses += 1
+        return rate.evaluate(energy, density, temperature)
+
+    if cache.lookup(key, &value):
+        return value
+
+    value = rate.evaluate(centre[0], centre[1], centre[2])
+    cache.insert(key, value)
+    return value
+
+
+cdef class _CachedImpactExcitationRate(ImpactExcitationRate):
+
+    def __init__(self, ImpactExcitationRate rate, _RateCache cache):
+        self._rate = rate
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._rate, name)
+
+    cpdef double evaluate(self, double density, double temperature) except? -1e999:
+        return _evaluate_pec(self._cache, self._rate, density, temperature)
+
+
+cdef class _CachedRecombinationRate(RecombinationRate):
+
+    def __init__(self, RecombinationRate rate, _RateCache cache):
+        self._rate = rate
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._rate, name)
+
+    cpdef double evaluate(self, double density, double temperature) except? -1e999:
+        return _evaluate_pec(self._cache, self._rate, density, temperature)
+
+
+cdef class _CachedBeamStoppingRate(BeamStoppingRate):
+
+    def __init__(self, BeamStoppingRate rate, _RateCache cache):
+        self._rate = rate
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._rate, name)
+
+    cpdef double evaluate(self, double energy, double density, double temperature) except? -1e999:
+        return _evaluate_beam(self._cache, self._rate, energy, density, temperature)
+
+
+cdef class _CachedBeamPopulationRate(BeamPopulationRate):
+
+    def __init__(self, BeamPopulationRate rate, _RateCache cache):
+        self._rate = rate
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._rate, name)
+
+    cpdef double evaluate(self, double energy, double density, double temperature) except? -1e999:
+        return _evaluate_beam(self._cache, self._rate, energy, density, temperature)
+
+
+cdef class _CachedBeamEmissionRate(BeamEmissionRate):
+
+    def __init__(self, BeamEmissionRate rate, _RateCache cache):
+        self._rate = rate
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._rate, name)
+
+    cpdef double evaluate(self, double energy, double density, double temperature) except? -1e999:
+        return _evaluate_beam(self._cache, self._rate, energy, density, temperature)
+
+
+cdef class _CachedBeamCXRate(BeamCXRate):
+
+    def __init__(self, BeamCXRate rate, _RateCache cache):
+        self._rate = rate
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._rate, name)
+
+    cpdef double evaluate(self, double energy, double temperature, double density, double z_effective, double b_field) except? -1e999:
+
+        cdef:
+            long long key[5]
+            double centre[5]
+            double value
+            _RateCache cache = self._cache
+
+        if not (cache.quantise(energy, &key[0], &centre[0]) and cache.quantise(temperature, &key[1], &centre[1])
+                and cache.quantise(density, &key[2], &centre[2]) and cache.quantise(z_effective, &key[3], &centre[3])
+                and cache.quantise(b_field, &key[4], &centre[4])):
+            cache.misses += 1
+            return self._rate.evaluate(energy, temperature, density, z_effective, b_field)
+
+        if cache.lookup(key, &value):
+            return value
+
+        value = self._rate.evaluate(centre[0], centre[1], centre[2], centre[3], centre[4])
+        cache.insert(key, value)
+        return value
+
+
+cdef class CachedAtomicData(AtomicData):
+    """
+    Memoises the rates of an atomic data source.
+
+    The rate objects returned by the source are wrapped so repeated
+    evaluations at similar plasma conditions, e.g. neighbouring samples
+    along a ray, are served from a memo table instead of interpolating
+    the atomic data. Photon emissivity, beam and beam charge exchange
+    rates are memoised, all other requests are passed to the source.
+
+    The rate arguments are quantised in log space: arguments with a relative
+    difference below the tolerance share a table entry, and the rate is
+    evaluated at the centre of the quantisation cell. The rates returned are
+    therefore an approximation, with a relative argument error of at most
+    half the tolerance. Each rate has a table with a fixed number of
+    entries; when the table is full, the 'replace' eviction policy overwrites
+    old entries and the 'clear' policy empties the table.
+
+    .. code-block:: pycon
+
+       >>> from cherab.core.atomic import CachedAtomicData
+       >>> from cherab.openadas import OpenADAS
+       >>>
+       >>> atomic_data = CachedAtomicData(OpenADAS(), tolerance=1e-3)
+       >>> ...
+       >>> atomic_data.hits, atomic_data.misses
+
+    :param AtomicData source: The atomic data source.
+    :param float tolerance: The relative quantisation tolerance of the rate arguments (default=1e-3).
+    :param int size: The number of table entries for each rate (default=65536).
+    :param str eviction: The eviction policy, 'replace' or 'clear' (default='replace').
+    """
+
+    def __init__(self, AtomicData source not None, double tolerance=1e-3, int size=65536, str eviction='replace'):
+
+        # validate the cache configuration
+        _RateCache(1, tolerance, size, eviction)
+
+        self.source = source
+        self.tolerance = tolerance
+        self.size = size
+        self.eviction = eviction
+
+        # rates are shared between requests for the same data
+        self._rates = {}
+        self._caches = []
+
+    @property
+    def hits(self):
+        """
+        The number of rate evaluations served from the memo tables.
+        """
+        return sum(cache.hits for cache in self._caches)
+
+    @property
+    def misses(self):
+        """
+        The number of rate evaluations passed to the atomic data source.
+        """
+        return sum(cache.misses for cache in self._caches)
+
+    def clear_cache(self):
+        """
+        Empties the memo tables and resets the hit and miss counters.
+        """
+
+        cdef _RateCache cache
+
+        for cache in self._caches:
+            cache.clear()
+
+    cdef _RateCache _new_cache(self, int arguments):
+
+        cdef _RateCache cache
+
+        cache = _RateCache(arguments, self.tolerance, self.size, self.eviction)
+        self._caches.append(cache)
+        return cache
+
+    cpdef double wavelength(self, Element ion, int ionisation, tuple transition):
+        return self.source.wavelength(ion, ionisation, transition)
+
+    cpdef list beam_cx_rate(self, Element donor_ion, Element receiver_ion, int receiver_ionisation, tuple transition):
+
+        key = ('beam_cx', donor_ion, receiver_ion, receiver_ionisation, transition)
+        try:
+            return list(self._rates[key])
+        except KeyError:
+            rates = [_CachedBeamCXRate(rate, self._new_cache(5))
+                     for rate in self.source.beam_cx_rate(donor_ion, receiver_ion, receiver_ionisation, transition)]
+            self._rates[key] = rates
+            return list(rates)
+
+    cpdef BeamStoppingRate beam_stopping_rate(self, Element beam_ion, Element plasma_ion, int ionisation):
+
+        key = ('beam_stopping', beam_ion, plasma_ion, ionisation)
+        try:
+            return self._rates[key]
+        except KeyError:
+            rate = _CachedBeamStoppingRate(self.source.beam_stopping_rate(beam_ion, plasma_ion, ionisation), self._new_cache(3))
+            self._rates[key] = rate
+            return rate
+
+    cpdef BeamPopulationRate beam_population_rate(self, Element beam_ion, int metastable, Element plasma_ion, int ionisation):
+
+        key = ('beam_population', beam_ion, metastable, plasma_ion, ionisation)
+        try:
+            return self._rates[key]
+        except KeyError:
+            rate = _CachedBeamPopulationRate(self.source.beam_population_rate(beam_ion, metastable, plasma_ion, ionisation), self._new_cache(3))
+            self._rates[key] = rate
+            return rate
+
+    cpdef BeamEmissionRate beam_emission_rate(self, Element beam_ion, Element plasma_ion, int ionisation, tuple transition):
+
+        key = ('beam_emission', beam_ion, plasma_ion, ionisation, transition)
+        try:
+            return self._rates[key]
+        except KeyError:
+            rate = _CachedBeamEmissionRate(self.source.beam_emission_rate(beam_ion, plasma_ion, ionisation, transition), self._new_cache(3))
+            self._rates[key] = rate
+            return rate
+
+    cpdef ImpactExcitationRate impact_excitation_rate(self, Element ion, int ionisation, tuple transition):
+
+        key = ('impact_excitation', ion, ionisation, transition)
+        try:
+            return self._rates[key]
+        except KeyError:
+            rate = _CachedImpactExcitationRate(self.source.impact_excitation_rate(ion, ionisation, transition), self._new_cache(2))
+            self._rates[key] = rate
+            return rate
+
+    cpdef RecombinationRate recombination_rate(self, Element ion, int ionisation, tuple transition):
+
+        key = ('recombination', ion, ionisation, transition)
+        try:
+            return self._rates[key]
+        except KeyError:
+            rate = _CachedRecombinationRate(self.source.recombination_rate(ion, ionisation, transition), self._new_cache(2))
+            self._rates[key] = rate
+            return rate
+
+    cpdef RadiatedPower radiated_power_rate(self, Element element, str radiation_type):
+        return self.source.radiated_power_rate(element, radiation_type)
+
+    cpdef StageResolvedLineRadiation stage_resolved_line_radiation_rate(self, Element ion, int ionisation):
+        return self.source.stage_resolved_line_radiation_rate(ion, ionisation)
+
+    cpdef FractionalAbundance fractional_abundance(self, Element ion, int ionisation):
+        return self.source.fractional_abundance(ion, ionisation)
@@ -16,12 +16,15 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from numpy cimport ndarray
 from cherab.core.atomic.elements cimport Element
 
 
 cdef class _PECRate:
     cpdef double evaluate(self, double density, double temperature) except? -1e999
 
+    cpdef ndarray evaluate_array(self, object density, object temperature)
+
 
 cdef class ImpactExcitationRate(_PECRate):
     pass
@@ -38,10 +41,14 @@ cdef class ThermalCXRate(_PECRate):
 cdef class BeamCXRate:
     cpdef double evaluate(self, double energy, double temperature, double density, double z_effective, double b_field) except? -1e999
 
+    cpdef ndarray evaluate_array(self, object energy, object temperature, object density, object z_effective, object b_field)
+
 
 cdef class _BeamRate:
     cpdef double evaluate(self, double energy, double density, double temperature) except? -1e999
 
+    cpdef ndarray evaluate_array(self, object energy, object density, object temperature)
+
 
 cdef class BeamStoppingRate(_BeamRate):
     pass
@@ -64,6 +71,8 @@ cdef class RadiatedPower:
 
     cdef double evaluate(self, double electron_density, double electron_temperature) except? -1e999
 
+    cpdef ndarray evaluate_array(self, object electron_density, object electron_temperature)
+
 
 cdef class StageResolvedLineRadiation:
 
@@ -74,6 +83,8 @@ cdef class StageResolvedLineRadiation:
 
     cdef double evaluate(self, double electron_density, double electron_temperature) except? -1e999
 
+    cpdef ndarray evaluate_array(self, object electron_density, object electron_temperature)
+
 
 cdef class FractionalAbundance:
 
@@ -83,3 +94,5 @@ cdef class FractionalAbundance:
         public str name
 
     cdef double evaluate(self, double electron_density, double electron_temperature) except? -1e999
+
+    cpdef ndarray evaluate_array(self, object electron_density, object electron_temperature)
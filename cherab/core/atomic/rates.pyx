@@ -17,7 +17,38 @@
 # under the Licence.
 
 import numpy as np
+from numpy cimport ndarray
 import matplotlib.pyplot as plt
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef ndarray _evaluate_array(object evaluate, tuple arguments):
+    """
+    Calls a scalar evaluate() for each element of the broadcast arguments.
+
+    :param evaluate: The scalar evaluate method of a rate, or the rate itself.
+    :param arguments: Tuple of scalars or arrays, broadcast against each other.
+    :return: Array of rates with the broadcast shape.
+    """
+
+    cdef:
+        int i
+        ndarray result
+        double[::1] r_view
+
+    arguments = tuple(np.broadcast_arrays(*[np.asarray(argument, dtype=np.float64) for argument in arguments]))
+    shape = arguments[0].shape
+    points = np.stack(arguments, axis=-1).reshape(-1, len(arguments)).tolist()
+
+    result = np.empty(len(points))
+    r_view = result
+
+    for i in range(len(points)):
+        r_view[i] = evaluate(*points[i])
+
+    return result.reshape(shape)
 
 
 cdef class _PECRate:
@@ -38,10 +69,25 @@ cdef class _PECRate:
     def __call__(self, double density, double temperature):
         return self.evaluate(density, temperature)
 
+    cpdef ndarray evaluate_array(self, object density, object temperature):
+        """
+        Returns the rates for arrays of parameters.
+
+        The arguments are broadcast against each other. Sub-classes may
+        override this method with a faster implementation, by default
+        evaluate() is called for each element.
+
+        :param density: Array of receiver ion densities in m^-3.
+        :param temperature: Array of receiver ion temperatures in eV.
+        :return: Array of rates.
+        """
+
+        return _evaluate_array(self.evaluate, (density, temperature))
+
     def plot_temperature(self, temp_low=1, temp_high=1000, num_points=100, dens=1E19):
 
-        temp = [10**x for x in np.linspace(np.log10(temp_low), np.log10(temp_high), num=num_points)]
-        rates = [self.evaluate(dens, te) for te in temp]
+        temp = np.logspace(np.log10(temp_low), np.log10(temp_high), num=num_points)
+        rates = self.evaluate_array(dens, temp)
         plt.semilogx(temp, rates, '.-')
         plt.xlabel("Temperature (eV)")
         plt.ylabel("PEC")
@@ -89,6 +135,24 @@ cdef class BeamCXRate:
     def __call__(self, double energy, double temperature, double density, double z_effective, double b_field):
         return self.evaluate(energy, temperature, density, z_effective, b_field)
 
+    cpdef ndarray evaluate_array(self, object energy, object temperature, object density, object z_effective, object b_field):
+        """
+        Returns the rates for arrays of parameters.
+
+        The arguments are broadcast against each other. Sub-classes may
+        override this method with a faster implementation, by default
+        evaluate() is called for each element.
+
+        :param energy: Array of interaction energies in eV/amu.
+        :param temperature: Array of receiver ion temperatures in eV.
+        :param density: Array of receiver ion densities in m^-3
+        :param z_effective: Array of plasma Z-effective.
+        :param b_field: Array of magnetic field magnitudes in Tesla.
+        :return: Array of effective rates.
+        """
+
+        return _evaluate_array(self.evaluate, (energy, temperature, density, z_effective, b_field))
+
 
 cdef class _BeamRate:
     """
@@ -109,6 +173,22 @@ cdef class _BeamRate:
     def __call__(self, double energy, double density, double temperature):
         return self.evaluate(energy, density, temperature)
 
+    cpdef ndarray evaluate_array(self, object energy, object density, object temperature):
+        """
+        Returns the beam coefficients for arrays of parameters.
+
+        The arguments are broadcast against each other. Sub-classes may
+        override this method with a faster implementation, by default
+        evaluate() is called for each element.
+
+        :param energy: Array of interaction energies in eV/amu.
+        :param density: Array of target electron densities in m^-3
+        :param temperature: Array of target temperatures in eV.
+        :return: Array of beam coefficients.
+        """
+
+        return _evaluate_array(self.evaluate, (energy, density, temperature))
+
 
 cdef class BeamStoppingRate(_BeamRate):
     """
@@ -173,10 +253,26 @@ cdef class RadiatedPower:
         """
         return self.evaluate(electron_density, electron_temperature)
 
+    cpdef ndarray evaluate_array(self, object electron_density, object electron_temperature):
+        """
+        Returns the radiated power for arrays of parameters.
+
+        The arguments are broadcast against each other. Sub-classes may
+        override this method with a faster implementation, by default
+        the rate is called for each element.
+
+        :param electron_density: Array of electron densities in m^-3.
+        :param electron_temperature: Array of electron temperatures in eV.
+        :return: Array of radiated powers.
+        """
+
+        # evaluate() is a C method, it is reached through __call__()
+        return _evaluate_array(self, (electron_density, electron_temperature))
+
     def plot_temperature(self, temp_low=1, temp_high=1000, num_points=100, dens=1E19, species_dens=1E19):
 
-        temp = [10**x for x in np.linspace(np.log10(temp_low), np.log10(temp_high), num=num_points)]
-        radiation = [self.evaluate(dens, te) * species_dens for te in temp]
+        temp = np.logspace(np.log10(temp_low), np.log10(temp_high), num=num_points)
+        radiation = self.evaluate_array(dens, temp) * species_dens
         plt.loglog(temp, radiation, '.-', label='{} - {}'.format(self.element.symbol, self.radiation_type))
 
 
@@ -216,10 +312,26 @@ cdef class StageResolvedLineRadiation:
         """
         return self.evaluate(electron_density, electron_temperature)
 
+    cpdef ndarray evaluate_array(self, object electron_density, object electron_temperature):
+        """
+        Returns the radiated power for arrays of parameters.
+
+        The arguments are broadcast against each other. Sub-classes may
+        override this method with a faster implementation, by default
+        the rate is called for each element.
+
+        :param electron_density: Array of electron densities in m^-3.
+        :param electron_temperature: Array of electron temperatures in eV.
+        :return: Array of radiated powers.
+        """
+
+        # evaluate() is a C method, it is reached through __call__()
+        return _evaluate_array(self, (electron_density, electron_temperature))
+
     def plot_temperature(self, temp_low=1, temp_high=1000, num_points=100, dens=1E19, species_dens=1E19):
 
-        temp = [10**x for x in np.linspace(np.log10(temp_low), np.log10(temp_high), num=num_points)]
-        radiation = [self.evaluate(dens, te) * species_dens for te in temp]
+        temp = np.logspace(np.log10(temp_low), np.log10(temp_high), num=num_points)
+        radiation = self.evaluate_array(dens, temp) * species_dens
         plt.loglog(temp, radiation, '.-', label='{}{}'.format(self.element.symbol, self.ionisation))
 
 
@@ -259,8 +371,24 @@ cdef class FractionalAbundance:
         """
         return self.evaluate(electron_density, electron_temperature)
 
+    cpdef ndarray evaluate_array(self, object electron_density, object electron_temperature):
+        """
+        Returns the fractional abundance for arrays of parameters.
+
+        The arguments are broadcast against each other. Sub-classes may
+        override this method with a faster implementation, by default
+        the rate is called for each element.
+
+        :param electron_density: Array of electron densities in m^-3.
+        :param electron_temperature: Array of electron temperatures in eV.
+        :return: Array of fractional abundances.
+        """
+
+        # evaluate() is a C method, it is reached through __call__()
+        return _evaluate_array(self, (electron_density, electron_temperature))
+
     def plot_temperature(self, temp_low=1, temp_high=1000, num_points=100, dens=1E19):
 
-        temp = [10**x for x in np.linspace(np.log10(temp_low), np.log10(temp_high), num=num_points)]
-        abundances = [self.evaluate(dens, te) for te in temp]
+        temp = np.logspace(np.log10(temp_low), np.log10(temp_high), num=num_points)
+        abundances = self.evaluate_array(dens, temp)
         plt.semilogx(temp, abundances, '.-', label='{}{}'.format(self.element.symbol, self.ionisation))
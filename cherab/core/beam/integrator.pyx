@@ -0,0 +1,257 @@
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+from raysect.optical cimport World, Primitive, Ray, Spectrum, Point3D, Vector3D, AffineMatrix3D, new_point3d
+from raysect.optical.material.emitter.inhomogeneous cimport InhomogeneousVolumeEmitter
+from cherab.core.beam.node cimport Beam
+from cherab.core.beam.model cimport BeamAttenuator
+from cherab.core.beam.material cimport BeamMaterial
+from cherab.core.utility.constants cimport DEGREES_TO_RADIANS
+from libc.math cimport sqrt, tan, log, fabs
+cimport cython
+
+
+cdef class BeamIntegrator(VolumeIntegrator):
+    """
+    A beam aligned adaptive trapezium integrator for beam emission.
+
+    The fixed step NumericalIntegrator spends most of its samples in regions
+    of the beam bounding geometry where the beam density is negligible. This
+    integrator uses the Gaussian beam envelope and the attenuation profile
+    along the beam axis to place the samples:
+
+    * Inside the envelope the step is chosen so that the normalised beam
+      radius (the radius in units of the local beam standard deviation) does
+      not change by more than resolution between two samples. Rays crossing
+      the beam are therefore sampled every fraction of the beam width.
+    * Along the beam, the step is chosen so that the logarithm of the
+      attenuation profile does not change by more than attenuation_resolution
+      between two samples. The attenuation profile is the linear beam density
+      along the axis, obtained from the beam attenuator.
+    * The step never exceeds max_step, to resolve the variations of the
+      plasma the emission depends on.
+    * Outside the envelope, or where the beam is fully attenuated, the
+      emission function is not called. Outside the envelope the integrator
+      jumps directly to the next point where the ray could enter it.
+
+    The envelope radius is envelope_sigma beam standard deviations, reduced to
+    the attenuator clamp radius if the beam attenuator clamps the density to
+    zero.
+
+    This integrator can only be used with beam materials, i.e. it must be
+    supplied as the integrator of a Beam object.
+
+    :param float resolution: The maximum change of the normalised beam radius
+      between two samples (default=0.25).
+    :param float max_step: The maximum step size in metres (default=0.01).
+    :param float envelope_sigma: The beam envelope radius in beam standard
+      deviations (default=5.0).
+    :param float attenuation_resolution: The maximum change of the logarithm
+      of the attenuation profile between two samples (default=0.05).
+    """
+
+    def __init__(self, double resolution=0.25, double max_step=0.01, double envelope_sigma=5.0,
+                 double attenuation_resolution=0.05):
+        self.resolution = resolution
+        self.max_step = max_step
+        self.envelope_sigma = envelope_sigma
+        self.attenuation_resolution = attenuation_resolution
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @resolution.setter
+    def resolution(self, double value):
+        if value <= 0:
+            raise ValueError("The integration resolution must be greater than zero.")
+        self._resolution = value
+
+    @property
+    def max_step(self):
+        return self._max_step
+
+    @max_step.setter
+    def max_step(self, double value):
+        if value <= 0:
+            raise ValueError("The maximum step size must be greater than zero.")
+        self._max_step = value
+
+    @property
+    def envelope_sigma(self):
+        return self._envelope_sigma
+
+    @envelope_sigma.setter
+    def envelope_sigma(self, double value):
+        if value <= 0:
+            raise ValueError("The envelope radius must be greater than zero.")
+        self._envelope_sigma = value
+
+    @property
+    def attenuation_resolution(self):
+        return self._attenuation_resolution
+
+    @attenuation_resolution.setter
+    def attenuation_resolution(self, double value):
+        if value <= 0:
+            raise ValueError("The attenuation resolution must be greater than zero.")
+        self._attenuation_resolution = value
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cpdef Spectrum integrate(self, Spectrum spectrum, World world, Ray ray, Primitive primitive,
+                             InhomogeneousVolumeEmitter material, Point3D start_point, Point3D end_point,
+                             AffineMatrix3D world_to_primitive, AffineMatrix3D primitive_to_world):
+
+        cdef:
+            Beam beam
+            BeamAttenuator attenuator
+            Point3D start, end
+            Vector3D integration_direction, ray_direction
+            Spectrum emission, emission_previous, temp
+            double length, t, t_previous, step, c
+            double sigma, tan_x, tan_y, tan_max, sigma_x, sigma_y, sigma_min, envelope, envelope_sqr
+            double x, y, z, axis_z, radius_sqr, radius, beam_length
+            double attenuation, attenuation_previous, gradient, transverse, radius_rate
+            bint inside, inside_previous
+            int index
+
+        if not isinstance(material, BeamMaterial):
+            raise TypeError("The BeamIntegrator can only be used with beam materials.")
+        beam = (<BeamMaterial> material)._beam
+
+        # convert start and end points to local space, the beam geometry shares the beam coordinate space
+        start = start_point.transform(world_to_primitive)
+        end = end_point.transform(world_to_primitive)
+
+        # obtain local space ray direction and integration length
+        integration_direction = start.vector_to(end)
+        length = integration_direction.get_length()
+
+        # nothing to contribute?
+        if length == 0.0:
+            return spectrum
+
+        integration_direction = integration_direction.normalise()
+        ray_direction = integration_direction.neg()
+        transverse = sqrt(integration_direction.x * integration_direction.x + integration_direction.y * integration_direction.y)
+
+        # beam envelope
+        sigma = beam.get_sigma()
+        tan_x = tan(DEGREES_TO_RADIANS * beam.get_divergence_x())
+        tan_y = tan(DEGREES_TO_RADIANS * beam.get_divergence_y())
+        tan_max = max(tan_x, tan_y)
+
+        attenuator = beam._attenuator
+        envelope = min(self._envelope_sigma, attenuator.clamp_radius())
+        envelope_sqr = envelope * envelope
+        beam_length = beam.get_length()
+
+        # create working buffers
+        emission = ray.new_spectrum()
+        emission_previous = ray.new_spectrum()
+
+        t = 0
+        t_previous = 0
+        attenuation = 0
+        attenuation_previous = 0
+        inside_previous = False
+        while True:
+
+            # calculate location of new sample point
+            x = start.x + t * integration_direction.x
+            y = start.y + t * integration_direction.y
+            z = start.z + t * integration_direction.z
+
+            # normalised radius of the sample point
+            sigma_x = sigma + z * tan_x
+            sigma_y = sigma + z * tan_y
+            sigma_min = min(sigma_x, sigma_y)
+            radius_sqr = (x / sigma_x) * (x / sigma_x) + (y / sigma_y) * (y / sigma_y)
+
+            # the attenuation profile is the axis density weighted by the beam cross-section, the emission is
+            # zero wherever the beam is fully attenuated
+            inside = radius_sqr < envelope_sqr
+            if inside:
+                axis_z = min(max(z, 0.0), beam_length)
+                attenuation = attenuator.density(0.0, 0.0, axis_z) * (sigma + axis_z * tan_x) * (sigma + axis_z * tan_y)
+                inside = attenuation > 0
+
+            # sample point and sanity check as bounds checking is disabled
+            if inside:
+                emission = material.emission_function(new_point3d(x, y, z), ray_direction, emission, world, ray, primitive, world_to_primitive, primitive_to_world)
+                self._check_dimensions(emission, spectrum.bins)
+
+            # trapezium rule integration, the emission outside the envelope is zero
+            c = 0.5 * (t - t_previous)
+            if inside and inside_previous:
+                for index in range(spectrum.bins):
+                    spectrum.samples_mv[index] += c * (emission.samples_mv[index] + emission_previous.samples_mv[index])
+            elif inside:
+                for index in range(spectrum.bins):
+                    spectrum.samples_mv[index] += c * emission.samples_mv[index]
+            elif inside_previous:
+                for index in range(spectrum.bins):
+                    spectrum.samples_mv[index] += c * emission_previous.samples_mv[index]
+
+            if t >= length:
+                break
+
+            # swap buffers and clear the active buffer
+            temp = emission_previous
+            emission_previous = emission
+            emission = temp
+            emission.clear()
+
+            # choose the next step, the normalised radius changes by at most (1 + radius * tan_max) / sigma_min
+            # per metre travelled, or by (transverse + radius * tan_max * |direction.z|) / sigma_min along the ray
+            radius = sqrt(radius_sqr)
+            if inside:
+                step = self._max_step
+
+                # resolve the beam profile across the ray
+                radius_rate = (transverse + radius * tan_max * fabs(integration_direction.z)) / sigma_min
+                if radius_rate > 0:
+                    step = min(step, self._resolution / radius_rate)
+
+                # resolve the attenuation profile, its logarithmic gradient is estimated from the last step,
+                # the first step in the envelope is a fraction of the beam width until the gradient is known
+                if inside_previous:
+                    gradient = fabs(log(attenuation / attenuation_previous)) / (t - t_previous)
+                    if gradient > 0:
+                        step = min(step, self._attenuation_resolution / gradient)
+                else:
+                    step = min(step, self._resolution * sigma_min)
+
+            else:
+                # outside the envelope jump to the nearest point the ray could re-enter it, a safety factor allows
+                # for the beam narrowing towards the source
+                step = max(self._resolution * sigma_min, 0.9 * (radius - envelope) * sigma_min / (1 + radius * tan_max))
+
+            inside_previous = inside
+            attenuation_previous = attenuation
+            t_previous = t
+            t = min(t + step, length)
+
+        return spectrum
+
+    cdef int _check_dimensions(self, Spectrum spectrum, int bins) except -1:
+        if spectrum.samples.ndim != 1 or spectrum.samples.shape[0] != bins:
+            raise ValueError("Spectrum returned by emission function has the wrong number of samples.")
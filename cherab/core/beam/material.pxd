@@ -16,6 +16,7 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from raysect.optical cimport AffineMatrix3D, Vector3D, Spectrum
 from raysect.optical.material.emitter cimport InhomogeneousVolumeEmitter
 
 from cherab.core.plasma cimport Plasma
@@ -29,5 +30,14 @@ cdef class BeamMaterial(InhomogeneousVolumeEmitter):
         Beam _beam
         Plasma _plasma
         AtomicData _atomic_data
-        list _models
+        list _models, _active_models
+        double _band_min_wavelength, _band_max_wavelength
+        AffineMatrix3D _beam_to_plasma
+        Vector3D _plasma_beam_axis, _plasma_beam_direction
+
+    cdef object __weakref__
+
+    cdef int _select_models(self, Spectrum spectrum) except -1
+
+    cdef int _cache_transforms(self) except -1
 
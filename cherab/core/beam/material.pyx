@@ -46,6 +46,19 @@ cdef class BeamMaterial(InhomogeneousVolumeEmitter):
 
         self._models = models
 
+        # models outside the observed spectral band are skipped, the selection must be
+        # rebuilt if a model is modified
+        self._active_models = None
+        for model in models:
+            model.notifier.add(self._change)
+
+        # beam to plasma transform is cached, it must be rebuilt if the beam or plasma is modified
+        self._beam_to_plasma = None
+        self._plasma_beam_axis = None
+        self._plasma_beam_direction = None
+        self._beam.notifier.add(self._change)
+        self._plasma.notifier.add(self._change)
+
     cpdef Spectrum emission_function(self, Point3D point, Vector3D direction, Spectrum spectrum,
                                      World world, Ray ray, Primitive primitive,
                                      AffineMatrix3D to_local, AffineMatrix3D to_world):
@@ -55,19 +68,62 @@ cdef class BeamMaterial(InhomogeneousVolumeEmitter):
             Point3D plasma_point
             Vector3D beam_direction, observation_direction
 
-        beam_direction = self._beam.direction(point.x, point.y, point.z)
+        # skip models that can not emit in the spectral range
+        if (self._active_models is None or spectrum.min_wavelength != self._band_min_wavelength
+                or spectrum.max_wavelength != self._band_max_wavelength):
+            self._select_models(spectrum)
+
+        if not self._active_models:
+            return spectrum
+
+        if self._beam_to_plasma is None:
+            self._cache_transforms()
 
         # transform points and directions
-        # todo: cache this transform and rebuild if beam or plasma notifies
-        beam_to_plasma = self._beam.to(self._plasma)
-        plasma_point = point.transform(beam_to_plasma)
-        beam_direction = beam_direction.transform(beam_to_plasma)
-        observation_direction = direction.transform(beam_to_plasma)
+        plasma_point = point.transform(self._beam_to_plasma)
+        observation_direction = direction.transform(self._beam_to_plasma)
+
+        # the beam direction is constant in front of the beam source (see Beam.direction())
+        if point.z <= 0:
+            beam_direction = self._plasma_beam_axis
+        else:
+            beam_direction = self._plasma_beam_direction
 
         # call each model and accumulate spectrum
-        for model in self._models:
+        for model in self._active_models:
             spectrum = model.emission(point, plasma_point, beam_direction, observation_direction, spectrum)
 
         return spectrum
 
+    cdef int _select_models(self, Spectrum spectrum) except -1:
+        """
+        Selects the models that may emit in the band of the spectrum.
+
+        The selection is cached until the spectral range changes.
+        """
+
+        cdef BeamModel model
+
+        self._active_models = []
+        for model in self._models:
+            if model.in_band(spectrum.min_wavelength, spectrum.max_wavelength):
+                self._active_models.append(model)
+
+        self._band_min_wavelength = spectrum.min_wavelength
+        self._band_max_wavelength = spectrum.max_wavelength
+        return 0
+
+    cdef int _cache_transforms(self) except -1:
+
+        self._beam_to_plasma = self._beam.to(self._plasma)
+        self._plasma_beam_axis = self._beam.direction(0, 0, 0).transform(self._beam_to_plasma)
+        self._plasma_beam_direction = self._beam.direction(0, 0, 1).transform(self._beam_to_plasma)
+        return 0
+
+    def _change(self):
 
+        # clear cached transforms and model selection to force regeneration on next use
+        self._beam_to_plasma = None
+        self._plasma_beam_axis = None
+        self._plasma_beam_direction = None
+        self._active_models = None
@@ -26,6 +26,7 @@ from cherab.core.atomic cimport AtomicData
 cdef class BeamModel:
 
     cdef:
+        readonly object notifier
         Plasma _plasma
         Beam _beam
         AtomicData _atomic_data
@@ -34,6 +35,8 @@ cdef class BeamModel:
 
     cpdef Spectrum emission(self, Point3D beam_point, Point3D plasma_point, Vector3D beam_direction, Vector3D observation_direction, Spectrum spectrum)
 
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength)
+
 
 cdef class BeamAttenuator:
 
@@ -45,4 +48,6 @@ cdef class BeamAttenuator:
 
     cdef object __weakref__
 
-    cpdef double density(self, double x, double y, double z) except? -1e999
\ No newline at end of file
+    cpdef double density(self, double x, double y, double z) except? -1e999
+
+    cpdef double clamp_radius(self)
\ No newline at end of file
@@ -18,11 +18,16 @@
 
 from cherab.core.utility import Notifier
 
+from libc.math cimport INFINITY
+
 
 cdef class BeamModel:
 
     def __init__(self, Beam beam=None, Plasma plasma=None, AtomicData atomic_data=None):
 
+        # must notify the beam material if the model properties change, affecting the spectral band
+        self.notifier = Notifier()
+
         self._beam = beam
         self._plasma = plasma
         self._atomic_data = atomic_data
@@ -52,6 +57,7 @@ cdef class BeamModel:
 
         # inform model source data has changed
         self._change()
+        self.notifier.notify()
 
     @property
     def beam(self):
@@ -70,6 +76,7 @@ cdef class BeamModel:
 
         # inform model source data has changed
         self._change()
+        self.notifier.notify()
 
     @property
     def atomic_data(self):
@@ -82,6 +89,7 @@ cdef class BeamModel:
 
         # inform model source data has changed
         self._change()
+        self.notifier.notify()
 
     cpdef Spectrum emission(self, Point3D beam_point, Point3D plasma_point, Vector3D beam_direction, Vector3D observation_direction, Spectrum spectrum):
         """
@@ -101,6 +109,24 @@ cdef class BeamModel:
 
         raise NotImplementedError('Virtual method must be implemented in a sub-class.')
 
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength):
+        """
+        Tests if the model may emit in the specified wavelength band.
+
+        Models with a limited spectral extent, such as emission lines, should
+        override this method. The BeamMaterial skips the models that cannot
+        emit in the band of the observed spectrum. Models must call
+        notifier.notify() if a change of their properties moves the band.
+
+        By default the model is assumed to emit at all wavelengths.
+
+        :param min_wavelength: The lower wavelength of the band in nm.
+        :param max_wavelength: The upper wavelength of the band in nm.
+        :return: False if the model cannot emit in the band, True otherwise.
+        """
+
+        return True
+
     def _change(self):
         """
         Called if the plasma, beam or the atomic data source properties change.
@@ -194,6 +220,19 @@ cdef class BeamAttenuator:
         """
         raise NotImplementedError("Virtual function density not defined.")
 
+    cpdef double clamp_radius(self):
+        """
+        Returns the radius beyond which the beam density is zero.
+
+        Attenuators that clamp the low densities to zero should override this
+        method, integrators can then skip the parts of the beam beyond this
+        radius. By default the density is never clamped.
+
+        :return: The radius in beam standard deviations.
+        """
+
+        return INFINITY
+
     def _change(self):
         """
         Called if the plasma, beam or the atomic data source properties change.
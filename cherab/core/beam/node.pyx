@@ -19,9 +19,9 @@
 # under the Licence.
 
 
-from raysect.primitive import Cylinder
+from raysect.primitive import Cylinder, Cone, Intersect
 
-from raysect.optical cimport World, AffineMatrix3D, Primitive, Ray, new_vector3d
+from raysect.optical cimport World, AffineMatrix3D, Primitive, Ray, new_vector3d, translate, rotate_x
 from raysect.optical.material cimport Material
 from raysect.optical.material.emitter.inhomogeneous cimport NumericalIntegrator
 
@@ -370,12 +370,30 @@ cdef class Beam(Node):
         self._geometry.material = BeamMaterial(self, self._plasma, self._atomic_data, list(self._models), self.integrator)
 
     def _generate_geometry(self):
+        """
+        Generates the beam bounding geometry.
+
+        The geometry shares the beam coordinate space and encloses the beam
+        out to 5 sigma of the widest beam axis. A divergent beam is bounded by
+        a truncated cone, a beam with negligible divergence by a cylinder.
+        """
+
+        cdef double tan_div, near_radius, far_radius, apex
+
+        tan_div = tan(DEGREES_TO_RADIANS * max(self._divergence_x, self._divergence_y))
+        near_radius = 5.0 * self.sigma
+        far_radius = 5.0 * (self.sigma + self.length * tan_div)
+
+        # the cone saves little path length if the beam barely diverges
+        if near_radius > 0.95 * far_radius:
+            return Cylinder(radius=far_radius, height=self.length)
 
-        # todo: switch this for a Cone primitive
-        # the beam bounding envelope is a cylinder aligned with the beam axis, sharing the same coordinate space
-        # the cylinder radius is set to 5 sigma around the widest section of the gaussian beam
-        radius = 5.0 * (self.sigma + self.length * tan(DEGREES_TO_RADIANS * max(self._divergence_x, self._divergence_y)))
-        return Cylinder(radius=radius, height=self.length)
+        # the cone is flipped so its base lies on the end of the beam and its apex is behind the beam source,
+        # it is then truncated at the source by a cylinder spanning the beam length
+        apex = self.length + self.sigma / tan_div
+        cone = Cone(radius=far_radius, height=apex, transform=translate(0, 0, self.length) * rotate_x(180))
+        cylinder = Cylinder(radius=far_radius, height=self.length)
+        return Intersect(cone, cylinder)
 
     def _configure_attenuator(self):
 
@@ -16,6 +16,7 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from numpy cimport ndarray
 from raysect.optical cimport Vector3D
 
 from cherab.core.math cimport Function3D, VectorFunction3D
@@ -33,6 +34,12 @@ cdef class DistributionFunction:
 
     cpdef double density(self, double x, double y, double z) except? -1e999
 
+    cpdef ndarray bulk_velocity_points(self, object points)
+
+    cpdef ndarray effective_temperature_points(self, object points)
+
+    cpdef ndarray density_points(self, object points)
+
 
 cdef class Maxwellian(DistributionFunction):
 
@@ -47,4 +54,10 @@ cdef class Maxwellian(DistributionFunction):
 
     cpdef double effective_temperature(self, double x, double y, double z) except? -1e999
 
-    cpdef double density(self, double x, double y, double z) except? -1e999
\ No newline at end of file
+    cpdef double density(self, double x, double y, double z) except? -1e999
+
+    cpdef ndarray bulk_velocity_points(self, object points)
+
+    cpdef ndarray effective_temperature_points(self, object points)
+
+    cpdef ndarray density_points(self, object points)
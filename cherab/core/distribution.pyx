@@ -20,11 +20,15 @@
 
 from cherab.core.utility import Notifier
 
+from numpy import empty
+
 from libc.math cimport exp, M_PI
+from numpy cimport ndarray
 from raysect.optical cimport Vector3D
 cimport cython
 
 from cherab.core.math cimport autowrap_function3d, autowrap_vectorfunction3d
+from cherab.core.math.samplers cimport as_points3d, sample3d_points, samplevector3d_points
 from cherab.core.utility.constants cimport ELEMENTARY_CHARGE
 
 
@@ -84,6 +88,93 @@ cdef class DistributionFunction:
 
         raise NotImplementedError()
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef ndarray bulk_velocity_points(self, object points):
+        """
+        Evaluates the bulk velocity at each of the supplied points.
+
+        Sub-classes may override this method with a faster implementation,
+        by default bulk_velocity() is called for each point.
+
+        :param points: an array-like object of shape (N, 3) containing the
+          (x, y, z) coordinates of each point in meters
+        :return: an Nx3 array of velocity vectors in m/s
+        """
+
+        cdef:
+            int i
+            double[:, ::1] p_view, v_view
+            Vector3D velocity
+
+        p_view = as_points3d(points)
+        v = empty((p_view.shape[0], 3))
+        v_view = v
+
+        for i in range(p_view.shape[0]):
+            velocity = self.bulk_velocity(p_view[i, 0], p_view[i, 1], p_view[i, 2])
+            v_view[i, 0] = velocity.x
+            v_view[i, 1] = velocity.y
+            v_view[i, 2] = velocity.z
+
+        return v
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef ndarray effective_temperature_points(self, object points):
+        """
+        Evaluates the effective temperature at each of the supplied points.
+
+        Sub-classes may override this method with a faster implementation,
+        by default effective_temperature() is called for each point.
+
+        :param points: an array-like object of shape (N, 3) containing the
+          (x, y, z) coordinates of each point in meters
+        :return: an array of N temperatures in eV
+        """
+
+        cdef:
+            int i
+            double[:, ::1] p_view
+            double[::1] v_view
+
+        p_view = as_points3d(points)
+        v = empty(p_view.shape[0])
+        v_view = v
+
+        for i in range(p_view.shape[0]):
+            v_view[i] = self.effective_temperature(p_view[i, 0], p_view[i, 1], p_view[i, 2])
+
+        return v
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef ndarray density_points(self, object points):
+        """
+        Evaluates the density at each of the supplied points.
+
+        Sub-classes may override this method with a faster implementation,
+        by default density() is called for each point.
+
+        :param points: an array-like object of shape (N, 3) containing the
+          (x, y, z) coordinates of each point in meters
+        :return: an array of N densities in m^-3
+        """
+
+        cdef:
+            int i
+            double[:, ::1] p_view
+            double[::1] v_view
+
+        p_view = as_points3d(points)
+        v = empty(p_view.shape[0])
+        v_view = v
+
+        for i in range(p_view.shape[0]):
+            v_view[i] = self.density(p_view[i, 0], p_view[i, 1], p_view[i, 2])
+
+        return v
+
 
 cdef class Maxwellian(DistributionFunction):
 
@@ -161,4 +252,32 @@ cdef class Maxwellian(DistributionFunction):
 
         return self._density.evaluate(x, y, z)
 
+    cpdef ndarray bulk_velocity_points(self, object points):
+        """
+
+        :param points: an array-like object of shape (N, 3) containing the
+          (x, y, z) coordinates of each point in meters
+        :return: an Nx3 array of velocity vectors in m/s
+        """
+
+        return samplevector3d_points(self._velocity, points)
+
+    cpdef ndarray effective_temperature_points(self, object points):
+        """
+
+        :param points: an array-like object of shape (N, 3) containing the
+          (x, y, z) coordinates of each point in meters
+        :return: an array of N temperatures in eV
+        """
+
+        return sample3d_points(self._temperature, points)
+
+    cpdef ndarray density_points(self, object points):
+        """
+
+        :param points: an array-like object of shape (N, 3) containing the
+          (x, y, z) coordinates of each point in meters
+        :return: an array of N densities in m^-3
+        """
 
+        return sample3d_points(self._density, points)
@@ -16,7 +16,7 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from .samplers import sample1d, sample2d, sample3d, samplevector2d, samplevector3d
+from .samplers import sample1d, sample2d, sample3d, samplevector2d, samplevector3d, sample3d_points, samplevector3d_points
 from .function import Function1D, Function2D, Function3D, VectorFunction2D, VectorFunction3D
 from .interpolators import Interpolate1DLinear, Interpolate1DCubic
 from .interpolators import Interpolate2DLinear, Interpolate2DCubic
@@ -26,6 +26,8 @@ cdef class Caching1D(Function1D):
         int no_boundary_error
         ndarray x_np
         double[::1] x_domain_view
+        double[::1] x_area_view
+        double x_inverse_spacing
         int top_index_x
         double x_min, x_delta_inv
         double data_min, data_max, data_delta, data_delta_inv
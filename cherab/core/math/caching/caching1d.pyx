@@ -18,14 +18,15 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from numpy import array, empty, int8, float64, concatenate, linspace
+from numpy import array, asarray, empty, int8, float64, concatenate, linspace
 from numpy.linalg import solve
 
 cimport cython
 from libc.math cimport isnan
 from numpy cimport ndarray, PyArray_ZEROS, NPY_FLOAT64, npy_intp, import_array
 from cherab.core.math.function cimport autowrap_function1d
-from cherab.core.math.interpolators.utility cimport find_index, derivatives_array, factorial
+from cherab.core.math.interpolators.utility cimport find_index, inverse_uniform_spacing, derivatives_array, factorial
+from cherab.core.math.interpolators.coefficients import save_arrays, load_arrays, grid_fingerprint
 
 # required by numpy c-api
 import_array()
@@ -77,6 +78,12 @@ cdef class Caching1D(Function1D):
 
         self.x_domain_view = self.x_np
 
+        # the samples inside the caching area are uniformly spaced and are
+        # looked up without searching, the outer samples are only used for the
+        # derivatives on the boundaries
+        self.x_area_view = self.x_np[1:-1]
+        self.x_inverse_spacing = inverse_uniform_spacing(self.x_area_view, len(self.x_np) - 2)
+
         self.top_index_x = len(self.x_np) - 1
 
         # Initialise the caching array
@@ -111,6 +118,52 @@ cdef class Caching1D(Function1D):
         self.x2_view = self.x_np*self.x_np
         self.x3_view = self.x_np*self.x_np*self.x_np
 
+    def save(self, str path, str fingerprint):
+        """
+        Saves the sampled values and the calculated coefficients to a file.
+
+        The file can be loaded by any Caching1D caching the same function on the
+        same grid, see load().
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the cached function, it must be
+        supplied again to load the file.
+        """
+
+        save_arrays(path, self._cache_key(fingerprint), {'data': asarray(self.data_view), 'coefficients': asarray(self.coeffs_view), 'calculated': asarray(self.calculated_view)})
+
+    def load(self, str path, str fingerprint):
+        """
+        Loads the sampled values and the coefficients saved by save().
+
+        The file is memory mapped, so that the processes loading it share the
+        same memory. The cells missing from the file are still calculated on
+        demand, without modifying the file. A ValueError is raised if the file
+        was saved for a different caching grid, function boundaries or
+        fingerprint.
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the cached function.
+        """
+
+        arrays = load_arrays(path, self._cache_key(fingerprint))
+        self.coeffs_view = arrays['coefficients']
+        self.calculated_view = arrays['calculated']
+        self.data_view = arrays['data']
+
+    def _cache_key(self, str fingerprint):
+        """
+        Returns the description of the content of the cache files.
+        """
+
+        return {
+            'class': 'Caching1D',
+            'grid': grid_fingerprint(self.x_domain_view),
+            'data_min': self.data_min,
+            'data_delta': self.data_delta,
+            'fingerprint': fingerprint
+        }
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef double evaluate(self, double px) except? -1e999:
@@ -125,7 +178,8 @@ cdef class Caching1D(Function1D):
 
         cdef int i_x
 
-        i_x = find_index(self.x_domain_view, self.top_index_x+1, px)
+        # indices in the caching area shifted to indices in the domain
+        i_x = find_index(self.x_area_view, self.top_index_x-1, px, 0., self.x_inverse_spacing) + 1
 
         if 1 <= i_x <= self.top_index_x - 2:
             return self._evaluate(px, i_x)
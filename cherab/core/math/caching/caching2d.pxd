@@ -27,6 +27,8 @@ cdef class Caching2D(Function2D):
         int no_boundary_error
         ndarray x_np, y_np
         double[::1] x_domain_view, y_domain_view
+        double[::1] x_area_view, y_area_view
+        double x_inverse_spacing, y_inverse_spacing
         int top_index_x, top_index_y
         double x_min, x_delta_inv, y_min, y_delta_inv
         double data_min, data_max, data_delta, data_delta_inv
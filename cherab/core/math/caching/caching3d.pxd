@@ -17,7 +17,8 @@
 # under the Licence.
 
 from cherab.core.math.function cimport Function3D
-from numpy cimport ndarray, int8_t
+from numpy cimport ndarray
+from cherab.core.math.interpolators.coefficients cimport CoefficientCache3D
 
 cdef class Caching3D(Function3D):
 
@@ -26,20 +27,15 @@ cdef class Caching3D(Function3D):
         int no_boundary_error
         ndarray x_np, y_np, z_np
         double[::1] x_domain_view, y_domain_view, z_domain_view
+        double[::1] x_area_view, y_area_view, z_area_view
+        double x_inverse_spacing, y_inverse_spacing, z_inverse_spacing
         int top_index_x, top_index_y, top_index_z
         double x_min, x_delta_inv, y_min, y_delta_inv, z_min, z_delta_inv
         double data_min, data_max, data_delta, data_delta_inv
-        double[::1] x_view, x2_view, x3_view
-        double[::1] y_view, y2_view, y3_view
-        double[::1] z_view, z2_view, z3_view
+        double[::1] x_view, y_view, z_view
         double[:,:,::1] data_view
-        double[:,:,:,::1] coeffs_view
-        int8_t[:,:,::1] calculated_view
+        CoefficientCache3D coefficients
 
     cdef double evaluate(self, double px, double py, double pz) except? -1e999
 
-    cdef double _evaluate(self, double px, double py, double pz, int i_x, int i_y, int i_z)
-
-    cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, int i_z, double px, double py, double pz, int der_x, int der_y, der_z)
-
-    cdef double[::1] _constraints3d(self, int u, int v, int w, bint x_der, bint y_der, bint z_der)
\ No newline at end of file
+    cdef double _evaluate(self, double px, double py, double pz, int i_x, int i_y, int i_z) except? -1e999
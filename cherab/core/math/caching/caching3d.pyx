@@ -18,14 +18,14 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from numpy import array, empty, int8, float64, concatenate, linspace
-from numpy.linalg import solve
+from numpy import array, asarray, empty, float64, concatenate, linspace
 
 cimport cython
 from libc.math cimport isnan
-from numpy cimport ndarray, PyArray_ZEROS, PyArray_SimpleNew, NPY_FLOAT64, npy_intp, import_array
+from numpy cimport ndarray, import_array
 from cherab.core.math.function cimport autowrap_function3d
-from cherab.core.math.interpolators.utility cimport find_index, derivatives_array, factorial
+from cherab.core.math.interpolators.utility cimport find_index, inverse_uniform_spacing, tricubic_coefficients
+from cherab.core.math.interpolators.coefficients import save_arrays, load_arrays, grid_fingerprint
 
 # required by numpy c-api
 import_array()
@@ -56,9 +56,16 @@ cdef class Caching3D(Function3D):
     :param function_boundaries: Boundaries of the function values for
     normalisation: (min, max). If None, function values are not normalised.
     Default is None.
+    :param max_cells: Maximum number of cells whose coefficients are kept in
+    memory. If set, the coefficients are allocated on demand and the least
+    recently used cells are discarded once the limit is reached. If None, the
+    coefficients of every cell may be kept. Default is None.
+    :param single_precision: If True, the coefficients are stored as 32 bit
+    floats, halving the memory used at the cost of accuracy. Default is False.
     """
 
-    def __init__(self, object function3d, tuple space_area, tuple resolution, no_boundary_error=False, function_boundaries=None):
+    def __init__(self, object function3d, tuple space_area, tuple resolution, no_boundary_error=False, function_boundaries=None,
+                 max_cells=None, single_precision=False):
 
         cdef:
             double minx, maxx, miny, maxy, minz, maxz
@@ -91,15 +98,22 @@ cdef class Caching3D(Function3D):
         self.y_domain_view = self.y_np
         self.z_domain_view = self.z_np
 
+        # the samples inside the caching area are uniformly spaced and are
+        # looked up without searching, the outer samples are only used for the
+        # derivatives on the boundaries
+        self.x_area_view = self.x_np[1:-1]
+        self.y_area_view = self.y_np[1:-1]
+        self.z_area_view = self.z_np[1:-1]
+        self.x_inverse_spacing = inverse_uniform_spacing(self.x_area_view, len(self.x_np) - 2)
+        self.y_inverse_spacing = inverse_uniform_spacing(self.y_area_view, len(self.y_np) - 2)
+        self.z_inverse_spacing = inverse_uniform_spacing(self.z_area_view, len(self.z_np) - 2)
+
         self.top_index_x = len(self.x_np) - 1
         self.top_index_y = len(self.y_np) - 1
         self.top_index_z = len(self.z_np) - 1
 
-        # Initialise the caching array
-        self.coeffs_view = empty((self.top_index_x - 2, self.top_index_y - 2, self.top_index_z - 2, 64), dtype=float64)
-        self.coeffs_view[:,:,:,::1] = float('NaN')
-        self.calculated_view = empty((self.top_index_x - 2, self.top_index_y - 2, self.top_index_z - 2), dtype=int8)
-        self.calculated_view[:,:,:] = False
+        # Initialise the coefficients storage
+        self.coefficients = CoefficientCache3D((self.top_index_x - 2, self.top_index_y - 2, self.top_index_z - 2), 64, max_cells, single_precision)
 
         # Normalise coordinates and data
         self.x_delta_inv = 1 / (self.x_np.max() - self.x_np.min())
@@ -130,14 +144,56 @@ cdef class Caching3D(Function3D):
 
         # obtain coordinates memory views
         self.x_view = self.x_np
-        self.x2_view = self.x_np*self.x_np
-        self.x3_view = self.x_np*self.x_np*self.x_np
         self.y_view = self.y_np
-        self.y2_view = self.y_np*self.y_np
-        self.y3_view = self.y_np*self.y_np*self.y_np
         self.z_view = self.z_np
-        self.z2_view = self.z_np*self.z_np
-        self.z3_view = self.z_np*self.z_np*self.z_np
+
+    def save(self, str path, str fingerprint):
+        """
+        Saves the sampled values and the calculated coefficients to a file.
+
+        The file can be loaded by any Caching3D caching the same function on the
+        same grid, see load(). Not available if the number of cells kept in
+        memory is limited.
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the cached function, it must be
+        supplied again to load the file.
+        """
+
+        coefficients, calculated = self.coefficients.arrays()
+        save_arrays(path, self._cache_key(fingerprint), {'data': asarray(self.data_view), 'coefficients': coefficients, 'calculated': calculated})
+
+    def load(self, str path, str fingerprint):
+        """
+        Loads the sampled values and the coefficients saved by save().
+
+        The file is memory mapped, so that the processes loading it share the
+        same memory. The cells missing from the file are still calculated on
+        demand, without modifying the file. A ValueError is raised if the file
+        was saved for a different caching grid, function boundaries or
+        fingerprint.
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the cached function.
+        """
+
+        arrays = load_arrays(path, self._cache_key(fingerprint))
+        self.coefficients.set_arrays(arrays['coefficients'], arrays['calculated'])
+        self.data_view = arrays['data']
+
+    def _cache_key(self, str fingerprint):
+        """
+        Returns the description of the content of the cache files.
+        """
+
+        return {
+            'class': 'Caching3D',
+            'grid': grid_fingerprint(self.x_domain_view, self.y_domain_view, self.z_domain_view),
+            'data_min': self.data_min,
+            'data_delta': self.data_delta,
+            'single_precision': self.coefficients.single_precision,
+            'fingerprint': fingerprint
+        }
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -155,9 +211,10 @@ cdef class Caching3D(Function3D):
 
         cdef int i_x, i_y, i_z
 
-        i_x = find_index(self.x_domain_view, self.top_index_x+1, px)
-        i_y = find_index(self.y_domain_view, self.top_index_y+1, py)
-        i_z = find_index(self.z_domain_view, self.top_index_z+1, pz)
+        # indices in the caching area shifted to indices in the domain
+        i_x = find_index(self.x_area_view, self.top_index_x-1, px, 0., self.x_inverse_spacing) + 1
+        i_y = find_index(self.y_area_view, self.top_index_y-1, py, 0., self.y_inverse_spacing) + 1
+        i_z = find_index(self.z_area_view, self.top_index_z-1, pz, 0., self.z_inverse_spacing) + 1
 
         if 1 <= i_x <= self.top_index_x-2:
             if 1 <= i_y <= self.top_index_y-2:
@@ -183,7 +240,7 @@ cdef class Caching3D(Function3D):
     @cython.cdivision(True)
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cdef double _evaluate(self, double px, double py, double pz, int i_x, int i_y, int i_z):
+    cdef double _evaluate(self, double px, double py, double pz, int i_x, int i_y, int i_z) except? -1e999:
         """
         Calculate if not already done then evaluate the polynomial valid in the
         area given by (i_x, i_y, i_z) at position (px, py, pz).
@@ -200,19 +257,17 @@ cdef class Caching3D(Function3D):
         """
 
         cdef:
-            int u, v, w, l, i, j, k, i_x_p, i_y_p, i_z_p
-            double value
-            double delta_x, delta_y, delta_z, px2, py2, pz2, px3, py3, pz3
-            npy_intp cv_size
-            npy_intp cm_size[2]
-            double[::1] cv_view, coeffs_view
-            double[:, ::1] cm_view
+            int u, v, w, i, j, k, i_x_p, i_y_p, i_z_p
+            double value, hx, hy, hz, hxy, hxz, hyz, hxyz, tx, ty, tz
+            double delta_x, delta_y, delta_z
+            double tx2, ty2, tz2, tx3, ty3, tz3
+            double c[64]
 
         # If the concerned polynomial has not yet been calculated:
         i_x_p = i_x - 1  # polynomial index
         i_y_p = i_y - 1  # polynomial index
         i_z_p = i_z - 1  # polynomial index
-        if not self.calculated_view[i_x_p, i_y_p, i_z_p]:
+        if not self.coefficients.fetch(i_x_p, i_y_p, i_z_p, c):
 
             # sample the data needed
             for u in range(i_x-1, i_x+3):
@@ -224,222 +279,92 @@ cdef class Caching3D(Function3D):
                                 # data values are normalised here
                                 self.data_view[u, v, w] = (value - self.data_min) * self.data_delta_inv
 
-            # Create constraint matrix (un-optimised)
-            # cv_view = zeros((64,), dtype=float64)       # constraints vector
-            # cm_view = zeros((64, 64), dtype=float64)    # constraints matrix
+            # cell widths, the derivatives are scaled to the cell coordinates
+            hx = self.x_view[i_x+1] - self.x_view[i_x]
+            hy = self.y_view[i_y+1] - self.y_view[i_y]
+            hz = self.z_view[i_z+1] - self.z_view[i_z]
+            hxy = hx * hy
+            hxz = hx * hz
+            hyz = hy * hz
+            hxyz = hx * hy * hz
 
-            # Create constraint matrix (optimised using numpy c-api)
-            cv_size = 64
-            cv_view = PyArray_ZEROS(1, &cv_size, NPY_FLOAT64, 0)
-            cm_size[:] = [64, 64]
-            cm_view = PyArray_ZEROS(2, cm_size, NPY_FLOAT64, 0)
+            # Fill the constraints, see tricubic_coefficients() for the layout
+            for i in range(2):
+                for j in range(2):
+                    for k in range(2):
 
-            # Fill the constraints matrix
-            l = 0
-            for u in range(i_x, i_x+2):
-                for v in range(i_y, i_y+2):
-                    for w in range(i_z, i_z+2):
+                        u = i_x + i
+                        v = i_y + j
+                        w = i_z + k
 
                         # knot values
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, False, False, False)
-                        cv_view[l] = self.data_view[u, v, w]
-                        l += 1
+                        c[16*i + 4*j + k] = self.data_view[u, v, w]
 
                         # derivatives along x, y, z
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, False, False)
                         delta_x = self.x_view[u+1] - self.x_view[u-1]
-                        cv_view[l] = (self.data_view[u+1, v, w] - self.data_view[u-1, v, w])/delta_x
-                        l += 1
+                        c[16*(i+2) + 4*j + k] = hx * (self.data_view[u+1, v, w] - self.data_view[u-1, v, w])/delta_x
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, False ,True , False)
                         delta_y = self.y_view[v+1] - self.y_view[v-1]
-                        cv_view[l] = (self.data_view[u, v+1, w] - self.data_view[u, v-1, w])/delta_y
-                        l += 1
+                        c[16*i + 4*(j+2) + k] = hy * (self.data_view[u, v+1, w] - self.data_view[u, v-1, w])/delta_y
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, False, False, True)
                         delta_z = self.z_view[w+1] - self.z_view[w-1]
-                        cv_view[l] = (self.data_view[u, v, w+1] - self.data_view[u, v, w-1])/delta_z
-                        l += 1
+                        c[16*i + 4*j + k+2] = hz * (self.data_view[u, v, w+1] - self.data_view[u, v, w-1])/delta_z
 
                         # cross derivatives xy, xz, yz
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, True, False)
-                        cv_view[l] = (self.data_view[u+1, v+1, w] - self.data_view[u+1, v-1, w] - self.data_view[u-1, v+1, w] + self.data_view[u-1, v-1, w])/(delta_x*delta_y)
-                        l += 1
+                        c[16*(i+2) + 4*(j+2) + k] = hxy * (self.data_view[u+1, v+1, w] - self.data_view[u+1, v-1, w] - self.data_view[u-1, v+1, w] + self.data_view[u-1, v-1, w])/(delta_x*delta_y)
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, False, True)
-                        cv_view[l] = (self.data_view[u+1, v, w+1] - self.data_view[u+1, v, w-1] - self.data_view[u-1, v, w+1] + self.data_view[u-1, v, w-1])/(delta_x*delta_z)
-                        l += 1
+                        c[16*(i+2) + 4*j + k+2] = hxz * (self.data_view[u+1, v, w+1] - self.data_view[u+1, v, w-1] - self.data_view[u-1, v, w+1] + self.data_view[u-1, v, w-1])/(delta_x*delta_z)
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, False, True, True)
-                        cv_view[l] = (self.data_view[u, v+1, w+1] - self.data_view[u, v-1, w+1] - self.data_view[u, v+1, w-1] + self.data_view[u, v-1, w-1])/(delta_y*delta_z)
-                        l += 1
+                        c[16*i + 4*(j+2) + k+2] = hyz * (self.data_view[u, v+1, w+1] - self.data_view[u, v-1, w+1] - self.data_view[u, v+1, w-1] + self.data_view[u, v-1, w-1])/(delta_y*delta_z)
 
                         # cross derivative xyz
 
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, True, True)
-                        cv_view[l] = (self.data_view[u+1, v+1, w+1] - self.data_view[u+1, v+1, w-1] - self.data_view[u+1, v-1, w+1] + self.data_view[u+1, v-1, w-1] - self.data_view[u-1, v+1, w+1] + self.data_view[u-1, v+1, w-1] + self.data_view[u-1, v-1, w+1] - self.data_view[u-1, v-1, w-1])/(delta_x*delta_y*delta_z)
-                        l += 1
-
-            # Solve the linear system and fill the caching coefficients array
-            coeffs_view = solve(cm_view, cv_view)
-            self.coeffs_view[i_x_p, i_y_p, i_z_p, :] = coeffs_view
-
-            # Denormalisation
-            for i in range(4):
-                for j in range(4):
-                    for k in range(4):
-                        coeffs_view[16 * i + 4 * j + k] = self.data_delta * self.x_delta_inv ** i * self.y_delta_inv ** j * self.z_delta_inv ** k / (factorial(i) * factorial(j) * factorial(k)) \
-                                                          * self._evaluate_polynomial_derivative(i_x_p, i_y_p, i_z_p, -self.x_delta_inv * self.x_min, -self.y_delta_inv * self.y_min, -self.z_delta_inv * self.z_min, i, j, k)
-            coeffs_view[0] = coeffs_view[0] + self.data_min
-            self.coeffs_view[i_x_p, i_y_p, i_z_p, :] = coeffs_view
-
-            self.calculated_view[i_x_p, i_y_p, i_z_p] = True
-
-        px2 = px*px
-        px3 = px2*px
-        py2 = py*py
-        py3 = py2*py
-        pz2 = pz*pz
-        pz3 = pz2*pz
-
-        return         (self.coeffs_view[i_x_p, i_y_p, i_z_p,  0] + self.coeffs_view[i_x_p, i_y_p, i_z_p,  1]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p,  2]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p,  3]*pz3) + \
-                   py *(self.coeffs_view[i_x_p, i_y_p, i_z_p,  4] + self.coeffs_view[i_x_p, i_y_p, i_z_p,  5]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p,  6]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p,  7]*pz3) + \
-                   py2*(self.coeffs_view[i_x_p, i_y_p, i_z_p,  8] + self.coeffs_view[i_x_p, i_y_p, i_z_p,  9]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 10]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 11]*pz3) + \
-                   py3*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 12] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 13]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 14]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 15]*pz3) \
-               + px*( \
-                       (self.coeffs_view[i_x_p, i_y_p, i_z_p, 16] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 17]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 18]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 19]*pz3) + \
-                   py *(self.coeffs_view[i_x_p, i_y_p, i_z_p, 20] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 21]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 22]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 23]*pz3) + \
-                   py2*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 24] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 25]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 26]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 27]*pz3) + \
-                   py3*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 28] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 29]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 30]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 31]*pz3) \
+                        c[16*(i+2) + 4*(j+2) + k+2] = hxyz * (self.data_view[u+1, v+1, w+1] - self.data_view[u+1, v+1, w-1] - self.data_view[u+1, v-1, w+1] + self.data_view[u+1, v-1, w-1] - self.data_view[u-1, v+1, w+1] + self.data_view[u-1, v+1, w-1] + self.data_view[u-1, v-1, w+1] - self.data_view[u-1, v-1, w-1])/(delta_x*delta_y*delta_z)
+
+            # closed form solution of the constraints
+            tricubic_coefficients(c)
+
+            # Denormalisation of the data values
+            for i in range(64):
+                c[i] = self.data_delta * c[i]
+            c[0] += self.data_min
+
+            self.coefficients.store(i_x_p, i_y_p, i_z_p, c)
+
+        # the polynomial is expressed in the cell coordinates
+        tx = (px - self.x_domain_view[i_x]) / (self.x_domain_view[i_x+1] - self.x_domain_view[i_x])
+        ty = (py - self.y_domain_view[i_y]) / (self.y_domain_view[i_y+1] - self.y_domain_view[i_y])
+        tz = (pz - self.z_domain_view[i_z]) / (self.z_domain_view[i_z+1] - self.z_domain_view[i_z])
+
+        tx2 = tx*tx
+        tx3 = tx2*tx
+        ty2 = ty*ty
+        ty3 = ty2*ty
+        tz2 = tz*tz
+        tz3 = tz2*tz
+
+        return         (c[0] + c[1]*tz + c[2]*tz2 + c[3]*tz3) + \
+                   ty *(c[4] + c[5]*tz + c[6]*tz2 + c[7]*tz3) + \
+                   ty2*(c[8] + c[9]*tz + c[10]*tz2 + c[11]*tz3) + \
+                   ty3*(c[12] + c[13]*tz + c[14]*tz2 + c[15]*tz3) \
+               + tx*( \
+                       (c[16] + c[17]*tz + c[18]*tz2 + c[19]*tz3) + \
+                   ty *(c[20] + c[21]*tz + c[22]*tz2 + c[23]*tz3) + \
+                   ty2*(c[24] + c[25]*tz + c[26]*tz2 + c[27]*tz3) + \
+                   ty3*(c[28] + c[29]*tz + c[30]*tz2 + c[31]*tz3) \
                ) \
-               + px2*( \
-                       (self.coeffs_view[i_x_p, i_y_p, i_z_p, 32] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 33]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 34]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 35]*pz3) + \
-                   py *(self.coeffs_view[i_x_p, i_y_p, i_z_p, 36] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 37]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 38]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 39]*pz3) + \
-                   py2*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 40] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 41]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 42]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 43]*pz3) + \
-                   py3*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 44] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 45]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 46]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 47]*pz3) \
+               + tx2*( \
+                       (c[32] + c[33]*tz + c[34]*tz2 + c[35]*tz3) + \
+                   ty *(c[36] + c[37]*tz + c[38]*tz2 + c[39]*tz3) + \
+                   ty2*(c[40] + c[41]*tz + c[42]*tz2 + c[43]*tz3) + \
+                   ty3*(c[44] + c[45]*tz + c[46]*tz2 + c[47]*tz3) \
                ) \
-               + px3*( \
-                       (self.coeffs_view[i_x_p, i_y_p, i_z_p, 48] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 49]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 50]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 51]*pz3) + \
-                   py *(self.coeffs_view[i_x_p, i_y_p, i_z_p, 52] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 53]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 54]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 55]*pz3) + \
-                   py2*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 56] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 57]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 58]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 59]*pz3) + \
-                   py3*(self.coeffs_view[i_x_p, i_y_p, i_z_p, 60] + self.coeffs_view[i_x_p, i_y_p, i_z_p, 61]*pz + self.coeffs_view[i_x_p, i_y_p, i_z_p, 62]*pz2 + self.coeffs_view[i_x_p, i_y_p, i_z_p, 63]*pz3) \
+               + tx3*( \
+                       (c[48] + c[49]*tz + c[50]*tz2 + c[51]*tz3) + \
+                   ty *(c[52] + c[53]*tz + c[54]*tz2 + c[55]*tz3) + \
+                   ty2*(c[56] + c[57]*tz + c[58]*tz2 + c[59]*tz3) + \
+                   ty3*(c[60] + c[61]*tz + c[62]*tz2 + c[63]*tz3) \
                )
-
-    cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, int i_z, double px, double py, double pz, int der_x, int der_y, der_z):
-        """
-        Evaluate the derivatives of the polynomial valid in the area given by
-        'i_x', 'i_y' and 'i_z' at position ('px', 'py', 'pz'). The order of
-        derivative along each axis is given by 'der_x', 'der_y' and 'der_z'.
-        """
-
-        cdef double[::1] x_values, y_values, z_values
-
-        x_values = derivatives_array(px, der_x)
-        y_values = derivatives_array(py, der_y)
-        z_values = derivatives_array(pz, der_z)
-
-        return   x_values[0]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z,  0] + z_values[1]*self.coeffs_view[i_x, i_y, i_z,  1] + z_values[2]*self.coeffs_view[i_x, i_y, i_z,  2] + z_values[3]*self.coeffs_view[i_x, i_y, i_z,  3]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z,  4] + z_values[1]*self.coeffs_view[i_x, i_y, i_z,  5] + z_values[2]*self.coeffs_view[i_x, i_y, i_z,  6] + z_values[3]*self.coeffs_view[i_x, i_y, i_z,  7]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z,  8] + z_values[1]*self.coeffs_view[i_x, i_y, i_z,  9] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 10] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 11]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 12] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 13] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 14] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 15]) \
-               ) \
-               + x_values[1]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 16] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 17] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 18] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 19]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 20] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 21] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 22] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 23]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 24] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 25] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 26] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 27]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 28] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 29] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 30] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 31]) \
-               ) \
-               + x_values[2]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 32] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 33] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 34] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 35]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 36] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 37] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 38] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 39]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 40] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 41] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 42] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 43]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 44] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 45] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 46] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 47]) \
-               ) \
-               + x_values[3]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 48] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 49] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 50] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 51]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 52] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 53] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 54] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 55]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 56] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 57] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 58] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 59]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 60] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 61] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 62] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 63]) \
-               )
-
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    cdef double[::1] _constraints3d(self, int u, int v, int w, bint x_der, bint y_der, bint z_der):
-        """
-        Return the coefficients of a given constraints and at a given point.
-
-        This method is used to easily build the constraint matrix. It only
-        handles constraints on P, dP/dx, dP/dy, dP/z, d2P/dxdy, d2P/dydz,
-        d2P/dxdz and d3P/dxdydz (where P is the concerned polynomial).
-
-        :param int u, int v, int w: indices of the point where the constraints apply.
-        :param bint x_der, bint y_der, bint z_der: set to True or False in order to chose
-        what constraint is returned. For each axis, True means the constraint
-        considered a derivative along this axis.
-        For example:
-        x_der=False, y_der=True, z_der=False means the constraint returned is
-        on the derivative along y (dP/dy).
-        x_der=True, y_der=True, z_der=False means the constraint returned is
-        on the cross derivative along x and y (d2P/dxdy).
-        :return: a memory view of a 1x64 array filled with the coefficients
-        corresponding to the requested constraint.
-        """
-
-        cdef:
-            double x_components[4]
-            double y_components[4]
-            double z_components[4]
-            npy_intp result_size
-            double[::1] result_view
-            double x_component, y_component, z_component
-            int l
-
-        if x_der:
-            x_components[0] = 0.
-            x_components[1] = 1.
-            x_components[2] = 2.*self.x_view[u]
-            x_components[3] = 3.*self.x2_view[u]
-        else:
-            x_components[0] = 1.
-            x_components[1] = self.x_view[u]
-            x_components[2] = self.x2_view[u]
-            x_components[3] = self.x3_view[u]
-
-        if y_der:
-            y_components[0] = 0.
-            y_components[1] = 1.
-            y_components[2] = 2.*self.y_view[v]
-            y_components[3] = 3.*self.y2_view[v]
-        else:
-            y_components[0] = 1.
-            y_components[1] = self.y_view[v]
-            y_components[2] = self.y2_view[v]
-            y_components[3] = self.y3_view[v]
-
-        if z_der:
-            z_components[0] = 0.
-            z_components[1] = 1.
-            z_components[2] = 2.*self.z_view[w]
-            z_components[3] = 3.*self.z2_view[w]
-        else:
-            z_components[0] = 1.
-            z_components[1] = self.z_view[w]
-            z_components[2] = self.z2_view[w]
-            z_components[3] = self.z3_view[w]
-
-        # create an empty (uninitialised) ndarray via numpy c-api
-        result_size = 64
-        result_view = PyArray_SimpleNew(1, &result_size, NPY_FLOAT64)
-
-        l = 0
-        for x_component in x_components:
-            for y_component in y_components:
-                for z_component in z_components:
-                    result_view[l] = x_component * y_component * z_component
-                    l += 1
-
-        return result_view
\ No newline at end of file
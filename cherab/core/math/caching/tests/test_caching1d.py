@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 import numpy as np
@@ -34,6 +36,32 @@ class TestCaching1D(unittest.TestCase):
             self.assertAlmostEqual(cached_func(x), self.function(x), delta=0.1,
                                    msg='Cached function at {} is too far from exact function!'.format(x))
 
+    def test_save_load(self):
+        cached_func = Caching1D(self.function, self.space_area, self.resolution, function_boundaries=(-1, 1))
+        points = np.linspace(self.space_area[0], self.space_area[1], 25)
+        values = [cached_func(x) for x in points]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache')
+            cached_func.save(path, 'test function')
+
+            # the function must not be sampled again in the cells saved
+            loaded_func = Caching1D(lambda x: float('nan'), self.space_area, self.resolution, function_boundaries=(-1, 1))
+            loaded_func.load(path, 'test function')
+            for x, value in zip(points, values):
+                self.assertEqual(loaded_func(x), value)
+
+            with self.assertRaises(ValueError):
+                Caching1D(self.function, self.space_area, self.resolution, function_boundaries=(-1, 1)).load(path, 'other function')
+            with self.assertRaises(ValueError):
+                Caching1D(self.function, self.space_area, 0.2, function_boundaries=(-1, 1)).load(path, 'test function')
+            with self.assertRaises(ValueError):
+                Caching1D(self.function, self.space_area, self.resolution, function_boundaries=(-2, 2)).load(path, 'test function')
+            with self.assertRaises(ValueError):
+                Caching1D(self.function, self.space_area, self.resolution).load(path, 'test function')
+
+            del loaded_func
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 from cherab.core.math.caching import Caching2D
@@ -37,6 +39,34 @@ class TestCaching2D(unittest.TestCase):
                 self.assertAlmostEqual(cached_func(x, y), self.function(x, y), delta=1.,
                                        msg='Cached function at ({}, {}) is too far from exact function!'.format(x, y))
 
+    def test_save_load(self):
+        boundaries = (-50, 50)
+        cached_func = Caching2D(self.function, self.space_area, self.resolution, function_boundaries=boundaries)
+        points = [(x, y) for x in np.linspace(self.space_area[0], self.space_area[1], 7)
+                  for y in np.linspace(self.space_area[2], self.space_area[3], 7)]
+        values = [cached_func(*point) for point in points]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache')
+            cached_func.save(path, 'test function')
+
+            # the function must not be sampled again in the cells saved
+            loaded_func = Caching2D(lambda x, y: float('nan'), self.space_area, self.resolution, function_boundaries=boundaries)
+            loaded_func.load(path, 'test function')
+            for point, value in zip(points, values):
+                self.assertEqual(loaded_func(*point), value)
+
+            with self.assertRaises(ValueError):
+                Caching2D(self.function, self.space_area, self.resolution, function_boundaries=boundaries).load(path, 'other function')
+            with self.assertRaises(ValueError):
+                Caching2D(self.function, self.space_area, (0.1, 0.05), function_boundaries=boundaries).load(path, 'test function')
+            with self.assertRaises(ValueError):
+                Caching2D(self.function, self.space_area, self.resolution, function_boundaries=(-40, 40)).load(path, 'test function')
+            with self.assertRaises(ValueError):
+                Caching2D(self.function, self.space_area, self.resolution).load(path, 'test function')
+
+            del loaded_func
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 from cherab.core.math.caching import Caching3D
@@ -41,6 +43,79 @@ class TestCaching3D(unittest.TestCase):
                     self.assertAlmostEqual(cached_func(x, y, z), self.function(x, y, z), delta=1.,
                                            msg='Cached function at ({}, {}, {}) is too far from exact function!'.format(x, y, z))
 
+    def test_multilinear(self):
+        # the finite difference derivatives are exact so the cached function is exact
+        function = lambda x, y, z: x * y * z + 2 * x - y + 0.5 * z
+        for boundaries in (None, (-100., 100.)):
+            cached_func = Caching3D(function, self.space_area, self.resolution, function_boundaries=boundaries)
+            for x in np.linspace(self.space_area[0], self.space_area[1], 7):
+                for y in np.linspace(self.space_area[2], self.space_area[3], 7):
+                    for z in np.linspace(self.space_area[4], self.space_area[5], 7):
+                        self.assertAlmostEqual(cached_func(x, y, z), function(x, y, z), places=8,
+                                               msg='Cached function at ({}, {}, {}) does not reproduce a multilinear function!'.format(x, y, z))
+
+    def test_limited_cells(self):
+        # discarded cells are recalculated, the values must not change
+        cached_func = Caching3D(self.function, self.space_area, self.resolution)
+        limited_func = Caching3D(self.function, self.space_area, self.resolution, max_cells=10)
+        for x in np.linspace(self.space_area[0], self.space_area[1], 7):
+            for y in np.linspace(self.space_area[2], self.space_area[3], 7):
+                for z in np.linspace(self.space_area[4], self.space_area[5], 7):
+                    self.assertEqual(limited_func(x, y, z), cached_func(x, y, z),
+                                     msg='Cached function with limited cells at ({}, {}, {}) differs!'.format(x, y, z))
+                    self.assertLessEqual(limited_func.coefficients.cached_cells, 10)
+
+    def test_single_precision(self):
+        cached_func = Caching3D(self.function, self.space_area, self.resolution)
+        single_func = Caching3D(self.function, self.space_area, self.resolution, single_precision=True)
+        self.assertEqual(single_func.coefficients.nbytes, cached_func.coefficients.nbytes // 2)
+        for x in np.linspace(self.space_area[0], self.space_area[1], 7):
+            for y in np.linspace(self.space_area[2], self.space_area[3], 7):
+                for z in np.linspace(self.space_area[4], self.space_area[5], 7):
+                    self.assertAlmostEqual(single_func(x, y, z), cached_func(x, y, z), delta=1e-5 * max(1., abs(cached_func(x, y, z))),
+                                           msg='Cached function in single precision at ({}, {}, {}) is too far!'.format(x, y, z))
+
+    def test_single_precision_repeatable(self):
+        # the first evaluation of a cell, which calculates the coefficients,
+        # must give the same value as the later ones using the stored
+        # coefficients, including after the cell was discarded
+        single_func = Caching3D(self.function, self.space_area, self.resolution, single_precision=True)
+        limited_func = Caching3D(self.function, self.space_area, self.resolution, max_cells=1, single_precision=True)
+        points = [(x, y, z) for x in np.linspace(self.space_area[0], self.space_area[1], 5)
+                  for y in np.linspace(self.space_area[2], self.space_area[3], 5)
+                  for z in np.linspace(self.space_area[4], self.space_area[5], 5)]
+        first_values = [single_func(*point) for point in points]
+        first_limited_values = [limited_func(*point) for point in points]
+        for point, first_value, first_limited_value in zip(points, first_values, first_limited_values):
+            self.assertEqual(single_func(*point), first_value)
+            self.assertEqual(limited_func(*point), first_limited_value)
+            self.assertEqual(first_limited_value, first_value)
+
+    def test_save_load(self):
+        cached_func = Caching3D(self.function, self.space_area, self.resolution)
+        points = [(x, y, z) for x in np.linspace(self.space_area[0], self.space_area[1], 5)
+                  for y in np.linspace(self.space_area[2], self.space_area[3], 5)
+                  for z in np.linspace(self.space_area[4], self.space_area[5], 5)]
+        values = [cached_func(*point) for point in points]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache')
+            cached_func.save(path, 'test function')
+
+            # the function must not be sampled again in the cells saved
+            loaded_func = Caching3D(lambda x, y, z: float('nan'), self.space_area, self.resolution)
+            loaded_func.load(path, 'test function')
+            self.assertEqual(loaded_func.coefficients.cached_cells, cached_func.coefficients.cached_cells)
+            for point, value in zip(points, values):
+                self.assertEqual(loaded_func(*point), value)
+
+            with self.assertRaises(ValueError):
+                Caching3D(self.function, self.space_area, self.resolution).load(path, 'other function')
+            with self.assertRaises(ValueError):
+                Caching3D(self.function, self.space_area, (0.2, 0.05, 0.2)).load(path, 'test function')
+
+            del loaded_func
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
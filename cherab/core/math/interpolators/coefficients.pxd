@@ -0,0 +1,47 @@
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+from numpy cimport int8_t
+
+
+cdef class CoefficientCache3D:
+
+    cdef readonly:
+        int nx, ny, nz, size
+        Py_ssize_t max_cells, cached_cells
+        bint single_precision, on_demand
+
+    cdef:
+        double[:,::1] _double_view
+        float[:,::1] _float_view
+        int8_t[::1] _calculated_view
+        dict _slots
+        Py_ssize_t[::1] _cell_view, _previous_view, _next_view
+        Py_ssize_t _capacity, _head, _tail
+
+    cdef bint fetch(self, int i, int j, int k, double *coeffs) except -1
+
+    cdef int store(self, int i, int j, int k, double *coeffs) except -1
+
+    cdef Py_ssize_t _cell(self, int i, int j, int k)
+
+    cdef int _grow(self) except -1
+
+    cdef void _unlink(self, Py_ssize_t slot)
+
+    cdef void _push_front(self, Py_ssize_t slot)
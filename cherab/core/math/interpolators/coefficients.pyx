@@ -0,0 +1,472 @@
+# cython: language_level=3
+
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+import json
+import os
+from hashlib import sha1
+from numpy import asarray, ascontiguousarray, empty, zeros, memmap, prod, int8, intp, float32, float64
+
+cimport cython
+from numpy cimport import_array
+
+# required by numpy c-api
+import_array()
+
+# initial number of slots allocated when the cells are stored on demand
+DEF INITIAL_CAPACITY = 1024
+
+# identifies the cache files, the last byte is the format version
+_CACHE_FILE_MAGIC = b'CHERAB\x00\x01'
+
+# alignment of the arrays in the cache files, in bytes
+_CACHE_FILE_ALIGNMENT = 64
+
+
+def grid_fingerprint(*axes):
+    """
+    Returns a digest of the coordinate arrays defining a grid.
+
+    :param axes: the coordinate arrays of each axis.
+    :return: a hexadecimal string.
+    """
+
+    digest = sha1()
+    for axis in axes:
+        axis = ascontiguousarray(axis, dtype=float64)
+        digest.update(str(axis.shape).encode())
+        digest.update(axis.tobytes())
+    return digest.hexdigest()
+
+
+def save_arrays(str path, dict key, dict arrays):
+    """
+    Saves arrays to a file that can be memory mapped with load_arrays().
+
+    The file holds a JSON header, made of the key and the description of the
+    arrays, followed by the raw arrays. The file is written to a temporary
+    file first and then renamed, so that processes loading it concurrently
+    never see a partially written file.
+
+    :param str path: path of the file.
+    :param dict key: JSON serialisable description of the content of the
+    file, it must be supplied again to load the file.
+    :param dict arrays: the arrays to save, by name.
+    """
+
+    cdef Py_ssize_t offset = 0, start
+
+    entries = {}
+    contiguous = {}
+    for name, data in arrays.items():
+        data = ascontiguousarray(data)
+        contiguous[name] = data
+        entries[name] = {'dtype': data.dtype.str, 'shape': list(data.shape), 'offset': offset}
+        offset += -(-data.nbytes // _CACHE_FILE_ALIGNMENT) * _CACHE_FILE_ALIGNMENT
+
+    header = json.dumps({'key': key, 'arrays': entries}, sort_keys=True).encode()
+    start = len(_CACHE_FILE_MAGIC) + 8 + len(header)
+    start = -(-start // _CACHE_FILE_ALIGNMENT) * _CACHE_FILE_ALIGNMENT
+
+    temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(temporary_path, 'wb') as file:
+            file.write(_CACHE_FILE_MAGIC)
+            file.write(len(header).to_bytes(8, 'little'))
+            file.write(header)
+            for name, data in contiguous.items():
+                file.seek(start + entries[name]['offset'])
+                file.write(memoryview(data).cast('B'))
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def load_arrays(str path, dict key):
+    """
+    Loads the arrays of a file written by save_arrays().
+
+    The arrays are memory mapped in copy-on-write mode: the pages of the file
+    are shared by all the processes loading it, and modifying an array never
+    modifies the file.
+
+    :param str path: path of the file.
+    :param dict key: description of the content of the file, it must match
+    the key the file was saved with.
+    :return: a dictionary of the arrays, by name.
+    """
+
+    cdef Py_ssize_t length, start
+
+    with open(path, 'rb') as file:
+        if file.read(len(_CACHE_FILE_MAGIC)) != _CACHE_FILE_MAGIC:
+            raise ValueError("The file '{}' is not a cache file.".format(path))
+        length = int.from_bytes(file.read(8), 'little')
+        header = json.loads(file.read(length).decode())
+
+    # the key is normalised the same way as when it was saved
+    if header['key'] != json.loads(json.dumps(key, sort_keys=True)):
+        raise ValueError("The cache file '{}' was saved for a different grid or function.".format(path))
+
+    start = len(_CACHE_FILE_MAGIC) + 8 + length
+    start = -(-start // _CACHE_FILE_ALIGNMENT) * _CACHE_FILE_ALIGNMENT
+
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        shape = tuple(entry['shape'])
+        if prod(shape) == 0:
+            # empty arrays can not be memory mapped
+            arrays[name] = empty(shape, dtype=entry['dtype'])
+        else:
+            arrays[name] = memmap(path, dtype=entry['dtype'], mode='c', offset=start + entry['offset'], shape=shape)
+    return arrays
+
+
+cdef class CoefficientCache3D:
+    """
+    Stores the polynomial coefficients of the cells of a 3D grid.
+
+    By default an array holding the coefficients of every cell of the grid
+    is allocated up front. If max_cells is set, the coefficients are instead
+    allocated on demand as the cells are stored, and no more than max_cells
+    cells are kept: once the limit is reached the least recently used cell is
+    discarded to make room for the new one. A discarded cell is simply
+    calculated again the next time it is needed.
+
+    The coefficients can also be stored in single precision, which halves the
+    memory used at the cost of a relative accuracy of ~1e-7 on the
+    interpolated values.
+
+    :param tuple shape: number of cells along each axis: (nx, ny, nz)
+    :param int size: number of coefficients of each cell
+    :param object max_cells: maximum number of cells kept in memory. If None
+    (default), the coefficients of every cell are kept.
+    :param bint single_precision: If True, the coefficients are stored as 32
+    bit floats. Default is False.
+    """
+
+    def __init__(self, tuple shape, int size, object max_cells=None, bint single_precision=False):
+
+        self.nx, self.ny, self.nz = shape
+        self.size = size
+        self.single_precision = single_precision
+
+        if self.nx < 0 or self.ny < 0 or self.nz < 0:
+            raise ValueError("The number of cells must be positive.")
+
+        if size < 1:
+            raise ValueError("The number of coefficients per cell must be strictly positive.")
+
+        if max_cells is None:
+            self.on_demand = False
+            self.max_cells = <Py_ssize_t> self.nx * self.ny * self.nz
+            self._capacity = self.max_cells
+            self._calculated_view = zeros((self._capacity,), dtype=int8)
+
+        else:
+            if max_cells < 1:
+                raise ValueError("The maximum number of cached cells must be strictly positive.")
+            self.on_demand = True
+            self.max_cells = min(max_cells, <Py_ssize_t> self.nx * self.ny * self.nz)
+            self._capacity = min(self.max_cells, INITIAL_CAPACITY)
+            self._slots = {}
+            self._cell_view = empty((self._capacity,), dtype=intp)
+            self._previous_view = empty((self._capacity,), dtype=intp)
+            self._next_view = empty((self._capacity,), dtype=intp)
+
+        if single_precision:
+            self._float_view = empty((self._capacity, size), dtype=float32)
+        else:
+            self._double_view = empty((self._capacity, size), dtype=float64)
+
+        self.cached_cells = 0
+        self._head = -1
+        self._tail = -1
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the stored coefficients in bytes.
+        """
+
+        return self._capacity * self.size * (4 if self.single_precision else 8)
+
+    def clear(self):
+        """
+        Discards all the stored coefficients.
+        """
+
+        if self.on_demand:
+            self._slots.clear()
+        else:
+            self._calculated_view[:] = False
+        self.cached_cells = 0
+        self._head = -1
+        self._tail = -1
+
+    def set_all(self, object coeffs):
+        """
+        Stores the coefficients of every cell at once.
+
+        Only available if the coefficients of every cell are kept.
+
+        :param object coeffs: An array-like object of shape (nx, ny, nz, size).
+        """
+
+        if self.on_demand:
+            raise ValueError("The coefficients of every cell can not be set when the number of cached cells is limited.")
+
+        coeffs = asarray(coeffs)
+        if coeffs.shape != (self.nx, self.ny, self.nz, self.size):
+            raise ValueError("The coefficients array must have the shape {}.".format((self.nx, self.ny, self.nz, self.size)))
+
+        if self.single_precision:
+            asarray(self._float_view)[:] = coeffs.reshape((self._capacity, self.size))
+        else:
+            asarray(self._double_view)[:] = coeffs.reshape((self._capacity, self.size))
+        self._calculated_view[:] = True
+        self.cached_cells = self._capacity
+
+    def arrays(self):
+        """
+        Returns the arrays holding the coefficients and the flags of the
+        calculated cells.
+
+        Only available if the coefficients of every cell are kept.
+
+        :return: a tuple of the coefficients array, of shape (nx*ny*nz, size),
+        and of the flags array, of shape (nx*ny*nz,).
+        """
+
+        if self.on_demand:
+            raise ValueError("The coefficients arrays are not available when the number of cached cells is limited.")
+
+        if self.single_precision:
+            return asarray(self._float_view), asarray(self._calculated_view)
+        return asarray(self._double_view), asarray(self._calculated_view)
+
+    def set_arrays(self, object coefficients, object calculated):
+        """
+        Replaces the arrays holding the coefficients and the flags of the
+        calculated cells.
+
+        The arrays are used without being copied, they may for instance be
+        memory mapped from a file. Only available if the coefficients of every
+        cell are kept.
+
+        :param object coefficients: array of shape (nx*ny*nz, size), of type
+        float32 if the coefficients are stored in single precision and float64
+        otherwise.
+        :param object calculated: int8 array of shape (nx*ny*nz,).
+        """
+
+        if self.on_demand:
+            raise ValueError("The coefficients arrays can not be set when the number of cached cells is limited.")
+
+        coefficients = asarray(coefficients)
+        calculated = asarray(calculated)
+
+        if coefficients.shape != (self._capacity, self.size) or calculated.shape != (self._capacity,):
+            raise ValueError("The coefficients arrays do not match the number of cells.")
+
+        if coefficients.dtype != (float32 if self.single_precision else float64) or calculated.dtype != int8:
+            raise ValueError("The coefficients arrays do not have the expected types.")
+
+        if self.single_precision:
+            self._float_view = coefficients
+        else:
+            self._double_view = coefficients
+        self._calculated_view = calculated
+        self.cached_cells = calculated.sum()
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef bint fetch(self, int i, int j, int k, double *coeffs) except -1:
+        """
+        Copies the coefficients of the cell (i, j, k) to coeffs.
+
+        :param int i, int j, int k: indices of the cell
+        :param double *coeffs: array receiving the 'size' coefficients
+        :return: False if the cell is not stored, True otherwise.
+        """
+
+        cdef:
+            object slot_object
+            Py_ssize_t slot
+            int l
+
+        if self.on_demand:
+            slot_object = self._slots.get(self._cell(i, j, k))
+            if slot_object is None:
+                return False
+            slot = slot_object
+
+            # mark the cell as the most recently used
+            if slot != self._head:
+                self._unlink(slot)
+                self._push_front(slot)
+
+        else:
+            slot = self._cell(i, j, k)
+            if not self._calculated_view[slot]:
+                return False
+
+        if self.single_precision:
+            for l in range(self.size):
+                coeffs[l] = self._float_view[slot, l]
+        else:
+            for l in range(self.size):
+                coeffs[l] = self._double_view[slot, l]
+
+        return True
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int store(self, int i, int j, int k, double *coeffs) except -1:
+        """
+        Stores the coefficients of the cell (i, j, k).
+
+        In single precision the coefficients are also rounded in place to the
+        stored values, so that the caller evaluates the cell exactly as it
+        will be evaluated once fetched.
+
+        :param int i, int j, int k: indices of the cell
+        :param double *coeffs: array of the 'size' coefficients
+        """
+
+        cdef:
+            object slot_object
+            Py_ssize_t cell, slot
+            int l
+
+        cell = self._cell(i, j, k)
+
+        if self.on_demand:
+
+            slot_object = self._slots.get(cell)
+
+            if slot_object is not None:
+                slot = slot_object
+                self._unlink(slot)
+
+            elif self.cached_cells < self.max_cells:
+                if self.cached_cells == self._capacity:
+                    self._grow()
+                slot = self.cached_cells
+                self.cached_cells += 1
+
+            else:
+                # recycle the least recently used cell
+                slot = self._tail
+                del self._slots[self._cell_view[slot]]
+                self._unlink(slot)
+
+            self._slots[cell] = slot
+            self._cell_view[slot] = cell
+            self._push_front(slot)
+
+        else:
+            slot = cell
+            if not self._calculated_view[slot]:
+                self._calculated_view[slot] = True
+                self.cached_cells += 1
+
+        if self.single_precision:
+            for l in range(self.size):
+                self._float_view[slot, l] = <float> coeffs[l]
+                coeffs[l] = self._float_view[slot, l]
+        else:
+            for l in range(self.size):
+                self._double_view[slot, l] = coeffs[l]
+
+        return 0
+
+    cdef Py_ssize_t _cell(self, int i, int j, int k):
+        """
+        Returns the flat index of the cell (i, j, k).
+        """
+
+        return (<Py_ssize_t> i * self.ny + j) * self.nz + k
+
+    cdef int _grow(self) except -1:
+        """
+        Doubles the number of slots, without exceeding max_cells.
+        """
+
+        cdef Py_ssize_t capacity = min(2 * self._capacity, self.max_cells)
+
+        if self.single_precision:
+            float_np = empty((capacity, self.size), dtype=float32)
+            float_np[:self._capacity] = self._float_view
+            self._float_view = float_np
+        else:
+            double_np = empty((capacity, self.size), dtype=float64)
+            double_np[:self._capacity] = self._double_view
+            self._double_view = double_np
+
+        cell_np = empty((capacity,), dtype=intp)
+        cell_np[:self._capacity] = self._cell_view
+        self._cell_view = cell_np
+
+        previous_np = empty((capacity,), dtype=intp)
+        previous_np[:self._capacity] = self._previous_view
+        self._previous_view = previous_np
+
+        next_np = empty((capacity,), dtype=intp)
+        next_np[:self._capacity] = self._next_view
+        self._next_view = next_np
+
+        self._capacity = capacity
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _unlink(self, Py_ssize_t slot):
+        """
+        Removes a slot from the list of slots ordered by last use.
+        """
+
+        cdef Py_ssize_t previous = self._previous_view[slot], following = self._next_view[slot]
+
+        if previous == -1:
+            self._head = following
+        else:
+            self._next_view[previous] = following
+
+        if following == -1:
+            self._tail = previous
+        else:
+            self._previous_view[following] = previous
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _push_front(self, Py_ssize_t slot):
+        """
+        Inserts a slot at the head (most recently used) of the list of slots.
+        """
+
+        self._previous_view[slot] = -1
+        self._next_view[slot] = self._head
+        if self._head != -1:
+            self._previous_view[self._head] = slot
+        self._head = slot
+        if self._tail == -1:
+            self._tail = slot
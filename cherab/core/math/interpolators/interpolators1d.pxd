@@ -29,6 +29,10 @@ cdef class _Interpolate1DBase(Function1D):
         int extrapolation_type
         double extrapolation_range
         int top_index
+        double x_inverse_spacing
+
+    cdef:
+        int _x_hint
 
     cdef double evaluate(self, double px) except? -1e999
 
@@ -23,7 +23,7 @@ from numpy.linalg import solve
 
 cimport cython
 from numpy cimport ndarray
-from cherab.core.math.interpolators.utility cimport find_index, lerp, derivatives_array, factorial
+from cherab.core.math.interpolators.utility cimport find_index, inverse_uniform_spacing, lerp, derivatives_array, factorial
 
 # internal constants used to represent the different extrapolation options
 DEF EXT_NEAREST = 0
@@ -108,6 +108,9 @@ cdef class _Interpolate1DBase(Function1D):
             if (self.x_np == self.x_np[arange(len(self.x_np))-1]).any():
                 raise ValueError("The coordinates array has a duplicate value.")
 
+        # uniformly spaced coordinates are looked up without searching
+        self.x_inverse_spacing = inverse_uniform_spacing(self.x_domain_view, self.top_index+1)
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef double evaluate(self, double px) except? -1e999:
@@ -120,7 +123,7 @@ cdef class _Interpolate1DBase(Function1D):
 
         cdef int index
 
-        index = find_index(self.x_domain_view, self.top_index+1, px, self.extrapolation_range)
+        index = find_index(self.x_domain_view, self.top_index+1, px, self.extrapolation_range, self.x_inverse_spacing, &self._x_hint)
 
         if 0 <= index <= self.top_index-1:
             return self._evaluate(px, index)
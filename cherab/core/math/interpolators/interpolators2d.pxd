@@ -29,6 +29,10 @@ cdef class _Interpolate2DBase(Function2D):
         int extrapolation_type
         double extrapolation_range
         int top_index_x, top_index_y
+        double x_inverse_spacing, y_inverse_spacing
+
+    cdef:
+        int _x_hint, _y_hint
 
     cdef double evaluate(self, double px, double py) except? -1e999
 
@@ -56,8 +60,7 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
 
     cdef readonly:
         double x_min, x_delta_inv, y_min, y_delta_inv, data_min, data_delta
-        double[::1] x_view, x2_view, x3_view
-        double[::1] y_view, y2_view, y3_view
+        double[::1] x_view, y_view
         double[:,:] data_view
         double[:,:,::1] coeffs_view
         int8_t[:,::1] calculated_view
@@ -65,3 +68,7 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
     cdef int _calculate_polynomial(self, int i_x, int i_y) except -1
 
     cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, double px, double py, int der_x, int der_y)
+
+    cdef double _cell_coordinate_x(self, double px, int i_x)
+
+    cdef double _cell_coordinate_y(self, double py, int i_y)
@@ -18,12 +18,13 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from numpy import array, empty, int8, float64, shape, concatenate, argsort, arange
-from numpy.linalg import solve
+from numpy import array, asarray, empty, int8, float64, shape, concatenate, argsort, arange, einsum, newaxis
 
 cimport cython
-from numpy cimport ndarray, PyArray_ZEROS, NPY_FLOAT64, npy_intp, import_array
-from cherab.core.math.interpolators.utility cimport find_index, lerp, derivatives_array, factorial
+from numpy cimport ndarray, import_array
+from cherab.core.math.interpolators.utility cimport find_index, inverse_uniform_spacing, lerp, derivatives_array, bicubic_coefficients
+from cherab.core.math.interpolators.utility import HERMITE_MATRIX
+from cherab.core.math.interpolators.coefficients import save_arrays, load_arrays, grid_fingerprint
 
 # required by numpy c-api
 import_array()
@@ -130,6 +131,10 @@ cdef class _Interpolate2DBase(Function2D):
             if (self.y_np == self.y_np[arange(len(self.y_np))-1]).any():
                 raise ValueError("The y coordinates array has a duplicate value.")
 
+        # uniformly spaced coordinates are looked up without searching
+        self.x_inverse_spacing = inverse_uniform_spacing(self.x_domain_view, self.top_index_x+1)
+        self.y_inverse_spacing = inverse_uniform_spacing(self.y_domain_view, self.top_index_y+1)
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef double evaluate(self, double px, double py) except? -1e999:
@@ -142,8 +147,8 @@ cdef class _Interpolate2DBase(Function2D):
 
         cdef int i_x, i_y
 
-        i_x = find_index(self.x_domain_view, self.top_index_x+1, px, self.extrapolation_range)
-        i_y = find_index(self.y_domain_view, self.top_index_y+1, py, self.extrapolation_range)
+        i_x = find_index(self.x_domain_view, self.top_index_x+1, px, self.extrapolation_range, self.x_inverse_spacing, &self._x_hint)
+        i_y = find_index(self.y_domain_view, self.top_index_y+1, py, self.extrapolation_range, self.y_inverse_spacing, &self._y_hint)
 
         if 0 <= i_x <= self.top_index_x-1:
             if 0 <= i_y <= self.top_index_y-1:
@@ -355,7 +360,8 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
     A local calculation based on finite differences is used. The
     splines coefficients are not calculated before evaluation but on demand
     only and are cached as they are calculated. Plus, only one polynomial
-    is calculated at each evaluation. The first derivatives and the cross
+    is calculated at each evaluation. All the coefficients may be calculated
+    up front with calculate_coefficients(). The first derivatives and the cross
     derivative are imposed by the finite differences. The resulting
     function is C1.
 
@@ -430,11 +436,107 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
 
         # obtain coordinates memory views
         self.x_view = self.x_np
-        self.x2_view = self.x_np*self.x_np
-        self.x3_view = self.x_np*self.x_np*self.x_np
         self.y_view = self.y_np
-        self.y2_view = self.y_np*self.y_np
-        self.y3_view = self.y_np*self.y_np*self.y_np
+
+    def calculate_coefficients(self):
+        """
+        Calculates the polynomial coefficients of all the areas at once.
+
+        By default the coefficients of an area are calculated the first time
+        the area is evaluated. This method calculates every area with
+        vectorised NumPy operations instead, which is faster if most of the
+        areas are going to be evaluated.
+        """
+
+        cdef int i, j, nx, ny
+
+        x = asarray(self.x_view)
+        y = asarray(self.y_view)
+        d = asarray(self.data_view)
+
+        c = slice(1, -1)
+        p = slice(2, None)
+        m = slice(None, -2)
+
+        # finite differences on the nodes, the arrays are widened by one node at each end
+        dx = (x[p] - x[m])[:, newaxis]
+        dy = (y[p] - y[m])[newaxis, :]
+        f = d[c, c]
+        fx = (d[p, c] - d[m, c]) / dx
+        fy = (d[c, p] - d[c, m]) / dy
+        fxy = (d[p, p] - d[p, m] - d[m, p] + d[m, m]) / (dx * dy)
+
+        # area widths
+        hx = (x[2:-1] - x[1:-2])[:, newaxis]
+        hy = (y[2:-1] - y[1:-2])[newaxis, :]
+
+        # constraints of every area, see bicubic_coefficients() for the layout
+        nx = self.top_index_x
+        ny = self.top_index_y
+        b = empty((nx, ny, 4, 4), dtype=float64)
+        for i in range(2):
+            for j in range(2):
+                corner = (slice(i, i + nx), slice(j, j + ny))
+                b[:, :, i, j] = f[corner]
+                b[:, :, i+2, j] = hx * fx[corner]
+                b[:, :, i, j+2] = hy * fy[corner]
+                b[:, :, i+2, j+2] = hx * hy * fxy[corner]
+
+        # closed form solution of the constraints, applied axis by axis
+        b = einsum('ip,...pq->...iq', HERMITE_MATRIX, b)
+        b = einsum('jq,...iq->...ij', HERMITE_MATRIX, b)
+
+        # Denormalisation of the data values
+        coeffs = self.data_delta * b.reshape((nx, ny, 16))
+        coeffs[:, :, 0] += self.data_min
+
+        asarray(self.coeffs_view)[:] = coeffs
+        asarray(self.calculated_view)[:] = True
+
+    def save(self, str path, str fingerprint):
+        """
+        Saves the calculated coefficients to a file.
+
+        The file can be loaded by any Interpolate2DCubic interpolating the
+        same data on the same grid, see load().
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the interpolated data, it must be
+        supplied again to load the file.
+        """
+
+        save_arrays(path, self._cache_key(fingerprint), {'coefficients': asarray(self.coeffs_view), 'calculated': asarray(self.calculated_view)})
+
+    def load(self, str path, str fingerprint):
+        """
+        Loads the coefficients saved by save().
+
+        The file is memory mapped, so that the processes loading it share the
+        same memory. The cells missing from the file are still calculated on
+        demand, without modifying the file. A ValueError is raised if the file
+        was saved for different data, a different grid or fingerprint.
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the interpolated data.
+        """
+
+        arrays = load_arrays(path, self._cache_key(fingerprint))
+        self.coeffs_view = arrays['coefficients']
+        self.calculated_view = arrays['calculated']
+
+    def _cache_key(self, str fingerprint):
+        """
+        Returns the description of the content of the cache files.
+        """
+
+        return {
+            'class': 'Interpolate2DCubic',
+            'grid': grid_fingerprint(self.x_domain_view, self.y_domain_view),
+            'data': grid_fingerprint(self.data_view),
+            'data_min': self.data_min,
+            'data_delta': self.data_delta,
+            'fingerprint': fingerprint
+        }
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -448,22 +550,27 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
         :return: the interpolated value
         """
 
-        cdef double px2, py2, px3, py3
+        cdef double tx, ty, tx2, ty2, tx3, ty3
 
         # If the concerned polynomial has not yet been calculated:
         if not self.calculated_view[i_x, i_y]:
             self._calculate_polynomial(i_x, i_y)
 
-        px2 = px*px
-        px3 = px2*px
-        py2 = py*py
-        py3 = py2*py
+        # the polynomial is expressed in the area coordinates
+        tx = self._cell_coordinate_x(px, i_x)
+        ty = self._cell_coordinate_y(py, i_y)
 
-        return     (self.coeffs_view[i_x, i_y,  0] + self.coeffs_view[i_x, i_y,  1]*py + self.coeffs_view[i_x, i_y,  2]*py2 + self.coeffs_view[i_x, i_y,  3]*py3) + \
-               px *(self.coeffs_view[i_x, i_y,  4] + self.coeffs_view[i_x, i_y,  5]*py + self.coeffs_view[i_x, i_y,  6]*py2 + self.coeffs_view[i_x, i_y,  7]*py3) + \
-               px2*(self.coeffs_view[i_x, i_y,  8] + self.coeffs_view[i_x, i_y,  9]*py + self.coeffs_view[i_x, i_y, 10]*py2 + self.coeffs_view[i_x, i_y, 11]*py3) + \
-               px3*(self.coeffs_view[i_x, i_y, 12] + self.coeffs_view[i_x, i_y, 13]*py + self.coeffs_view[i_x, i_y, 14]*py2 + self.coeffs_view[i_x, i_y, 15]*py3)
+        tx2 = tx*tx
+        tx3 = tx2*tx
+        ty2 = ty*ty
+        ty3 = ty2*ty
 
+        return     (self.coeffs_view[i_x, i_y,  0] + self.coeffs_view[i_x, i_y,  1]*ty + self.coeffs_view[i_x, i_y,  2]*ty2 + self.coeffs_view[i_x, i_y,  3]*ty3) + \
+               tx *(self.coeffs_view[i_x, i_y,  4] + self.coeffs_view[i_x, i_y,  5]*ty + self.coeffs_view[i_x, i_y,  6]*ty2 + self.coeffs_view[i_x, i_y,  7]*ty3) + \
+               tx2*(self.coeffs_view[i_x, i_y,  8] + self.coeffs_view[i_x, i_y,  9]*ty + self.coeffs_view[i_x, i_y, 10]*ty2 + self.coeffs_view[i_x, i_y, 11]*ty3) + \
+               tx3*(self.coeffs_view[i_x, i_y, 12] + self.coeffs_view[i_x, i_y, 13]*ty + self.coeffs_view[i_x, i_y, 14]*ty2 + self.coeffs_view[i_x, i_y, 15]*ty3)
+
+    @cython.cdivision(True)
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef int _calculate_polynomial(self, int i_x, int i_y) except -1:
@@ -475,106 +582,42 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
         """
 
         cdef:
-            int u, v, l, i, j
-            double delta_x, delta_y
-            npy_intp cv_size
-            npy_intp cm_size[2]
-            double[::1] cv_view, coeffs_view
-            double[:, ::1] cm_view
+            int u, v, i, j
+            double hx, hy, delta_x, delta_y
+            double b[16]
 
-        # Create constraint matrix (un-optimised)
-        # cv_view = zeros((16,), dtype=float64)     # constraints vector
-        # cm_view = zeros((16, 16), dtype=float64)  # constraints matrix
+        # area widths, the derivatives are scaled to the area coordinates
+        hx = self.x_view[i_x+2] - self.x_view[i_x+1]
+        hy = self.y_view[i_y+2] - self.y_view[i_y+1]
 
-        # Create constraint matrix (optimised using numpy c-api)
-        cv_size = 16
-        cv_view = PyArray_ZEROS(1, &cv_size, NPY_FLOAT64, 0)
-        cm_size[:] = [16, 16]
-        cm_view = PyArray_ZEROS(2, cm_size, NPY_FLOAT64, 0)
+        # Fill the constraints, see bicubic_coefficients() for the layout
+        for i in range(2):
+            for j in range(2):
 
-        # Fill the constraints matrix
-
-        l = 0
-        for u in range(i_x+1, i_x+3):
-            for v in range(i_y+1, i_y+3):
+                u = i_x + 1 + i
+                v = i_y + 1 + j
 
                 # knot values
-                cm_view[l, 0] = 1.
-                cm_view[l, 1] = self.y_view[v]
-                cm_view[l, 2] = self.y2_view[v]
-                cm_view[l, 3] = self.y3_view[v]
-                cm_view[l, 4] = self.x_view[u]
-                cm_view[l, 5] = self.x_view[u]*self.y_view[v]
-                cm_view[l, 6] = self.x_view[u]*self.y2_view[v]
-                cm_view[l, 7] = self.x_view[u]*self.y3_view[v]
-                cm_view[l, 8] = self.x2_view[u]
-                cm_view[l, 9] = self.x2_view[u]*self.y_view[v]
-                cm_view[l, 10] = self.x2_view[u]*self.y2_view[v]
-                cm_view[l, 11] = self.x2_view[u]*self.y3_view[v]
-                cm_view[l, 12] = self.x3_view[u]
-                cm_view[l, 13] = self.x3_view[u]*self.y_view[v]
-                cm_view[l, 14] = self.x3_view[u]*self.y2_view[v]
-                cm_view[l, 15] = self.x3_view[u]*self.y3_view[v]
-                cv_view[l] = self.data_view[u, v]
-                l += 1
+                b[4*i + j] = self.data_view[u, v]
 
                 # derivative along x
-                cm_view[l, 4] = 1.
-                cm_view[l, 5] = self.y_view[v]
-                cm_view[l, 6] = self.y2_view[v]
-                cm_view[l, 7] = self.y3_view[v]
-                cm_view[l, 8] = 2.*self.x_view[u]
-                cm_view[l, 9] = 2.*self.x_view[u]*self.y_view[v]
-                cm_view[l, 10] = 2.*self.x_view[u]*self.y2_view[v]
-                cm_view[l, 11] = 2.*self.x_view[u]*self.y3_view[v]
-                cm_view[l, 12] = 3.*self.x2_view[u]
-                cm_view[l, 13] = 3.*self.x2_view[u]*self.y_view[v]
-                cm_view[l, 14] = 3.*self.x2_view[u]*self.y2_view[v]
-                cm_view[l, 15] = 3.*self.x2_view[u]*self.y3_view[v]
                 delta_x = self.x_view[u+1] - self.x_view[u-1]
-                cv_view[l] = (self.data_view[u+1, v] - self.data_view[u-1, v])/delta_x
-                l += 1
+                b[4*(i+2) + j] = hx * (self.data_view[u+1, v] - self.data_view[u-1, v])/delta_x
 
                 # derivative along y
-                cm_view[l, 1] = 1.
-                cm_view[l, 2] = 2.*self.y_view[v]
-                cm_view[l, 3] = 3.*self.y2_view[v]
-                cm_view[l, 5] = self.x_view[u]
-                cm_view[l, 6] = 2.*self.x_view[u]*self.y_view[v]
-                cm_view[l, 7] = 3.*self.x_view[u]*self.y2_view[v]
-                cm_view[l, 9] = self.x2_view[u]
-                cm_view[l, 10] = 2.*self.x2_view[u]*self.y_view[v]
-                cm_view[l, 11] = 3.*self.x2_view[u]*self.y2_view[v]
-                cm_view[l, 13] = self.x3_view[u]
-                cm_view[l, 14] = 2.*self.x3_view[u]*self.y_view[v]
-                cm_view[l, 15] = 3.*self.x3_view[u]*self.y2_view[v]
                 delta_y = self.y_view[v+1] - self.y_view[v-1]
-                cv_view[l] = (self.data_view[u, v+1] - self.data_view[u, v-1])/delta_y
-                l += 1
+                b[4*i + j+2] = hy * (self.data_view[u, v+1] - self.data_view[u, v-1])/delta_y
 
                 # cross derivative
-                cm_view[l, 5] = 1.
-                cm_view[l, 6] = 2.*self.y_view[v]
-                cm_view[l, 7] = 3.*self.y2_view[v]
-                cm_view[l, 9] = 2.*self.x_view[u]
-                cm_view[l, 10] = 4.*self.x_view[u]*self.y_view[v]
-                cm_view[l, 11] = 6.*self.x_view[u]*self.y2_view[v]
-                cm_view[l, 13] = 3.*self.x2_view[u]
-                cm_view[l, 14] = 6.*self.x2_view[u]*self.y_view[v]
-                cm_view[l, 15] = 9.*self.x2_view[u]*self.y2_view[v]
-                cv_view[l] = (self.data_view[u+1, v+1] - self.data_view[u+1, v-1] - self.data_view[u-1, v+1] + self.data_view[u-1, v-1])/(delta_x*delta_y)
-                l += 1
-
-        # Solve the linear system and fill the caching coefficients array
-        coeffs_view = solve(cm_view, cv_view)
-        self.coeffs_view[i_x, i_y, :] = coeffs_view
-
-        # Denormalisation
-        for i in range(4):
-            for j in range(4):
-                coeffs_view[4 * i + j] = self.data_delta * (self.x_delta_inv ** i * self.y_delta_inv ** j / (factorial(j) * factorial(i)) * self._evaluate_polynomial_derivative(i_x, i_y, -self.x_delta_inv * self.x_min, -self.y_delta_inv * self.y_min, i, j))
-        coeffs_view[0] = coeffs_view[0] + self.data_min
-        self.coeffs_view[i_x, i_y, :] = coeffs_view
+                b[4*(i+2) + j+2] = hx * hy * (self.data_view[u+1, v+1] - self.data_view[u+1, v-1] - self.data_view[u-1, v+1] + self.data_view[u-1, v-1])/(delta_x*delta_y)
+
+        # closed form solution of the constraints
+        bicubic_coefficients(b)
+
+        # Denormalisation of the data values
+        for i in range(16):
+            self.coeffs_view[i_x, i_y, i] = self.data_delta * b[i]
+        self.coeffs_view[i_x, i_y, 0] += self.data_min
 
         self.calculated_view[i_x, i_y] = True
 
@@ -592,32 +635,18 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
         :return: the extrapolated value
         """
 
-        cdef double delta_x, delta_y, nx, nx2, nx3, ny, ny2, ny3, result
+        cdef double delta_x, delta_y, result
 
         delta_x = px - nearest_px
         delta_y = py - nearest_py
 
-        nx = nearest_px
-        nx2 = nx*nx
-        nx3 = nx2*nx
-        ny = nearest_py
-        ny2 = ny*ny
-        ny3 = ny2*ny
-
-        result = self._evaluate(nx, ny, i_x, i_y)
+        result = self._evaluate(nearest_px, nearest_py, i_x, i_y)
 
         if delta_x != 0.:
-
-            result += delta_x * (       (self.coeffs_view[i_x, i_y,  4] + self.coeffs_view[i_x, i_y,  5]*ny + self.coeffs_view[i_x, i_y,  6]*ny2 + self.coeffs_view[i_x, i_y,  7]*ny3) + \
-                                 2.*nx *(self.coeffs_view[i_x, i_y,  8] + self.coeffs_view[i_x, i_y,  9]*ny + self.coeffs_view[i_x, i_y, 10]*ny2 + self.coeffs_view[i_x, i_y, 11]*ny3) + \
-                                 3.*nx2*(self.coeffs_view[i_x, i_y, 12] + self.coeffs_view[i_x, i_y, 13]*ny + self.coeffs_view[i_x, i_y, 14]*ny2 + self.coeffs_view[i_x, i_y, 15]*ny3))
+            result += delta_x * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 1, 0)
 
         if delta_y != 0.:
-
-            result += delta_y * (    (self.coeffs_view[i_x, i_y,  1] + 2.*self.coeffs_view[i_x, i_y,  2]*ny + 3.*self.coeffs_view[i_x, i_y,  3]*ny2) + \
-                                 nx *(self.coeffs_view[i_x, i_y,  5] + 2.*self.coeffs_view[i_x, i_y,  6]*ny + 3.*self.coeffs_view[i_x, i_y,  7]*ny2) + \
-                                 nx2*(self.coeffs_view[i_x, i_y,  9] + 2.*self.coeffs_view[i_x, i_y, 10]*ny + 3.*self.coeffs_view[i_x, i_y, 11]*ny2) + \
-                                 nx3*(self.coeffs_view[i_x, i_y, 13] + 2.*self.coeffs_view[i_x, i_y, 14]*ny + 3.*self.coeffs_view[i_x, i_y, 15]*ny2))
+            result += delta_y * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 0, 1)
 
         return result
 
@@ -636,46 +665,28 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
         :return: the extrapolated value
         """
 
-        cdef double delta_x, delta_y, nx, nx2, nx3, ny, ny2, ny3, result
+        cdef double delta_x, delta_y, result
 
         delta_x = px - nearest_px
         delta_y = py - nearest_py
 
-        nx = nearest_px
-        nx2 = nx*nx
-        nx3 = nx2*nx
-        ny = nearest_py
-        ny2 = ny*ny
-        ny3 = ny2*ny
-
-        result = self._evaluate(nx, ny, i_x, i_y)
+        result = self._evaluate(nearest_px, nearest_py, i_x, i_y)
 
         if delta_x != 0.:
 
-            result += delta_x * (       (self.coeffs_view[i_x, i_y,  4] + self.coeffs_view[i_x, i_y,  5]*ny + self.coeffs_view[i_x, i_y,  6]*ny2 + self.coeffs_view[i_x, i_y,  7]*ny3) + \
-                                 2.*nx *(self.coeffs_view[i_x, i_y,  8] + self.coeffs_view[i_x, i_y,  9]*ny + self.coeffs_view[i_x, i_y, 10]*ny2 + self.coeffs_view[i_x, i_y, 11]*ny3) + \
-                                 3.*nx2*(self.coeffs_view[i_x, i_y, 12] + self.coeffs_view[i_x, i_y, 13]*ny + self.coeffs_view[i_x, i_y, 14]*ny2 + self.coeffs_view[i_x, i_y, 15]*ny3))
+            result += delta_x * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 1, 0)
 
-            result += delta_x*delta_x*0.5 * (2.   *(self.coeffs_view[i_x, i_y,  8] + self.coeffs_view[i_x, i_y,  9]*ny + self.coeffs_view[i_x, i_y, 10]*ny2 + self.coeffs_view[i_x, i_y, 11]*ny3) + \
-                                             6.*nx*(self.coeffs_view[i_x, i_y, 12] + self.coeffs_view[i_x, i_y, 13]*ny + self.coeffs_view[i_x, i_y, 14]*ny2 + self.coeffs_view[i_x, i_y, 15]*ny3))
+            result += delta_x*delta_x*0.5 * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 2, 0)
 
         if delta_y != 0.:
 
-            result += delta_y * (    (self.coeffs_view[i_x, i_y,  1] + 2.*self.coeffs_view[i_x, i_y,  2]*ny + 3.*self.coeffs_view[i_x, i_y,  3]*ny2) + \
-                                 nx *(self.coeffs_view[i_x, i_y,  5] + 2.*self.coeffs_view[i_x, i_y,  6]*ny + 3.*self.coeffs_view[i_x, i_y,  7]*ny2) + \
-                                 nx2*(self.coeffs_view[i_x, i_y,  9] + 2.*self.coeffs_view[i_x, i_y, 10]*ny + 3.*self.coeffs_view[i_x, i_y, 11]*ny2) + \
-                                 nx3*(self.coeffs_view[i_x, i_y, 13] + 2.*self.coeffs_view[i_x, i_y, 14]*ny + 3.*self.coeffs_view[i_x, i_y, 15]*ny2))
+            result += delta_y * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 0, 1)
 
-            result += delta_y*delta_y*0.5 * (    (2.*self.coeffs_view[i_x, i_y,  2] + 6.*self.coeffs_view[i_x, i_y,  3]*ny) + \
-                                             nx *(2.*self.coeffs_view[i_x, i_y,  6] + 6.*self.coeffs_view[i_x, i_y,  7]*ny) + \
-                                             nx2*(2.*self.coeffs_view[i_x, i_y, 10] + 6.*self.coeffs_view[i_x, i_y, 11]*ny) + \
-                                             nx3*(2.*self.coeffs_view[i_x, i_y, 14] + 6.*self.coeffs_view[i_x, i_y, 15]*ny))
+            result += delta_y*delta_y*0.5 * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 0, 2)
 
             if delta_x != 0.:
 
-                result += delta_x*delta_y * (       (self.coeffs_view[i_x, i_y,  5] + 2.*self.coeffs_view[i_x, i_y,  6]*ny + 3.*self.coeffs_view[i_x, i_y,  7]*ny2) + \
-                                             2.*nx *(self.coeffs_view[i_x, i_y,  9] + 2.*self.coeffs_view[i_x, i_y, 10]*ny + 3.*self.coeffs_view[i_x, i_y, 11]*ny2) + \
-                                             3.*nx2*(self.coeffs_view[i_x, i_y, 13] + 2.*self.coeffs_view[i_x, i_y, 14]*ny + 3.*self.coeffs_view[i_x, i_y, 15]*ny2))
+                result += delta_x*delta_y * self._evaluate_polynomial_derivative(i_x, i_y, nearest_px, nearest_py, 1, 1)
 
         return result
 
@@ -693,12 +704,41 @@ cdef class Interpolate2DCubic(_Interpolate2DBase):
         :return: value evaluated from the derivated polynomial
         """
 
-        cdef double[::1] x_values, y_values
+        cdef:
+            double[::1] x_values, y_values
+            double scale
 
-        x_values = derivatives_array(px, der_x)
-        y_values = derivatives_array(py, der_y)
+        # the polynomial is expressed in the area coordinates
+        x_values = derivatives_array(self._cell_coordinate_x(px, i_x), der_x)
+        y_values = derivatives_array(self._cell_coordinate_y(py, i_y), der_y)
+        scale = (self.x_delta_inv / (self.x_view[i_x+2] - self.x_view[i_x+1])) ** der_x \
+                * (self.y_delta_inv / (self.y_view[i_y+2] - self.y_view[i_y+1])) ** der_y
 
-        return x_values[0]*(y_values[0]*self.coeffs_view[i_x, i_y,  0] + y_values[1]*self.coeffs_view[i_x, i_y,  1] + y_values[2]*self.coeffs_view[i_x, i_y,  2] + y_values[3]*self.coeffs_view[i_x, i_y,  3]) + \
+        return scale * ( \
+               x_values[0]*(y_values[0]*self.coeffs_view[i_x, i_y,  0] + y_values[1]*self.coeffs_view[i_x, i_y,  1] + y_values[2]*self.coeffs_view[i_x, i_y,  2] + y_values[3]*self.coeffs_view[i_x, i_y,  3]) + \
                x_values[1]*(y_values[0]*self.coeffs_view[i_x, i_y,  4] + y_values[1]*self.coeffs_view[i_x, i_y,  5] + y_values[2]*self.coeffs_view[i_x, i_y,  6] + y_values[3]*self.coeffs_view[i_x, i_y,  7]) + \
                x_values[2]*(y_values[0]*self.coeffs_view[i_x, i_y,  8] + y_values[1]*self.coeffs_view[i_x, i_y,  9] + y_values[2]*self.coeffs_view[i_x, i_y, 10] + y_values[3]*self.coeffs_view[i_x, i_y, 11]) + \
-               x_values[3]*(y_values[0]*self.coeffs_view[i_x, i_y, 12] + y_values[1]*self.coeffs_view[i_x, i_y, 13] + y_values[2]*self.coeffs_view[i_x, i_y, 14] + y_values[3]*self.coeffs_view[i_x, i_y, 15])
+               x_values[3]*(y_values[0]*self.coeffs_view[i_x, i_y, 12] + y_values[1]*self.coeffs_view[i_x, i_y, 13] + y_values[2]*self.coeffs_view[i_x, i_y, 14] + y_values[3]*self.coeffs_view[i_x, i_y, 15]) \
+               )
+
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef double _cell_coordinate_x(self, double px, int i_x):
+        """
+        Maps the x coordinate to the coordinate of the area given by 'i_x'.
+        The area spans the range [0, 1].
+        """
+
+        return ((px - self.x_min) * self.x_delta_inv - self.x_view[i_x+1]) / (self.x_view[i_x+2] - self.x_view[i_x+1])
+
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef double _cell_coordinate_y(self, double py, int i_y):
+        """
+        Maps the y coordinate to the coordinate of the area given by 'i_y'.
+        The area spans the range [0, 1].
+        """
+
+        return ((py - self.y_min) * self.y_delta_inv - self.y_view[i_y+1]) / (self.y_view[i_y+2] - self.y_view[i_y+1])
@@ -17,7 +17,8 @@
 # under the Licence.
 
 from cherab.core.math.function cimport Function3D
-from numpy cimport ndarray, int8_t
+from numpy cimport ndarray
+from cherab.core.math.interpolators.coefficients cimport CoefficientCache3D
 
 
 cdef class _Interpolate3DBase(Function3D):
@@ -29,6 +30,10 @@ cdef class _Interpolate3DBase(Function3D):
         int extrapolation_type
         double extrapolation_range
         int top_index_x, top_index_y, top_index_z
+        double x_inverse_spacing, y_inverse_spacing, z_inverse_spacing
+
+    cdef:
+        int _x_hint, _y_hint, _z_hint
 
     cdef double evaluate(self, double px, double py, double pz) except? -1e999
 
@@ -59,15 +64,18 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
     cdef readonly:
         double x_min, x_delta_inv, y_min, y_delta_inv, z_min, z_delta_inv
         double data_min, data_delta
-        double[::1] x_view, x2_view, x3_view
-        double[::1] y_view, y2_view, y3_view
-        double[::1] z_view, z2_view, z3_view
+        double[::1] x_view, y_view, z_view
         double[:,:,:] data_view
-        double[:,:,:,::1] coeffs_view
-        int8_t[:,:,::1] calculated_view
+        CoefficientCache3D coefficients
+
+    cdef int _calculate_polynomial(self, int i_x, int i_y, int i_z, double *c) except -1
+
+    cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, int i_z, double px, double py, double pz, int der_x, int der_y, int der_z) except? -1e999
+
+    cdef double _cell_coordinate_x(self, double px, int i_x)
 
-    cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, int i_z, double px, double py, double pz, int der_x, int der_y, int der_z)
+    cdef double _cell_coordinate_y(self, double py, int i_y)
 
-    cdef double[::1] _constraints3d(self, int u, int v, int w, bint x_der, bint y_der, bint z_der)
+    cdef double _cell_coordinate_z(self, double pz, int i_z)
 
 
@@ -18,12 +18,13 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from numpy import array, empty, int8, float64, shape, concatenate, argsort, arange
-from numpy.linalg import solve
+from numpy import array, asarray, empty, float64, shape, concatenate, argsort, arange, einsum, newaxis
 
 cimport cython
-from numpy cimport ndarray, PyArray_ZEROS, PyArray_SimpleNew, NPY_FLOAT64, npy_intp, import_array
-from cherab.core.math.interpolators.utility cimport find_index, lerp, derivatives_array, factorial
+from numpy cimport ndarray, import_array
+from cherab.core.math.interpolators.utility cimport find_index, inverse_uniform_spacing, lerp, derivatives_array, tricubic_coefficients
+from cherab.core.math.interpolators.utility import HERMITE_MATRIX
+from cherab.core.math.interpolators.coefficients import save_arrays, load_arrays, grid_fingerprint
 
 # required by numpy c-api
 import_array()
@@ -149,6 +150,11 @@ cdef class _Interpolate3DBase(Function3D):
             if (self.z_np == self.z_np[arange(len(self.z_np))-1]).any():
                 raise ValueError("The z coordinates array has a duplicate value.")
 
+        # uniformly spaced coordinates are looked up without searching
+        self.x_inverse_spacing = inverse_uniform_spacing(self.x_domain_view, self.top_index_x+1)
+        self.y_inverse_spacing = inverse_uniform_spacing(self.y_domain_view, self.top_index_y+1)
+        self.z_inverse_spacing = inverse_uniform_spacing(self.z_domain_view, self.top_index_z+1)
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef double evaluate(self, double px, double py, double pz) except? -1e999:
@@ -161,9 +167,9 @@ cdef class _Interpolate3DBase(Function3D):
 
         cdef int i_x, i_y, i_z
 
-        i_x = find_index(self.x_domain_view, self.top_index_x+1, px, self.extrapolation_range)
-        i_y = find_index(self.y_domain_view, self.top_index_y+1, py, self.extrapolation_range)
-        i_z = find_index(self.z_domain_view, self.top_index_z+1, pz, self.extrapolation_range)
+        i_x = find_index(self.x_domain_view, self.top_index_x+1, px, self.extrapolation_range, self.x_inverse_spacing, &self._x_hint)
+        i_y = find_index(self.y_domain_view, self.top_index_y+1, py, self.extrapolation_range, self.y_inverse_spacing, &self._y_hint)
+        i_z = find_index(self.z_domain_view, self.top_index_z+1, pz, self.extrapolation_range, self.z_inverse_spacing, &self._z_hint)
 
         if 0 <= i_x <= self.top_index_x-1:
             if 0 <= i_y <= self.top_index_y-1:
@@ -452,7 +458,8 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
     A local calculation based on finite differences is used. The
     splines coefficients are calculated on demand and are cached as they
     are calculated. Plus, no more than one polynomial is calculated at
-    each evaluation. The first derivatives and the cross
+    each evaluation. All the coefficients may be calculated up front with
+    calculate_coefficients(). The first derivatives and the cross
     derivatives (xy, xz, yz and xyz) are imposed by the finite differences
     approximation, and the resulting function is C1 (first derivatives are
     continuous).
@@ -479,10 +486,19 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
     value is supplied, that value will be extrapolated over the entire
     real range. If False (default), supplying a single value will result
     in a ValueError being raised.
+    :param object max_cells: optional
+    Maximum number of cells whose coefficients are kept in memory. If set,
+    the coefficients are allocated on demand and the least recently used
+    cells are discarded once the limit is reached. If None (default), the
+    coefficients of every cell may be kept.
+    :param bint single_precision: optional
+    If True, the coefficients are stored as 32 bit floats, halving the memory
+    used at the cost of accuracy. The default is False.
     """
 
     def __init__(self, object x, object y, object z, object data, bint extrapolate=False, double extrapolation_range=float('inf'),
-                 str extrapolation_type='nearest', bint tolerate_single_value=False):
+                 str extrapolation_type='nearest', bint tolerate_single_value=False, object max_cells=None,
+                 bint single_precision=False):
 
         cdef int i, j, k, i_narrowed, j_narrowed, k_narrowed
 
@@ -494,11 +510,8 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
 
         super().__init__(x, y, z, data, extrapolate, extrapolation_type, extrapolation_range, tolerate_single_value)
 
-        # Initialise the caching array
-        self.coeffs_view = empty((self.top_index_x, self.top_index_y, self.top_index_z, 64), dtype=float64)
-        self.coeffs_view[:,:,:,::1] = float('NaN')
-        self.calculated_view = empty((self.top_index_x, self.top_index_y, self.top_index_z), dtype=int8)
-        self.calculated_view[:,:,:] = False
+        # Initialise the coefficients storage
+        self.coefficients = CoefficientCache3D((self.top_index_x, self.top_index_y, self.top_index_z), 64, max_cells, single_precision)
 
         # Normalise coordinates and data arrays
         self.x_delta_inv = 1 / (self.x_np.max() - self.x_np.min())
@@ -535,14 +548,124 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
 
         # obtain coordinates memory views
         self.x_view = self.x_np
-        self.x2_view = self.x_np*self.x_np
-        self.x3_view = self.x_np*self.x_np*self.x_np
         self.y_view = self.y_np
-        self.y2_view = self.y_np*self.y_np
-        self.y3_view = self.y_np*self.y_np*self.y_np
         self.z_view = self.z_np
-        self.z2_view = self.z_np*self.z_np
-        self.z3_view = self.z_np*self.z_np*self.z_np
+
+    def calculate_coefficients(self):
+        """
+        Calculates the polynomial coefficients of all the cells at once.
+
+        By default the coefficients of a cell are calculated the first time
+        the cell is evaluated. This method calculates every cell with
+        vectorised NumPy operations instead, which is faster if most of the
+        cells are going to be evaluated. It is not available if the number of
+        cells kept in memory is limited.
+        """
+
+        cdef int i, j, k, nx, ny, nz
+
+        x = asarray(self.x_view)
+        y = asarray(self.y_view)
+        z = asarray(self.z_view)
+        d = asarray(self.data_view)
+
+        c = slice(1, -1)
+        p = slice(2, None)
+        m = slice(None, -2)
+
+        # finite differences on the nodes, the arrays are widened by one node at each end
+        dx = (x[p] - x[m])[:, newaxis, newaxis]
+        dy = (y[p] - y[m])[newaxis, :, newaxis]
+        dz = (z[p] - z[m])[newaxis, newaxis, :]
+        f = d[c, c, c]
+        fx = (d[p, c, c] - d[m, c, c]) / dx
+        fy = (d[c, p, c] - d[c, m, c]) / dy
+        fz = (d[c, c, p] - d[c, c, m]) / dz
+        fxy = (d[p, p, c] - d[p, m, c] - d[m, p, c] + d[m, m, c]) / (dx * dy)
+        fxz = (d[p, c, p] - d[p, c, m] - d[m, c, p] + d[m, c, m]) / (dx * dz)
+        fyz = (d[c, p, p] - d[c, p, m] - d[c, m, p] + d[c, m, m]) / (dy * dz)
+        fxyz = (d[p, p, p] - d[p, p, m] - d[p, m, p] + d[p, m, m] - d[m, p, p] + d[m, p, m] + d[m, m, p] - d[m, m, m]) / (dx * dy * dz)
+
+        # cell widths
+        hx = (x[2:-1] - x[1:-2])[:, newaxis, newaxis]
+        hy = (y[2:-1] - y[1:-2])[newaxis, :, newaxis]
+        hz = (z[2:-1] - z[1:-2])[newaxis, newaxis, :]
+
+        # constraints of every cell, see tricubic_coefficients() for the layout
+        nx = self.top_index_x
+        ny = self.top_index_y
+        nz = self.top_index_z
+        b = empty((nx, ny, nz, 4, 4, 4), dtype=float64)
+        for i in range(2):
+            for j in range(2):
+                for k in range(2):
+                    corner = (slice(i, i + nx), slice(j, j + ny), slice(k, k + nz))
+                    b[:, :, :, i, j, k] = f[corner]
+                    b[:, :, :, i+2, j, k] = hx * fx[corner]
+                    b[:, :, :, i, j+2, k] = hy * fy[corner]
+                    b[:, :, :, i, j, k+2] = hz * fz[corner]
+                    b[:, :, :, i+2, j+2, k] = hx * hy * fxy[corner]
+                    b[:, :, :, i+2, j, k+2] = hx * hz * fxz[corner]
+                    b[:, :, :, i, j+2, k+2] = hy * hz * fyz[corner]
+                    b[:, :, :, i+2, j+2, k+2] = hx * hy * hz * fxyz[corner]
+
+        # closed form solution of the constraints, applied axis by axis
+        b = einsum('ip,...pqr->...iqr', HERMITE_MATRIX, b)
+        b = einsum('jq,...iqr->...ijr', HERMITE_MATRIX, b)
+        b = einsum('kr,...ijr->...ijk', HERMITE_MATRIX, b)
+
+        # Denormalisation of the data values
+        coeffs = self.data_delta * b.reshape((nx, ny, nz, 64))
+        coeffs[:, :, :, 0] += self.data_min
+
+        self.coefficients.set_all(coeffs)
+
+    def save(self, str path, str fingerprint):
+        """
+        Saves the calculated coefficients to a file.
+
+        The file can be loaded by any Interpolate3DCubic interpolating the
+        same data on the same grid, see load(). Not available if the number of
+        cells kept in memory is limited.
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the interpolated data, it must be
+        supplied again to load the file.
+        """
+
+        coefficients, calculated = self.coefficients.arrays()
+        save_arrays(path, self._cache_key(fingerprint), {'coefficients': coefficients, 'calculated': calculated})
+
+    def load(self, str path, str fingerprint):
+        """
+        Loads the coefficients saved by save().
+
+        The file is memory mapped, so that the processes loading it share the
+        same memory. The cells missing from the file are still calculated on
+        demand, without modifying the file. A ValueError is raised if the file
+        was saved for different data, a different grid or fingerprint.
+
+        :param str path: path of the file.
+        :param str fingerprint: identifies the interpolated data.
+        """
+
+        arrays = load_arrays(path, self._cache_key(fingerprint))
+        self.coefficients.set_arrays(arrays['coefficients'], arrays['calculated'])
+
+    def _cache_key(self, str fingerprint):
+        """
+        Returns the description of the content of the cache files.
+        """
+
+        return {
+            'class': 'Interpolate3DCubic',
+            'grid': grid_fingerprint(self.x_domain_view, self.y_domain_view, self.z_domain_view),
+            'data': grid_fingerprint(self.data_view),
+            'data_min': self.data_min,
+            'data_delta': self.data_delta,
+            'single_precision': self.coefficients.single_precision,
+            'fingerprint': fingerprint
+        }
 
     @cython.cdivision(True)
     @cython.boundscheck(False)
@@ -558,120 +681,122 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
         """
 
         cdef:
-            int u, v, w, l, i, j, k
-            double delta_x, delta_y, delta_z, px2, py2, pz2, px3, py3, pz3
-            npy_intp cv_size
-            npy_intp cm_size[2]
-            double[::1] cv_view, coeffs_view
-            double[:, ::1] cm_view
+            double tx, ty, tz, tx2, ty2, tz2, tx3, ty3, tz3
+            double c[64]
 
         # If the concerned polynomial has not yet been calculated:
-        if not self.calculated_view[i_x, i_y, i_z]:
-
-            # Create constraint matrix (un-optimised)
-            # cv_view = zeros((64,), dtype=float64)       # constraints vector
-            # cm_view = zeros((64, 64), dtype=float64)    # constraints matrix
-
-            # Create constraint matrix (optimised using numpy c-api)
-            cv_size = 64
-            cv_view = PyArray_ZEROS(1, &cv_size, NPY_FLOAT64, 0)
-            cm_size[:] = [64, 64]
-            cm_view = PyArray_ZEROS(2, cm_size, NPY_FLOAT64, 0)
-
-            # Fill the constraints matrix
-            l = 0
-            for u in range(i_x+1, i_x+3):
-                for v in range(i_y+1, i_y+3):
-                    for w in range(i_z+1, i_z+3):
-
-                        # knot values
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, False, False, False)
-                        cv_view[l] = self.data_view[u, v, w]
-                        l = l+1
-
-                        # derivatives along x, y, z
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, False, False)
-                        delta_x = self.x_view[u+1] - self.x_view[u-1]
-                        cv_view[l] = (self.data_view[u+1, v, w] - self.data_view[u-1, v, w])/delta_x
-                        l = l+1
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, False ,True , False)
-                        delta_y = self.y_view[v+1] - self.y_view[v-1]
-                        cv_view[l] = (self.data_view[u, v+1, w] - self.data_view[u, v-1, w])/delta_y
-                        l = l+1
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, False, False, True)
-                        delta_z = self.z_view[w+1] - self.z_view[w-1]
-                        cv_view[l] = (self.data_view[u, v, w+1] - self.data_view[u, v, w-1])/delta_z
-                        l = l+1
-
-                        # cross derivatives xy, xz, yz
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, True, False)
-                        cv_view[l] = (self.data_view[u+1, v+1, w] - self.data_view[u+1, v-1, w] - self.data_view[u-1, v+1, w] + self.data_view[u-1, v-1, w])/(delta_x*delta_y)
-                        l = l+1
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, False, True)
-                        cv_view[l] = (self.data_view[u+1, v, w+1] - self.data_view[u+1, v, w-1] - self.data_view[u-1, v, w+1] + self.data_view[u-1, v, w-1])/(delta_x*delta_z)
-                        l = l+1
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, False, True, True)
-                        cv_view[l] = (self.data_view[u, v+1, w+1] - self.data_view[u, v-1, w+1] - self.data_view[u, v+1, w-1] + self.data_view[u, v-1, w-1])/(delta_y*delta_z)
-                        l = l+1
-
-                        # cross derivative xyz
-
-                        cm_view[l, :] = self._constraints3d(u, v, w, True, True, True)
-                        cv_view[l] = (self.data_view[u+1, v+1, w+1] - self.data_view[u+1, v+1, w-1] - self.data_view[u+1, v-1, w+1] + self.data_view[u+1, v-1, w-1] - self.data_view[u-1, v+1, w+1] + self.data_view[u-1, v+1, w-1] + self.data_view[u-1, v-1, w+1] - self.data_view[u-1, v-1, w-1])/(delta_x*delta_y*delta_z)
-                        l = l+1
-
-            # Solve the linear system and fill the caching coefficients array
-            coeffs_view = solve(cm_view, cv_view)
-            self.coeffs_view[i_x, i_y, i_z, :] = coeffs_view
-
-            # Denormalisation
-            for i in range(4):
-                for j in range(4):
-                    for k in range(4):
-                        coeffs_view[16 * i + 4 * j + k] = self.data_delta * self.x_delta_inv ** i * self.y_delta_inv ** j * self.z_delta_inv ** k / (factorial(k) * factorial(j) * factorial(i)) \
-                                                          * self._evaluate_polynomial_derivative(i_x, i_y, i_z, -self.x_delta_inv * self.x_min, -self.y_delta_inv * self.y_min, -self.z_delta_inv * self.z_min, i, j, k)
-            coeffs_view[0] = coeffs_view[0] + self.data_min
-            self.coeffs_view[i_x, i_y, i_z, :] = coeffs_view
-
-            self.calculated_view[i_x, i_y, i_z] = True
-
-        px2 = px*px
-        px3 = px2*px
-        py2 = py*py
-        py3 = py2*py
-        pz2 = pz*pz
-        pz3 = pz2*pz
-
-        return         (self.coeffs_view[i_x, i_y, i_z,  0] + self.coeffs_view[i_x, i_y, i_z,  1]*pz + self.coeffs_view[i_x, i_y, i_z,  2]*pz2 + self.coeffs_view[i_x, i_y, i_z,  3]*pz3) + \
-                   py *(self.coeffs_view[i_x, i_y, i_z,  4] + self.coeffs_view[i_x, i_y, i_z,  5]*pz + self.coeffs_view[i_x, i_y, i_z,  6]*pz2 + self.coeffs_view[i_x, i_y, i_z,  7]*pz3) + \
-                   py2*(self.coeffs_view[i_x, i_y, i_z,  8] + self.coeffs_view[i_x, i_y, i_z,  9]*pz + self.coeffs_view[i_x, i_y, i_z, 10]*pz2 + self.coeffs_view[i_x, i_y, i_z, 11]*pz3) + \
-                   py3*(self.coeffs_view[i_x, i_y, i_z, 12] + self.coeffs_view[i_x, i_y, i_z, 13]*pz + self.coeffs_view[i_x, i_y, i_z, 14]*pz2 + self.coeffs_view[i_x, i_y, i_z, 15]*pz3) \
-               + px*( \
-                       (self.coeffs_view[i_x, i_y, i_z, 16] + self.coeffs_view[i_x, i_y, i_z, 17]*pz + self.coeffs_view[i_x, i_y, i_z, 18]*pz2 + self.coeffs_view[i_x, i_y, i_z, 19]*pz3) + \
-                   py *(self.coeffs_view[i_x, i_y, i_z, 20] + self.coeffs_view[i_x, i_y, i_z, 21]*pz + self.coeffs_view[i_x, i_y, i_z, 22]*pz2 + self.coeffs_view[i_x, i_y, i_z, 23]*pz3) + \
-                   py2*(self.coeffs_view[i_x, i_y, i_z, 24] + self.coeffs_view[i_x, i_y, i_z, 25]*pz + self.coeffs_view[i_x, i_y, i_z, 26]*pz2 + self.coeffs_view[i_x, i_y, i_z, 27]*pz3) + \
-                   py3*(self.coeffs_view[i_x, i_y, i_z, 28] + self.coeffs_view[i_x, i_y, i_z, 29]*pz + self.coeffs_view[i_x, i_y, i_z, 30]*pz2 + self.coeffs_view[i_x, i_y, i_z, 31]*pz3) \
+        if not self.coefficients.fetch(i_x, i_y, i_z, c):
+            self._calculate_polynomial(i_x, i_y, i_z, c)
+
+        # the polynomial is expressed in the cell coordinates
+        tx = self._cell_coordinate_x(px, i_x)
+        ty = self._cell_coordinate_y(py, i_y)
+        tz = self._cell_coordinate_z(pz, i_z)
+
+        tx2 = tx*tx
+        tx3 = tx2*tx
+        ty2 = ty*ty
+        ty3 = ty2*ty
+        tz2 = tz*tz
+        tz3 = tz2*tz
+
+        return         (c[0] + c[1]*tz + c[2]*tz2 + c[3]*tz3) + \
+                   ty *(c[4] + c[5]*tz + c[6]*tz2 + c[7]*tz3) + \
+                   ty2*(c[8] + c[9]*tz + c[10]*tz2 + c[11]*tz3) + \
+                   ty3*(c[12] + c[13]*tz + c[14]*tz2 + c[15]*tz3) \
+               + tx*( \
+                       (c[16] + c[17]*tz + c[18]*tz2 + c[19]*tz3) + \
+                   ty *(c[20] + c[21]*tz + c[22]*tz2 + c[23]*tz3) + \
+                   ty2*(c[24] + c[25]*tz + c[26]*tz2 + c[27]*tz3) + \
+                   ty3*(c[28] + c[29]*tz + c[30]*tz2 + c[31]*tz3) \
                ) \
-               + px2*( \
-                       (self.coeffs_view[i_x, i_y, i_z, 32] + self.coeffs_view[i_x, i_y, i_z, 33]*pz + self.coeffs_view[i_x, i_y, i_z, 34]*pz2 + self.coeffs_view[i_x, i_y, i_z, 35]*pz3) + \
-                   py *(self.coeffs_view[i_x, i_y, i_z, 36] + self.coeffs_view[i_x, i_y, i_z, 37]*pz + self.coeffs_view[i_x, i_y, i_z, 38]*pz2 + self.coeffs_view[i_x, i_y, i_z, 39]*pz3) + \
-                   py2*(self.coeffs_view[i_x, i_y, i_z, 40] + self.coeffs_view[i_x, i_y, i_z, 41]*pz + self.coeffs_view[i_x, i_y, i_z, 42]*pz2 + self.coeffs_view[i_x, i_y, i_z, 43]*pz3) + \
-                   py3*(self.coeffs_view[i_x, i_y, i_z, 44] + self.coeffs_view[i_x, i_y, i_z, 45]*pz + self.coeffs_view[i_x, i_y, i_z, 46]*pz2 + self.coeffs_view[i_x, i_y, i_z, 47]*pz3) \
+               + tx2*( \
+                       (c[32] + c[33]*tz + c[34]*tz2 + c[35]*tz3) + \
+                   ty *(c[36] + c[37]*tz + c[38]*tz2 + c[39]*tz3) + \
+                   ty2*(c[40] + c[41]*tz + c[42]*tz2 + c[43]*tz3) + \
+                   ty3*(c[44] + c[45]*tz + c[46]*tz2 + c[47]*tz3) \
                ) \
-               + px3*( \
-                       (self.coeffs_view[i_x, i_y, i_z, 48] + self.coeffs_view[i_x, i_y, i_z, 49]*pz + self.coeffs_view[i_x, i_y, i_z, 50]*pz2 + self.coeffs_view[i_x, i_y, i_z, 51]*pz3) + \
-                   py *(self.coeffs_view[i_x, i_y, i_z, 52] + self.coeffs_view[i_x, i_y, i_z, 53]*pz + self.coeffs_view[i_x, i_y, i_z, 54]*pz2 + self.coeffs_view[i_x, i_y, i_z, 55]*pz3) + \
-                   py2*(self.coeffs_view[i_x, i_y, i_z, 56] + self.coeffs_view[i_x, i_y, i_z, 57]*pz + self.coeffs_view[i_x, i_y, i_z, 58]*pz2 + self.coeffs_view[i_x, i_y, i_z, 59]*pz3) + \
-                   py3*(self.coeffs_view[i_x, i_y, i_z, 60] + self.coeffs_view[i_x, i_y, i_z, 61]*pz + self.coeffs_view[i_x, i_y, i_z, 62]*pz2 + self.coeffs_view[i_x, i_y, i_z, 63]*pz3) \
+               + tx3*( \
+                       (c[48] + c[49]*tz + c[50]*tz2 + c[51]*tz3) + \
+                   ty *(c[52] + c[53]*tz + c[54]*tz2 + c[55]*tz3) + \
+                   ty2*(c[56] + c[57]*tz + c[58]*tz2 + c[59]*tz3) + \
+                   ty3*(c[60] + c[61]*tz + c[62]*tz2 + c[63]*tz3) \
                )
 
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _calculate_polynomial(self, int i_x, int i_y, int i_z, double *c) except -1:
+        """
+        Calculates and stores the polynomial coefficients for the area given
+        by 'i_x', 'i_y', 'i_z'. The coefficients are also copied to 'c'.
+
+        :param int i_x, int i_y, int i_z: indices of the area of interest
+        :param double *c: array of 64 doubles receiving the coefficients
+        """
+
+        cdef:
+            int u, v, w, i, j, k
+            double hx, hy, hz, hxy, hxz, hyz, hxyz
+            double delta_x, delta_y, delta_z
+
+        # cell widths, the derivatives are scaled to the cell coordinates
+        hx = self.x_view[i_x+2] - self.x_view[i_x+1]
+        hy = self.y_view[i_y+2] - self.y_view[i_y+1]
+        hz = self.z_view[i_z+2] - self.z_view[i_z+1]
+        hxy = hx * hy
+        hxz = hx * hz
+        hyz = hy * hz
+        hxyz = hx * hy * hz
+
+        # Fill the constraints, see tricubic_coefficients() for the layout
+        for i in range(2):
+            for j in range(2):
+                for k in range(2):
+
+                    u = i_x + 1 + i
+                    v = i_y + 1 + j
+                    w = i_z + 1 + k
+
+                    # knot values
+
+                    c[16*i + 4*j + k] = self.data_view[u, v, w]
+
+                    # derivatives along x, y, z
+
+                    delta_x = self.x_view[u+1] - self.x_view[u-1]
+                    c[16*(i+2) + 4*j + k] = hx * (self.data_view[u+1, v, w] - self.data_view[u-1, v, w])/delta_x
+
+                    delta_y = self.y_view[v+1] - self.y_view[v-1]
+                    c[16*i + 4*(j+2) + k] = hy * (self.data_view[u, v+1, w] - self.data_view[u, v-1, w])/delta_y
+
+                    delta_z = self.z_view[w+1] - self.z_view[w-1]
+                    c[16*i + 4*j + k+2] = hz * (self.data_view[u, v, w+1] - self.data_view[u, v, w-1])/delta_z
+
+                    # cross derivatives xy, xz, yz
+
+                    c[16*(i+2) + 4*(j+2) + k] = hxy * (self.data_view[u+1, v+1, w] - self.data_view[u+1, v-1, w] - self.data_view[u-1, v+1, w] + self.data_view[u-1, v-1, w])/(delta_x*delta_y)
+
+                    c[16*(i+2) + 4*j + k+2] = hxz * (self.data_view[u+1, v, w+1] - self.data_view[u+1, v, w-1] - self.data_view[u-1, v, w+1] + self.data_view[u-1, v, w-1])/(delta_x*delta_z)
+
+                    c[16*i + 4*(j+2) + k+2] = hyz * (self.data_view[u, v+1, w+1] - self.data_view[u, v-1, w+1] - self.data_view[u, v+1, w-1] + self.data_view[u, v-1, w-1])/(delta_y*delta_z)
+
+                    # cross derivative xyz
+
+                    c[16*(i+2) + 4*(j+2) + k+2] = hxyz * (self.data_view[u+1, v+1, w+1] - self.data_view[u+1, v+1, w-1] - self.data_view[u+1, v-1, w+1] + self.data_view[u+1, v-1, w-1] - self.data_view[u-1, v+1, w+1] + self.data_view[u-1, v+1, w-1] + self.data_view[u-1, v-1, w+1] - self.data_view[u-1, v-1, w-1])/(delta_x*delta_y*delta_z)
+
+        # closed form solution of the constraints
+        tricubic_coefficients(c)
+
+        # Denormalisation of the data values
+        for i in range(64):
+            c[i] = self.data_delta * c[i]
+        c[0] += self.data_min
+
+        self.coefficients.store(i_x, i_y, i_z, c)
+
+        return 0
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef double _extrapol_linear(self, double px, double py, double pz, int i_x, int i_y, int i_z, double nearest_px, double nearest_py, double nearest_pz) except? -1e999:
@@ -755,7 +880,7 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, int i_z, double px, double py, double pz, int der_x, int der_y, int der_z):
+    cdef double _evaluate_polynomial_derivative(self, int i_x, int i_y, int i_z, double px, double py, double pz, int der_x, int der_y, int der_z) except? -1e999:
         """
         Evaluate the derivatives of the polynomial valid in the area given by
         'i_x', 'i_y' and 'i_z' at position ('px', 'py', 'pz'). The order of
@@ -767,111 +892,78 @@ cdef class Interpolate3DCubic(_Interpolate3DBase):
         :return: value evaluated from the derivated polynomial
         """
 
-        cdef double[::1] x_values, y_values, z_values
-
-        x_values = derivatives_array(px, der_x)
-        y_values = derivatives_array(py, der_y)
-        z_values = derivatives_array(pz, der_z)
-
-        return   x_values[0]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z,  0] + z_values[1]*self.coeffs_view[i_x, i_y, i_z,  1] + z_values[2]*self.coeffs_view[i_x, i_y, i_z,  2] + z_values[3]*self.coeffs_view[i_x, i_y, i_z,  3]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z,  4] + z_values[1]*self.coeffs_view[i_x, i_y, i_z,  5] + z_values[2]*self.coeffs_view[i_x, i_y, i_z,  6] + z_values[3]*self.coeffs_view[i_x, i_y, i_z,  7]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z,  8] + z_values[1]*self.coeffs_view[i_x, i_y, i_z,  9] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 10] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 11]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 12] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 13] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 14] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 15]) \
+        cdef:
+            double[::1] x_values, y_values, z_values
+            double scale
+            double c[64]
+
+        if not self.coefficients.fetch(i_x, i_y, i_z, c):
+            self._calculate_polynomial(i_x, i_y, i_z, c)
+
+        # the polynomial is expressed in the cell coordinates
+        x_values = derivatives_array(self._cell_coordinate_x(px, i_x), der_x)
+        y_values = derivatives_array(self._cell_coordinate_y(py, i_y), der_y)
+        z_values = derivatives_array(self._cell_coordinate_z(pz, i_z), der_z)
+        scale = (self.x_delta_inv / (self.x_view[i_x+2] - self.x_view[i_x+1])) ** der_x \
+                * (self.y_delta_inv / (self.y_view[i_y+2] - self.y_view[i_y+1])) ** der_y \
+                * (self.z_delta_inv / (self.z_view[i_z+2] - self.z_view[i_z+1])) ** der_z
+
+        return scale * ( \
+                 x_values[0]*( \
+                   y_values[0]*(z_values[0]*c[0] + z_values[1]*c[1] + z_values[2]*c[2] + z_values[3]*c[3]) + \
+                   y_values[1]*(z_values[0]*c[4] + z_values[1]*c[5] + z_values[2]*c[6] + z_values[3]*c[7]) + \
+                   y_values[2]*(z_values[0]*c[8] + z_values[1]*c[9] + z_values[2]*c[10] + z_values[3]*c[11]) + \
+                   y_values[3]*(z_values[0]*c[12] + z_values[1]*c[13] + z_values[2]*c[14] + z_values[3]*c[15]) \
                ) \
                + x_values[1]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 16] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 17] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 18] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 19]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 20] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 21] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 22] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 23]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 24] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 25] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 26] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 27]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 28] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 29] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 30] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 31]) \
+                   y_values[0]*(z_values[0]*c[16] + z_values[1]*c[17] + z_values[2]*c[18] + z_values[3]*c[19]) + \
+                   y_values[1]*(z_values[0]*c[20] + z_values[1]*c[21] + z_values[2]*c[22] + z_values[3]*c[23]) + \
+                   y_values[2]*(z_values[0]*c[24] + z_values[1]*c[25] + z_values[2]*c[26] + z_values[3]*c[27]) + \
+                   y_values[3]*(z_values[0]*c[28] + z_values[1]*c[29] + z_values[2]*c[30] + z_values[3]*c[31]) \
                ) \
                + x_values[2]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 32] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 33] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 34] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 35]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 36] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 37] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 38] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 39]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 40] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 41] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 42] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 43]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 44] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 45] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 46] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 47]) \
+                   y_values[0]*(z_values[0]*c[32] + z_values[1]*c[33] + z_values[2]*c[34] + z_values[3]*c[35]) + \
+                   y_values[1]*(z_values[0]*c[36] + z_values[1]*c[37] + z_values[2]*c[38] + z_values[3]*c[39]) + \
+                   y_values[2]*(z_values[0]*c[40] + z_values[1]*c[41] + z_values[2]*c[42] + z_values[3]*c[43]) + \
+                   y_values[3]*(z_values[0]*c[44] + z_values[1]*c[45] + z_values[2]*c[46] + z_values[3]*c[47]) \
                ) \
                + x_values[3]*( \
-                   y_values[0]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 48] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 49] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 50] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 51]) + \
-                   y_values[1]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 52] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 53] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 54] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 55]) + \
-                   y_values[2]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 56] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 57] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 58] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 59]) + \
-                   y_values[3]*(z_values[0]*self.coeffs_view[i_x, i_y, i_z, 60] + z_values[1]*self.coeffs_view[i_x, i_y, i_z, 61] + z_values[2]*self.coeffs_view[i_x, i_y, i_z, 62] + z_values[3]*self.coeffs_view[i_x, i_y, i_z, 63]) \
+                   y_values[0]*(z_values[0]*c[48] + z_values[1]*c[49] + z_values[2]*c[50] + z_values[3]*c[51]) + \
+                   y_values[1]*(z_values[0]*c[52] + z_values[1]*c[53] + z_values[2]*c[54] + z_values[3]*c[55]) + \
+                   y_values[2]*(z_values[0]*c[56] + z_values[1]*c[57] + z_values[2]*c[58] + z_values[3]*c[59]) + \
+                   y_values[3]*(z_values[0]*c[60] + z_values[1]*c[61] + z_values[2]*c[62] + z_values[3]*c[63]) \
+               ) \
                )
 
+    @cython.cdivision(True)
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cdef double[::1] _constraints3d(self, int u, int v, int w, bint x_der, bint y_der, bint z_der):
+    cdef double _cell_coordinate_x(self, double px, int i_x):
+        """
+        Maps the x coordinate to the cell coordinate of the area given by 'i_x'.
+        The cell spans the range [0, 1].
         """
-        Return the coefficients of a given constraints and at a given point.
 
-        This method is used to easily build the constraint matrix. It only
-        handles constraints on P, dP/dx, dP/dy, dP/z, d2P/dxdy, d2P/dydz,
-        d2P/dxdz and d3P/dxdydz (where P is the concerned polynomial).
+        return ((px - self.x_min) * self.x_delta_inv - self.x_view[i_x+1]) / (self.x_view[i_x+2] - self.x_view[i_x+1])
 
-        :param int u, int v, int w: indices of the point where the constraints apply.
-        :param bint x_der, bint y_der, bint z_der: set to True or False in order to chose
-        what constraint is returned. For each axis, True means the constraint
-        considered a derivative along this axis.
-        For example:
-        x_der=False, y_der=True, z_der=False means the constraint returned is
-        on the derivative along y (dP/dy).
-        x_der=True, y_der=True, z_der=False means the constraint returned is
-        on the cross derivative along x and y (d2P/dxdy).
-        :return: a memory view of a 1x64 array filled with the coefficients
-        corresponding to the requested constraint.
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef double _cell_coordinate_y(self, double py, int i_y):
+        """
+        Maps the y coordinate to the cell coordinate of the area given by 'i_y'.
+        The cell spans the range [0, 1].
         """
 
-        cdef:
-            double x_components[4]
-            double y_components[4]
-            double z_components[4]
-            npy_intp result_size
-            double[::1] result_view
-            double x_component, y_component, z_component
-            int l
-
-        if x_der:
-            x_components[0] = 0.
-            x_components[1] = 1.
-            x_components[2] = 2.*self.x_view[u]
-            x_components[3] = 3.*self.x2_view[u]
-        else:
-            x_components[0] = 1.
-            x_components[1] = self.x_view[u]
-            x_components[2] = self.x2_view[u]
-            x_components[3] = self.x3_view[u]
-
-        if y_der:
-            y_components[0] = 0.
-            y_components[1] = 1.
-            y_components[2] = 2.*self.y_view[v]
-            y_components[3] = 3.*self.y2_view[v]
-        else:
-            y_components[0] = 1.
-            y_components[1] = self.y_view[v]
-            y_components[2] = self.y2_view[v]
-            y_components[3] = self.y3_view[v]
-
-        if z_der:
-            z_components[0] = 0.
-            z_components[1] = 1.
-            z_components[2] = 2.*self.z_view[w]
-            z_components[3] = 3.*self.z2_view[w]
-        else:
-            z_components[0] = 1.
-            z_components[1] = self.z_view[w]
-            z_components[2] = self.z2_view[w]
-            z_components[3] = self.z3_view[w]
-
-        # create an empty (uninitialised) ndarray via numpy c-api
-        result_size = 64
-        result_view = PyArray_SimpleNew(1, &result_size, NPY_FLOAT64)
-
-        l = 0
-        for x_component in x_components:
-            for y_component in y_components:
-                for z_component in z_components:
-                    result_view[l] = x_component * y_component * z_component
-                    l += 1
-
-        return result_view
+        return ((py - self.y_min) * self.y_delta_inv - self.y_view[i_y+1]) / (self.y_view[i_y+2] - self.y_view[i_y+1])
+
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef double _cell_coordinate_z(self, double pz, int i_z):
+        """
+        Maps the z coordinate to the cell coordinate of the area given by 'i_z'.
+        The cell spans the range [0, 1].
+        """
+
+        return ((pz - self.z_min) * self.z_delta_inv - self.z_view[i_z+1]) / (self.z_view[i_z+2] - self.z_view[i_z+1])
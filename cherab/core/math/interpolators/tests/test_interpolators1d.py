@@ -261,6 +261,28 @@ class TestInterpolators1D(unittest.TestCase):
         for i in range(len(self.xsamples)):
             self.assertAlmostEqual(self.interp_func(self.xsamples[i]), self.interp_data[i], delta=1e-8)
 
+    def test_interpolate_1d_linear_lookup(self):
+        """1D linear interpolation. Test the bin look-up on uniform and non-uniform grids in any order"""
+        samples = np.linspace(-0.5, 5.5, 121)
+        orders = (samples, samples[::-1], np.random.RandomState(1).permutation(samples))
+        for x, uniform in ((np.linspace(0., 5., 11), True), (np.array([0., 0.1, 0.5, 0.6, 2., 3.5, 3.6, 5.]), False)):
+            data = np.sin(x)
+            interp_func = interpolators1d.Interpolate1DLinear(x, data, extrapolate=True, extrapolation_type='nearest')
+            self.assertEqual(interp_func.x_inverse_spacing > 0, uniform)
+            for order in orders:
+                for v in order:
+                    self.assertAlmostEqual(interp_func(v), np.interp(v, x, data), delta=1e-12)
+
+    def test_interpolate_1d_linear_nan(self):
+        """1D linear interpolation. A NaN coordinate gives NaN on uniform and non-uniform grids"""
+        for x in (np.linspace(0., 5., 11), np.array([0., 0.1, 0.5, 0.6, 2., 3.5, 3.6, 5.])):
+            interp_func = interpolators1d.Interpolate1DLinear(x, np.sin(x), extrapolate=True, extrapolation_type='nearest')
+            # before and after a look-up, which sets the hint
+            self.assertTrue(np.isnan(interp_func(float('nan'))))
+            interp_func(2.5)
+            self.assertTrue(np.isnan(interp_func(float('nan'))))
+            self.assertAlmostEqual(interp_func(2.5), np.interp(2.5, x, np.sin(x)), delta=1e-12)
+
     def test_interpolate_1d_linear_bigvalues(self):
         """1D linear interpolation. Test with big values (1e20) inside the boundaries"""
         factor = 1.e20
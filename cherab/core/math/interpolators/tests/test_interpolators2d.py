@@ -16,6 +16,8 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+import os
+import tempfile
 import unittest
 import numpy as np
 from cherab.core.math.interpolators import interpolators2d
@@ -1041,6 +1043,41 @@ class TestInterpolators2D(unittest.TestCase):
             for j in range(len(self.ysamples)):
                 self.assertAlmostEqual(self.interp_func(self.xsamples[i], self.ysamples[j]), self.interp_data[i, j], delta=CUB_DELTA)
 
+    def test_interpolate_2d_cubic_calculate_coefficients(self):
+        """2D cubic interpolation. Coefficients calculated up front must match the ones calculated on demand"""
+        self.init_2dcubic(extrapolate=True, extrapolation_type='quadratic')
+        lazy = self.interp_func
+        self.init_2dcubic(extrapolate=True, extrapolation_type='quadratic')
+        self.interp_func.calculate_coefficients()
+        for x in np.linspace(self.x[0] - 0.5, self.x[-1] + 0.5, 23):
+            for y in np.linspace(self.y[0] - 0.5, self.y[-1] + 0.5, 23):
+                self.assertAlmostEqual(self.interp_func(x, y), lazy(x, y), delta=1e-10)
+
+    def test_interpolate_2d_cubic_save_load(self):
+        """2D cubic interpolation. Coefficients saved to a file must give the same values once loaded"""
+        self.init_2dcubic()
+        self.interp_func.calculate_coefficients()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache')
+            self.interp_func.save(path, 'test data')
+            loaded_func = interpolators2d.Interpolate2DCubic(self.x, self.y, self.data)
+            loaded_func.load(path, 'test data')
+            for i in range(len(self.xsamples)):
+                for j in range(len(self.ysamples)):
+                    self.assertEqual(loaded_func(self.xsamples[i], self.ysamples[j]), self.interp_func(self.xsamples[i], self.ysamples[j]))
+            with self.assertRaises(ValueError):
+                loaded_func.load(path, 'other data')
+            # the file must be rejected for different data, even with the same fingerprint
+            with self.assertRaises(ValueError):
+                interpolators2d.Interpolate2DCubic(self.x, self.y, 2 * self.data).load(path, 'test data')
+            modified = np.array(self.data)
+            modified[1, 1] += 0.5
+            with self.assertRaises(ValueError):
+                interpolators2d.Interpolate2DCubic(self.x, self.y, modified).load(path, 'test data')
+            with self.assertRaises(ValueError):
+                interpolators2d.Interpolate2DCubic(self.x, 2 * self.y, self.data).load(path, 'test data')
+            del loaded_func
+
     def test_interpolate_2d_cubic_bigvalues(self):
         """2D cubic interpolation. Test with big values (1e20) inside the boundaries"""
         factor = 1.e20
@@ -16,6 +16,8 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+import os
+import tempfile
 import unittest
 
 import numpy as np
@@ -810,6 +812,82 @@ class TestInterpolators3D(unittest.TestCase):
                     self.assertAlmostEqual(self.interp_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]),
                                            self.interp_data[i, j, k], delta=1e-8)
 
+    def test_interpolate_3d_cubic_limited_cells(self):
+        """3D cubic interpolation. Discarded cells must be recalculated to the same values"""
+        self.init_3dcubic(extrapolate=True, extrapolation_type='linear')
+        reference = self.interp_func
+        self.interp_func = interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, self.data, extrapolate=True,
+                                                              extrapolation_type='linear', max_cells=5)
+        for x in np.linspace(self.x[0] - 0.5, self.x[-1] + 0.5, 11):
+            for y in np.linspace(self.y[0] - 0.5, self.y[-1] + 0.5, 11):
+                for z in np.linspace(self.z[0] - 0.5, self.z[-1] + 0.5, 11):
+                    self.assertEqual(self.interp_func(x, y, z), reference(x, y, z))
+                    self.assertLessEqual(self.interp_func.coefficients.cached_cells, 5)
+        with self.assertRaises(ValueError):
+            self.interp_func.calculate_coefficients()
+
+    def test_interpolate_3d_cubic_single_precision(self):
+        """3D cubic interpolation. Coefficients stored in single precision"""
+        self.interp_func = interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, self.data, single_precision=True)
+        self.interp_func.calculate_coefficients()
+        self.interp_data = data_file.cubic_interpolated_data
+        for i in range(len(self.xsamples)):
+            for j in range(len(self.ysamples)):
+                for k in range(len(self.zsamples)):
+                    self.assertAlmostEqual(self.interp_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]),
+                                           self.interp_data[i, j, k], delta=1e-5)
+
+    def test_interpolate_3d_cubic_single_precision_repeatable(self):
+        """3D cubic interpolation. In single precision the first evaluation of a cell gives the same value as the later ones"""
+        single_func = interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, self.data, single_precision=True)
+        limited_func = interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, self.data, max_cells=1, single_precision=True)
+        first_values = np.empty((len(self.xsamples), len(self.ysamples), len(self.zsamples)))
+        for i in range(len(self.xsamples)):
+            for j in range(len(self.ysamples)):
+                for k in range(len(self.zsamples)):
+                    first_values[i, j, k] = single_func(self.xsamples[i], self.ysamples[j], self.zsamples[k])
+                    # the cell is calculated again each time with a single cell kept
+                    self.assertEqual(limited_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]), first_values[i, j, k])
+        for i in range(len(self.xsamples)):
+            for j in range(len(self.ysamples)):
+                for k in range(len(self.zsamples)):
+                    self.assertEqual(single_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]), first_values[i, j, k])
+                    self.assertEqual(limited_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]), first_values[i, j, k])
+
+    def test_interpolate_3d_cubic_save_load(self):
+        """3D cubic interpolation. Coefficients saved to a file must give the same values once loaded"""
+        self.init_3dcubic()
+        self.interp_func.calculate_coefficients()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache')
+            self.interp_func.save(path, 'test data')
+            loaded_func = interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, self.data)
+            loaded_func.load(path, 'test data')
+            for i in range(len(self.xsamples)):
+                for j in range(len(self.ysamples)):
+                    for k in range(len(self.zsamples)):
+                        self.assertEqual(loaded_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]),
+                                         self.interp_func(self.xsamples[i], self.ysamples[j], self.zsamples[k]))
+            with self.assertRaises(ValueError):
+                loaded_func.load(path, 'other data')
+            with self.assertRaises(ValueError):
+                interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, self.data, single_precision=True).load(path, 'test data')
+            # the file must be rejected for different data, even with the same fingerprint
+            with self.assertRaises(ValueError):
+                interpolators3d.Interpolate3DCubic(self.x, self.y, self.z, 2 * self.data).load(path, 'test data')
+            del loaded_func
+
+    def test_interpolate_3d_cubic_calculate_coefficients(self):
+        """3D cubic interpolation. Coefficients calculated up front must match the ones calculated on demand"""
+        self.init_3dcubic(extrapolate=True, extrapolation_type='quadratic')
+        lazy = self.interp_func
+        self.init_3dcubic(extrapolate=True, extrapolation_type='quadratic')
+        self.interp_func.calculate_coefficients()
+        for x in np.linspace(self.x[0] - 0.5, self.x[-1] + 0.5, 11):
+            for y in np.linspace(self.y[0] - 0.5, self.y[-1] + 0.5, 11):
+                for z in np.linspace(self.z[0] - 0.5, self.z[-1] + 0.5, 11):
+                    self.assertAlmostEqual(self.interp_func(x, y, z), lazy(x, y, z), delta=1e-10)
+
     def test_interpolate_3d_cubic_bigvalues(self):
         """3D cubic interpolation. Test with big values (1e20) inside the boundaries"""
         factor = 1.e20
@@ -18,7 +18,9 @@
 
 cimport cython
 
-cdef int find_index(double[::1] x_view, int size, double v, double padding=*)
+cdef int find_index(double[::1] x_view, int size, double v, double padding=*, double inverse_spacing=*, int *hint=*)
+
+cdef double inverse_uniform_spacing(double[::1] x_view, int size)
 
 cdef double[::1] derivatives_array(double v, int deriv)
 
@@ -29,3 +31,7 @@ cdef inline double lerp(double x0, double x1, double y0, double y1, double x):
     return ((y1 - y0) / (x1 - x0)) * (x - x0) + y0
 
 cdef int factorial(int n)
+
+cdef void bicubic_coefficients(double *b) nogil
+
+cdef void tricubic_coefficients(double *b) nogil
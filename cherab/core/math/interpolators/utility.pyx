@@ -18,16 +18,26 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from numpy import array, float64
+
 cimport cython
+from libc.math cimport isinf, isnan, fabs
 from numpy cimport ndarray, PyArray_SimpleNew, NPY_FLOAT64, npy_intp, import_array
 
 # required by numpy c-api
 import_array()
 
+# cubic Hermite matrix, converts the constraints (f(0), f(1), f'(0), f'(1))
+# into the coefficients of (1, t, t^2, t^3), see tricubic_coefficients()
+HERMITE_MATRIX = array([[ 1.,  0.,  0.,  0.],
+                        [ 0.,  0.,  1.,  0.],
+                        [-3.,  3., -2., -1.],
+                        [ 2., -2.,  1.,  1.]], dtype=float64)
+
 @cython.cdivision(True)
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int find_index(double[::1] x_view, int size, double v, double padding=0.):
+cdef int find_index(double[::1] x_view, int size, double v, double padding=0., double inverse_spacing=0., int *hint=NULL):
     """
     Locates the lower index or the range that contains the specified value.
 
@@ -37,6 +47,16 @@ cdef int find_index(double[::1] x_view, int size, double v, double padding=0.):
     increasing ndarray for x. The array type must be double and may not be
     empty.
 
+    If the array is uniformly spaced, the index can be calculated directly
+    instead of searched for by supplying the inverse of the spacing, see
+    inverse_uniform_spacing(). Otherwise a hint may be supplied: the index
+    it points to and the neighbouring ones are checked before the bisection
+    search, and the index found is stored in it. Consecutive look-ups along
+    a ray usually fall in the same or in a neighbouring bin.
+
+    A NaN value is placed in the first bin (index 0), as by the bisection
+    search, so that the interpolated value is NaN.
+
     .. WARNING:: For speed, this function does not perform any type or bounds
        checking. Supplying malformed data may result in data corruption or a
        segmentation fault.
@@ -47,6 +67,10 @@ cdef int find_index(double[::1] x_view, int size, double v, double padding=0.):
     :param double v: The value to search for.
     :param double padding: defines the range in which extrapolation is allowed.
     Optional, default is 0.
+    :param double inverse_spacing: inverse of the spacing of the array if it
+    is uniform, 0 otherwise. Optional, default is 0.
+    :param int *hint: pointer to the index found by the previous search.
+    Optional, default is NULL (no hint).
     :return: The lower index f the bin containing the search value.
     :rtype: int
     """
@@ -55,9 +79,14 @@ cdef int find_index(double[::1] x_view, int size, double v, double padding=0.):
         int bottom_index
         int top_index
         int bisection_index
+        int index
 
     top_index = size - 1
 
+    # NaN fails every comparison below, it must not reach the conversion to an index
+    if isnan(v):
+        return 0
+
     # on array ends?
     if v == x_view[0]:
         return 0
@@ -91,6 +120,31 @@ cdef int find_index(double[::1] x_view, int size, double v, double padding=0.):
         # extrapolation range
         return top_index
 
+    # uniform array, the index is calculated and corrected for rounding errors
+    if inverse_spacing > 0.:
+        index = <int> ((v - x_view[0]) * inverse_spacing)
+        if index > top_index - 1:
+            index = top_index - 1
+        while index > 0 and v < x_view[index]:
+            index -= 1
+        while index < top_index - 1 and v >= x_view[index + 1]:
+            index += 1
+        return index
+
+    # check the hinted bin and its neighbours
+    if hint != NULL:
+        index = hint[0]
+        if 0 <= index < top_index:
+            if v < x_view[index]:
+                if index > 0 and v >= x_view[index - 1]:
+                    hint[0] = index - 1
+                    return index - 1
+            elif v < x_view[index + 1]:
+                return index
+            elif index + 2 <= top_index and v < x_view[index + 2]:
+                hint[0] = index + 1
+                return index + 1
+
     # bisection search inside array range
     bottom_index = 0
     bisection_index = top_index / 2
@@ -101,9 +155,49 @@ cdef int find_index(double[::1] x_view, int size, double v, double padding=0.):
             top_index = bisection_index
         bisection_index = (top_index + bottom_index) / 2
 
+    if hint != NULL:
+        hint[0] = bottom_index
+
     return bottom_index
 
 
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double inverse_uniform_spacing(double[::1] x_view, int size):
+    """
+    Returns the inverse of the spacing of a uniformly spaced array.
+
+    The array is considered uniform if each value differs from the
+    corresponding uniformly spaced value by less than 1e-9 times the spacing.
+    Otherwise, or if the spacing is not finite, 0 is returned. The result is
+    meant to be passed to find_index().
+
+    :param double[::1] x_view: The memory view of an array containing
+    monotonically increasing values.
+    :param int size: The size of the x array
+    :return: The inverse of the spacing or 0.
+    :rtype: double
+    """
+
+    cdef:
+        double spacing
+        int i
+
+    if size < 2:
+        return 0.
+
+    spacing = (x_view[size - 1] - x_view[0]) / (size - 1)
+    if isinf(spacing) or isnan(spacing) or spacing <= 0.:
+        return 0.
+
+    for i in range(1, size - 1):
+        if fabs(x_view[i] - (x_view[0] + i * spacing)) > 1e-9 * spacing:
+            return 0.
+
+    return 1. / spacing
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 cdef double[::1] derivatives_array(double v, int deriv):
@@ -150,4 +244,77 @@ cdef int factorial(int n):
     if n <= 0:
         return 1
     else:
-        return n * factorial(n-1)
\ No newline at end of file
+        return n * factorial(n-1)
+
+cdef inline void _hermite(double *v, int stride) nogil:
+    """
+    Converts 4 cubic Hermite constraints into polynomial coefficients in place.
+
+    On entry v[0], v[stride], v[2*stride] and v[3*stride] hold the values at
+    t=0 and t=1 and the derivatives at t=0 and t=1. On exit they hold the
+    coefficients of 1, t, t^2 and t^3.
+    """
+
+    cdef double f0, f1, d0, d1
+
+    f0 = v[0]
+    f1 = v[stride]
+    d0 = v[2*stride]
+    d1 = v[3*stride]
+
+    v[0] = f0
+    v[stride] = d0
+    v[2*stride] = 3.*(f1 - f0) - 2.*d0 - d1
+    v[3*stride] = 2.*(f0 - f1) + d0 + d1
+
+
+cdef void tricubic_coefficients(double *b) nogil:
+    """
+    Calculates the coefficients of a tricubic polynomial from its constraints.
+
+    This is the closed form of the tricubic interpolation of Lekien and
+    Marsden. The 64x64 constraint matrix is the tensor product of the 4x4
+    cubic Hermite matrix, so it is applied axis by axis and in place.
+
+    On entry b[16*p + 4*q + r] holds the constraint of type p, q and r along x,
+    y and z respectively, where types 0 and 1 are the values on the lower and
+    upper cell boundaries and types 2 and 3 are the derivatives on the lower
+    and upper boundaries. The derivatives must be expressed in cell
+    coordinates, i.e. multiplied by the cell width along each derivative
+    axis. On exit b[16*i + 4*j + k] holds the coefficient of tx^i ty^j tz^k
+    where tx, ty and tz are the cell coordinates in the range [0, 1].
+
+    :param double *b: Pointer to an array of 64 doubles.
+    """
+
+    cdef int i, j
+
+    for i in range(16):
+        _hermite(b + 4*i, 1)
+
+    for i in range(4):
+        for j in range(4):
+            _hermite(b + 16*i + j, 4)
+
+    for i in range(16):
+        _hermite(b + i, 16)
+
+
+cdef void bicubic_coefficients(double *b) nogil:
+    """
+    Calculates the coefficients of a bicubic polynomial from its constraints.
+
+    Two dimensional counterpart of tricubic_coefficients(). On entry
+    b[4*p + q] holds the constraint of type p and q along x and y, on exit
+    b[4*i + j] holds the coefficient of tx^i ty^j.
+
+    :param double *b: Pointer to an array of 16 doubles.
+    """
+
+    cdef int i
+
+    for i in range(4):
+        _hermite(b + 4*i, 1)
+
+    for i in range(4):
+        _hermite(b + i, 4)
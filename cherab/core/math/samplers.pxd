@@ -16,6 +16,8 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from numpy cimport ndarray
+
 cpdef tuple sample1d(object function1d, tuple x_range)
 
 cpdef tuple sample2d(object function2d, tuple x_range, tuple y_range)
@@ -25,3 +27,9 @@ cpdef tuple sample3d(object function3d, tuple x_range, tuple y_range, tuple z_ra
 cpdef tuple samplevector2d(object function2d, tuple x_range, tuple y_range)
 
 cpdef tuple samplevector3d(object function3d, tuple x_range, tuple y_range, tuple z_range)
+
+cdef ndarray as_points3d(object points)
+
+cpdef ndarray sample3d_points(object function3d, object points)
+
+cpdef ndarray samplevector3d_points(object function3d, object points)
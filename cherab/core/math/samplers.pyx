@@ -18,7 +18,8 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from numpy import empty, linspace
+from numpy import empty, linspace, ascontiguousarray, float64
+from numpy cimport ndarray
 from cherab.core.math.function cimport Function1D, Function2D, Function3D, VectorFunction2D, VectorFunction3D
 from cherab.core.math.function cimport autowrap_function1d, autowrap_function2d, autowrap_function3d, autowrap_vectorfunction2d, autowrap_vectorfunction3d
 from raysect.core cimport Vector3D
@@ -30,6 +31,9 @@ of 1D, 2D and 3D functions.
 
 These functions use C calls when sampling Function1D, Function2D and Function3D
 objects and are therefore considerably faster than the equivalent Python code.
+
+The sample3d_points() and samplevector3d_points() functions evaluate a function
+at an arbitrary set of points, supplied as an Nx3 array, in a single C loop.
 """
 
 @cython.boundscheck(False)
@@ -343,3 +347,94 @@ cpdef tuple samplevector3d(object function3d, tuple x_range, tuple y_range, tupl
                 v_view[i, j, k, 2] = vector.z
 
     return x, y, z, v
+
+
+cdef ndarray as_points3d(object points):
+    """
+    Converts an array-like object into a C contiguous Nx3 array of doubles.
+
+    The supplied object is only copied if it is not already a C contiguous
+    array of doubles.
+
+    :param points: an array-like object of shape (N, 3).
+    :return: a C contiguous ndarray of shape (N, 3) and type float64.
+    """
+
+    cdef ndarray points_np
+
+    points_np = ascontiguousarray(points, dtype=float64)
+
+    if points_np.ndim != 2 or points_np.shape[1] != 3:
+        raise ValueError("Points must be an array of shape (N, 3) containing the (x, y, z) coordinates of each point.")
+
+    return points_np
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef ndarray sample3d_points(object function3d, object points):
+    """
+    Samples a 3D function at each of the supplied points.
+
+    The points are supplied as an Nx3 array where the last axis holds the x, y
+    and z coordinates of each point respectively.
+
+    :param function3d: a Python function or Function3D object
+    :param points: an array-like object of shape (N, 3)
+    :return: an array of N function samples
+    """
+
+    cdef:
+        int i
+        Function3D f3d
+        double[:, ::1] p_view
+        double[::1] v_view
+
+    f3d = autowrap_function3d(function3d)
+    p_view = as_points3d(points)
+
+    v = empty(p_view.shape[0])
+    v_view = v
+
+    for i in range(p_view.shape[0]):
+        v_view[i] = f3d.evaluate(p_view[i, 0], p_view[i, 1], p_view[i, 2])
+
+    return v
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef ndarray samplevector3d_points(object function3d, object points):
+    """
+    Samples a 3D vector function at each of the supplied points.
+
+    The points are supplied as an Nx3 array where the last axis holds the x, y
+    and z coordinates of each point respectively. The function samples are
+    returned as an Nx3 array where the last axis are the x, y, and z
+    components of the vector respectively.
+
+    :param function3d: a Python function or VectorFunction3D object
+    :param points: an array-like object of shape (N, 3)
+    :return: an Nx3 array of vector function samples
+    """
+
+    cdef:
+        int i
+        VectorFunction3D f3d
+        double[:, ::1] p_view
+        double[:, ::1] v_view
+        Vector3D vector
+
+    f3d = autowrap_vectorfunction3d(function3d)
+    p_view = as_points3d(points)
+
+    v = empty((p_view.shape[0], 3))
+    v_view = v
+
+    for i in range(p_view.shape[0]):
+        vector = f3d.evaluate(p_view[i, 0], p_view[i, 1], p_view[i, 2])
+        v_view[i, 0] = vector.x
+        v_view[i, 1] = vector.y
+        v_view[i, 2] = vector.z
+
+    return v
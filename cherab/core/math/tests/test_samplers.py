@@ -18,7 +18,7 @@
 
 import unittest
 from numpy import empty
-from cherab.core.math.samplers import sample1d, sample2d, sample3d
+from cherab.core.math.samplers import sample1d, sample2d, sample3d, sample3d_points
 
 
 def fn1d(x):
@@ -280,4 +280,34 @@ class TestSampler3D(unittest.TestCase):
 
                 for k in range(3):
 
-                    self.assertEqual(ts[i][j][k], rs[i][j][k], "Sample point [{}, {}, {}] is incorrect.".format(i, j, k))
\ No newline at end of file
+                    self.assertEqual(ts[i][j][k], rs[i][j][k], "Sample point [{}, {}, {}] is incorrect.".format(i, j, k))
+
+
+class TestSampler3DPoints(unittest.TestCase):
+
+    def test_sample3d_points_invalid_shape(self):
+
+        # points must be an Nx3 array
+        with self.assertRaises(ValueError, msg="A ValueError was not raised when the points array did not have shape (N, 3)."):
+
+            sample3d_points(fn3d, [[1, 2], [3, 4]])
+
+    def test_sample3d_points_invalid_function_called(self):
+
+        # invalid function type
+        with self.assertRaises(TypeError, msg="Type error was not raised when a string was (invalidly) supplied for the function."):
+
+            sample3d_points("blah", [[1, 2, 3]])
+
+    def test_sample3d_points_sample(self):
+
+        points = [[1.0, 2.0, 3.0], [1.5, 2.5, 3.5], [2.0, 3.0, 4.0], [-1.0, 0.0, 0.5]]
+
+        ts = sample3d_points(fn3d, points)
+
+        self.assertEqual(ts.shape, (4,), "Samples array has the wrong shape.")
+
+        for i in range(4):
+
+            self.assertEqual(ts[i], fn3d(*points[i]), "Sample point [{}] is incorrect.".format(i))
+
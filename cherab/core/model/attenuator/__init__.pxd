@@ -1 +1,2 @@
 from cherab.core.model.attenuator.singleray cimport SingleRayAttenuator
+from cherab.core.model.attenuator.multiray cimport MultiRayAttenuator
@@ -1 +1,2 @@
 from .singleray import SingleRayAttenuator
+from .multiray import MultiRayAttenuator
@@ -0,0 +1,250 @@
+# cython: language_level=3
+
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+from scipy.integrate import cumtrapz
+import numpy as np
+cimport numpy as np
+
+from raysect.optical cimport AffineMatrix3D, Point3D, Vector3D, new_point3d, new_vector3d
+from cherab.core.utility import EvAmuToMS, EvToJ
+from cherab.core.atomic cimport AtomicData
+from cherab.core.math cimport Interpolate3DLinear
+from cherab.core.plasma cimport Plasma
+from cherab.core.beam cimport Beam
+from cherab.core.utility.constants cimport DEGREES_TO_RADIANS
+
+from libc.math cimport exp, tan, M_PI
+cimport cython
+
+
+cdef class MultiRayAttenuator(SingleRayAttenuator):
+    """
+    Beam attenuator that resolves the attenuation across the beam cross-section.
+
+    The SingleRayAttenuator calculates the attenuation along the beam axis only
+    and applies it to the whole beam cross-section. This is a poor approximation
+    for wide beams crossing steep plasma gradients. The MultiRayAttenuator
+    calculates the attenuation along a grid of nx by ny rays spanning the beam
+    envelope out to +/- extent standard deviations. The rays follow the beam
+    divergence. The attenuation is interpolated between rays, points outside
+    the ray grid use the attenuation of the nearest ray.
+
+    All rays are sampled in a single vectorised pass, the beam stopping data
+    cache is shared with the SingleRayAttenuator implementation. The density
+    lookup table of the SingleRayAttenuator is not supported.
+
+    :param step: The spacing of the attenuation samples along each ray in meters.
+    :param nx: The number of rays across the beam x axis.
+    :param ny: The number of rays across the beam y axis.
+    :param extent: The extent of the ray grid in beam standard deviations.
+    :param clamp_to_zero: If True, the density is zero beyond clamp_sigma standard deviations.
+    :param clamp_sigma: The density clamping radius in beam standard deviations.
+    :param beam: The beam to attenuate.
+    :param plasma: The plasma the beam is travelling through.
+    :param atomic_data: The atomic data source.
+    """
+
+    def __init__(self, double step=0.01, int nx=9, int ny=9, double extent=3.0, bint clamp_to_zero=False,
+                 double clamp_sigma=5.0, Beam beam=None, Plasma plasma=None, AtomicData atomic_data=None):
+
+        super().__init__(step, clamp_to_zero, clamp_sigma, beam, plasma, atomic_data)
+
+        self._attenuation = None
+
+        # ray grid
+        if nx < 2 or ny < 2:
+            raise ValueError("The number of rays along each axis must be at least 2.")
+        self._nx = nx
+        self._ny = ny
+
+        if extent <= 0.0:
+            raise ValueError("The ray grid extent must be greater than zero.")
+        self._extent = extent
+
+    @property
+    def nx(self):
+        return self._nx
+
+    @nx.setter
+    def nx(self, int value):
+        if value < 2:
+            raise ValueError("The number of rays along each axis must be at least 2.")
+        self._nx = value
+        self.notifier.notify()
+        self._change()
+
+    @property
+    def ny(self):
+        return self._ny
+
+    @ny.setter
+    def ny(self, int value):
+        if value < 2:
+            raise ValueError("The number of rays along each axis must be at least 2.")
+        self._ny = value
+        self.notifier.notify()
+        self._change()
+
+    @property
+    def extent(self):
+        return self._extent
+
+    @extent.setter
+    def extent(self, double value):
+        if value <= 0.0:
+            raise ValueError("The ray grid extent must be greater than zero.")
+        self._extent = value
+        self.notifier.notify()
+        self._change()
+
+    @property
+    def lookup_table(self):
+        return False
+
+    @lookup_table.setter
+    def lookup_table(self, bint value):
+        if value:
+            raise ValueError("The MultiRayAttenuator does not support the density lookup table.")
+
+    @property
+    def lookup_resolution(self):
+        return None
+
+    @lookup_resolution.setter
+    def lookup_resolution(self, double value):
+        raise ValueError("The MultiRayAttenuator does not support the density lookup table.")
+
+    @cython.cdivision(True)
+    cpdef double density(self, double x, double y, double z) except? -1e999:
+        """
+        Returns the beam density at the specified point.
+
+        The point is specified in beam space.
+
+        :param x: x coordinate in meters.
+        :param y: y coordinate in meters.
+        :param z: z coordinate in meters.
+        :return: Density in m^-3.
+        """
+
+        cdef double sigma_x, sigma_y, u, v, norm_radius_sqr, gaussian_sample
+
+        # use cached data if available
+        if self._stopping_data is None:
+            self._populate_stopping_data_cache()
+
+        if self._attenuation is None:
+            self._calc_attenuation()
+
+        # calculate beam width
+        sigma_x = self._beam.get_sigma() + z * self._tanxdiv
+        sigma_y = self._beam.get_sigma() + z * self._tanydiv
+
+        # normalised coordinates
+        u = x / sigma_x
+        v = y / sigma_y
+        norm_radius_sqr = u * u + v * v
+
+        # clamp low densities to zero (beam models can skip their calculation if density is zero)
+        if self.clamp_to_zero:
+            if norm_radius_sqr > self._clamp_sigma_sqr:
+                return 0.0
+
+        # bi-variate Gaussian distribution (normalised)
+        gaussian_sample = exp(-0.5 * norm_radius_sqr) / (2 * M_PI * sigma_x * sigma_y)
+
+        # points beyond the ray grid use the attenuation of the outermost rays
+        u = min(max(u, -self._extent), self._extent)
+        v = min(max(v, -self._extent), self._extent)
+
+        return self._source_density * self._attenuation.evaluate(u, v, z) * gaussian_sample
+
+    @cython.cdivision(True)
+    cdef void _calc_attenuation(self):
+        """
+        Attenuation is calculated along a grid of rays spanning the beam envelope.
+
+        Fill attribute '_attenuation' with a 3D function of the normalised
+        transverse coordinates (x / sigma_x, y / sigma_y) and the beam axis
+        position in meters, returning the fraction of the beam remaining.
+        """
+
+        cdef:
+            AffineMatrix3D beam_to_plasma
+            Point3D origin
+            Vector3D x_axis, y_axis, z_axis, beam_velocity
+            int nbeam
+            double energy, speed, sigma
+            np.ndarray beam_z, u, v, ray_u, ray_v, ray_x, ray_y, points, stopping_coeff, path_scale, attenuation
+
+        # calculate transform to plasma space
+        beam_to_plasma = self._beam.to(self._plasma)
+        origin = new_point3d(0.0, 0.0, 0.0).transform(beam_to_plasma)
+        x_axis = new_vector3d(1.0, 0.0, 0.0).transform(beam_to_plasma)
+        y_axis = new_vector3d(0.0, 1.0, 0.0).transform(beam_to_plasma)
+        z_axis = self._beam.BEAM_AXIS.transform(beam_to_plasma)
+
+        self._tanxdiv = tan(DEGREES_TO_RADIANS * self._beam.divergence_x)
+        self._tanydiv = tan(DEGREES_TO_RADIANS * self._beam.divergence_y)
+
+        # sample points along the beam
+        nbeam = max(1 + int(np.ceil(self._beam.length / self._step)), 4)
+        beam_z = np.linspace(0.0, self._beam.length, nbeam)
+
+        # ray grid in normalised transverse coordinates
+        u = np.linspace(-self._extent, self._extent, self._nx)
+        v = np.linspace(-self._extent, self._extent, self._ny)
+        ray_u, ray_v = np.meshgrid(u, v, indexing='ij')
+        ray_u = ray_u.ravel()
+        ray_v = ray_v.ravel()
+
+        # beam space transverse ray positions, the rays follow the beam divergence
+        sigma = self._beam.get_sigma()
+        ray_x = ray_u[:, None] * (sigma + beam_z * self._tanxdiv)[None, :]
+        ray_y = ray_v[:, None] * (sigma + beam_z * self._tanydiv)[None, :]
+
+        # ray sample points in plasma space
+        points = np.empty((ray_u.shape[0], nbeam, 3))
+        points[:, :, 0] = origin.x + ray_x * x_axis.x + ray_y * y_axis.x + beam_z * z_axis.x
+        points[:, :, 1] = origin.y + ray_x * x_axis.y + ray_y * y_axis.y + beam_z * z_axis.y
+        points[:, :, 2] = origin.z + ray_x * x_axis.z + ray_y * y_axis.z + beam_z * z_axis.z
+
+        energy = self._beam.energy
+        speed = EvAmuToMS.to(energy)
+        beam_velocity = z_axis.normalise() * speed
+        self._source_density = self._beam.power / EvToJ.to(energy * self._beam.element.atomic_weight) / speed
+
+        # stopping coefficients for all rays in a single pass
+        stopping_coeff = self._beam_stopping(points.reshape(-1, 3), beam_velocity).reshape(ray_u.shape[0], nbeam)
+
+        # the diverging rays are slightly longer than the beam axis
+        path_scale = np.sqrt(1 + (ray_u * self._tanxdiv)**2 + (ray_v * self._tanydiv)**2)
+
+        attenuation = np.exp(-cumtrapz(stopping_coeff, beam_z, axis=1, initial=0.0) * path_scale[:, None] / speed)
+
+        # a tiny degree of extrapolation is permitted to handle numerical accuracy issues with the end of the array
+        self._attenuation = Interpolate3DLinear(u, v, beam_z, attenuation.reshape(self._nx, self._ny, nbeam),
+                                                extrapolate=True, extrapolation_range=1e-9)
+
+    def _change(self):
+
+        # reset cached data
+        super()._change()
+        self._attenuation = None
@@ -30,13 +30,24 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         double _step, _clamp_sigma_sqr, _tanxdiv, _tanydiv, _source_density
         bint clamp_to_zero
 
+    cdef:
+        bint _lookup_table
+        double _lookup_resolution, _table_length, _table_dz, _table_dr
+        double[:, ::1] _table
+
+    cpdef double clamp_radius(self)
+
+    cdef double _lookup(self, double radius, double z)
+
+    cdef int _build_table(self) except -1
+
     cpdef calculate_attenuation(self)
 
     cdef void _calc_attenuation(self)
 
-    cdef np.ndarray _beam_attenuation(self, np.ndarray axis, np.ndarray x, np.ndarray y, np.ndarray z,
-                                          double energy, double power, double mass, Vector3D direction)
+    cdef np.ndarray _beam_attenuation(self, np.ndarray axis, np.ndarray points, double energy, double power,
+                                      double mass, Vector3D direction)
 
-    cdef double _beam_stopping(self, double x, double y, double z, Vector3D beam_velocity)
+    cdef np.ndarray _beam_stopping(self, np.ndarray points, Vector3D beam_velocity)
 
     cdef int _populate_stopping_data_cache(self) except -1
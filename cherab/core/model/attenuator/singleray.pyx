@@ -31,20 +31,27 @@ from cherab.core.beam cimport Beam
 from cherab.core.species cimport Species
 from cherab.core.utility.constants cimport DEGREES_TO_RADIANS
 
-from libc.math cimport exp, sqrt, tan, M_PI
+from libc.math cimport exp, sqrt, tan, M_PI, INFINITY
 cimport cython
 
 
-# todo: attenuation calculation could be optimised further using memory views etc...
 cdef class SingleRayAttenuator(BeamAttenuator):
 
-    def __init__(self, double step=0.01, bint clamp_to_zero=False, double clamp_sigma=5.0, Beam beam=None, Plasma plasma=None, AtomicData atomic_data=None):
+    def __init__(self, double step=0.01, bint clamp_to_zero=False, double clamp_sigma=5.0, Beam beam=None, Plasma plasma=None,
+                 AtomicData atomic_data=None, bint lookup_table=False, double lookup_resolution=0.02):
 
         super().__init__(beam, plasma, atomic_data)
 
         self._source_density = 0.
         self._density = None
         self._stopping_data = None
+        self._table = None
+
+        # tabulated beam density settings
+        if lookup_resolution <= 0.0:
+            raise ValueError("The lookup table resolution must be greater than zero.")
+        self._lookup_table = lookup_table
+        self._lookup_resolution = lookup_resolution
 
         # spacing of density sample points along the beam
         if step <= 0.0:
@@ -84,6 +91,42 @@ cdef class SingleRayAttenuator(BeamAttenuator):
             raise ValueError("The value of clamp_sigma must be greater than zero.")
         self._clamp_sigma_sqr = value ** 2
 
+        # the lookup table extends to the clamping radius
+        self._table = None
+
+    @property
+    def lookup_table(self):
+        """
+        If True the beam density is tabulated on a grid of normalised radius
+        and beam axis position.
+
+        The table extends to clamp_sigma standard deviations, points beyond the
+        envelope exit without evaluating any transcendental functions. The
+        radial resolution of the table is set by lookup_resolution (in
+        standard deviations), the axial resolution is the attenuation step.
+
+        The axial interpolation is the same as without the table, the radial
+        interpolation differs from the Gaussian beam profile by less than
+        lookup_resolution**2 / 8 of the density on the beam axis.
+        """
+        return self._lookup_table
+
+    @lookup_table.setter
+    def lookup_table(self, bint value):
+        self._lookup_table = value
+        self._table = None
+
+    @property
+    def lookup_resolution(self):
+        return self._lookup_resolution
+
+    @lookup_resolution.setter
+    def lookup_resolution(self, double value):
+        if value <= 0.0:
+            raise ValueError("The lookup table resolution must be greater than zero.")
+        self._lookup_resolution = value
+        self._table = None
+
     @cython.cdivision(True)
     cpdef double density(self, double x, double y, double z) except? -1e999:
         """
@@ -106,13 +149,20 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         if self._density is None:
             self._calc_attenuation()
 
+        if self._lookup_table and self._table is None:
+            self._build_table()
+
         # calculate beam width
-        sigma_x = self._beam.sigma + z * self._tanxdiv
-        sigma_y = self._beam.sigma + z * self._tanydiv
+        sigma_x = self._beam.get_sigma() + z * self._tanxdiv
+        sigma_y = self._beam.get_sigma() + z * self._tanydiv
 
         # normalised radius squared
         norm_radius_sqr = ((x / sigma_x)**2 + (y / sigma_y)**2)
 
+        # tabulated density inside the envelope
+        if self._lookup_table and norm_radius_sqr < self._clamp_sigma_sqr and 0 <= z <= self._table_length:
+            return self._lookup(sqrt(norm_radius_sqr), z) / (2 * M_PI * sigma_x * sigma_y)
+
         # clamp low densities to zero (beam models can skip their calculation if density is zero)
         # comparison is done using the squared radius to avoid a costly square root
         if self.clamp_to_zero:
@@ -124,6 +174,80 @@ cdef class SingleRayAttenuator(BeamAttenuator):
 
         return self._density.evaluate(z) * gaussian_sample
 
+    cpdef double clamp_radius(self):
+        """
+        Returns the radius beyond which the beam density is zero.
+
+        :return: clamp_sigma if clamp_to_zero is True, infinity otherwise.
+        """
+
+        if self.clamp_to_zero:
+            return sqrt(self._clamp_sigma_sqr)
+        return INFINITY
+
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    cdef double _lookup(self, double radius, double z):
+        """
+        Bi-linearly interpolates the density table.
+
+        The table grids are uniform so the cell indices are calculated directly.
+
+        :param radius: normalised radius, must lie inside the table.
+        :param z: beam axis position in meters, must lie inside the table.
+        :return: The tabulated density multiplied by 2 pi sigma_x sigma_y.
+        """
+
+        cdef:
+            int iz, ir
+            double fz, fr
+
+        fz = z / self._table_dz
+        iz = min(<int> fz, self._table.shape[0] - 2)
+        fz -= iz
+
+        fr = radius / self._table_dr
+        ir = min(<int> fr, self._table.shape[1] - 2)
+        fr -= ir
+
+        return ((1 - fz) * ((1 - fr) * self._table[iz, ir] + fr * self._table[iz, ir + 1]) +
+                fz * ((1 - fr) * self._table[iz + 1, ir] + fr * self._table[iz + 1, ir + 1]))
+
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _build_table(self) except -1:
+        """
+        Tabulates the beam density over normalised radius and beam axis position.
+
+        The table holds density * 2 pi sigma_x sigma_y, the normalisation of the
+        Gaussian beam profile is applied when the table is sampled.
+        """
+
+        cdef:
+            int nz, nr, i, j
+            double radius, linear_density
+            double[:, ::1] table
+
+        nz = max(1 + int(np.ceil(self._beam.length / self._step)), 4)
+        nr = max(1 + int(np.ceil(sqrt(self._clamp_sigma_sqr) / self._lookup_resolution)), 2)
+
+        self._table_length = self._beam.length
+        self._table_dz = self._table_length / (nz - 1)
+        self._table_dr = sqrt(self._clamp_sigma_sqr) / (nr - 1)
+
+        table = np.empty((nz, nr))
+        for i in range(nz):
+            linear_density = self._density.evaluate(i * self._table_dz)
+            for j in range(nr):
+                radius = j * self._table_dr
+                table[i, j] = linear_density * exp(-0.5 * radius * radius)
+
+        self._table = table
+        return 0
+
     cpdef calculate_attenuation(self):
         """
         Trigger beam attenuation calculation
@@ -134,8 +258,6 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         self._calc_attenuation()
 
     @cython.cdivision(True)
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
     cdef void _calc_attenuation(self):
         """
         Attenuation is calculated along the beam axis and extrapolated across the beam.
@@ -146,32 +268,27 @@ cdef class SingleRayAttenuator(BeamAttenuator):
 
         cdef:
             AffineMatrix3D beam_to_plasma
+            Point3D origin
             Vector3D direction
-            int nbeam, i
-            np.ndarray beam_z, xaxis, yaxis, zaxis, beam_density
-            double bzv
+            int nbeam
+            np.ndarray beam_z, points, beam_density
 
         # calculate transform to plasma space
         beam_to_plasma = self._beam.to(self._plasma)
+        origin = new_point3d(0.0, 0.0, 0.0).transform(beam_to_plasma)
         direction = self._beam.BEAM_AXIS.transform(beam_to_plasma)
 
         # sample points along the beam
         nbeam = max(1 + int(np.ceil(self._beam.length / self._step)), 4)
         beam_z = np.linspace(0.0, self._beam.length, nbeam)
 
-        xaxis = np.zeros(nbeam)
-        yaxis = np.zeros(nbeam)
-        zaxis = np.zeros(nbeam)
+        # beam axis points in plasma space, the transform is affine so each point is origin + z * direction
+        points = np.empty((nbeam, 3))
+        points[:, 0] = origin.x + beam_z * direction.x
+        points[:, 1] = origin.y + beam_z * direction.y
+        points[:, 2] = origin.z + beam_z * direction.z
 
-        for i, bzv in enumerate(beam_z):
-
-            paxis = new_point3d(0.0, 0.0, bzv).transform(beam_to_plasma)
-            xaxis[i] = paxis.x
-            yaxis[i] = paxis.y
-            zaxis[i] = paxis.z
-
-        beam_density = self._beam_attenuation(beam_z, xaxis, yaxis, zaxis,
-                                              self._beam.energy, self._beam.power,
+        beam_density = self._beam_attenuation(beam_z, points, self._beam.energy, self._beam.power,
                                               self._beam.element.atomic_weight, direction)
 
         self._tanxdiv = tan(DEGREES_TO_RADIANS * self._beam.divergence_x)
@@ -180,32 +297,28 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         # a tiny degree of extrapolation is permitted to handle numerical accuracy issues with the end of the array
         self._density = Interpolate1DLinear(beam_z, beam_density, extrapolate=True, extrapolation_range=1e-9)
 
+        # density table must be rebuilt from the new attenuation data
+        self._table = None
+
     @cython.cdivision(True)
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    cdef np.ndarray _beam_attenuation(self, np.ndarray axis, np.ndarray x, np.ndarray y, np.ndarray z,
-                                          double energy, double power, double mass, Vector3D direction):
+    cdef np.ndarray _beam_attenuation(self, np.ndarray axis, np.ndarray points, double energy, double power,
+                                      double mass, Vector3D direction):
         """
         axis has to be sorted
 
-        :param axis:
-        :param x: list of positions in meters
-        :param y: list of positions in meters
-        :param z: list of positions in meters
+        :param axis: positions along the beam axis in meters
+        :param points: Nx3 array of the corresponding plasma space positions in meters
         :param energy: beam energy in eV/amu
         :param power: beam power in W
         :param mass: atomic mass in amu
-        :param direction:
-        :return: a list of linear densities in m^-1
+        :param direction: beam direction in plasma space
+        :return: an array of linear densities in m^-1
         """
 
         cdef:
             np.ndarray stopping_coeff
             double speed, beam_particle_rate, beam_density
-            Vector3D beam_velosity
-            int i, naxis
-
-        naxis = axis.size
+            Vector3D beam_velocity
 
         speed = EvAmuToMS.to(energy)
         beam_velocity = direction.normalise() * speed
@@ -214,21 +327,17 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         beam_density = beam_particle_rate / speed
         self._source_density = beam_density
 
-        stopping_coeff = np.zeros(naxis)
-        for i in range(naxis):
-            stopping_coeff[i] = self._beam_stopping(x[i], y[i], z[i], beam_velocity)
+        stopping_coeff = self._beam_stopping(points, beam_velocity)
 
         return beam_density * np.exp(-cumtrapz(stopping_coeff, axis, initial=0.0) / speed)
 
     @cython.cdivision(True)
-    cdef double _beam_stopping(self, double x, double y, double z, Vector3D beam_velocity):
+    cdef np.ndarray _beam_stopping(self, np.ndarray points, Vector3D beam_velocity):
         """
 
-        :param x: position in meters
-        :param y: position in meters
-        :param z: position in meters
+        :param points: Nx3 array of positions in meters
         :param beam_velocity: beam velocity in m/s
-        :return: a stopping coefficient in s^-1
+        :return: an array of stopping coefficients in s^-1
         """
 
         # see www.adas.ac.uk/man/chap3-04.pdf equation 4.4.7
@@ -236,36 +345,35 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         # the impurity fractions used in the above document
 
         cdef:
-            double density_sum, stopping_coeff, target_ne, target_ti, interaction_speed, interaction_energy, target_equiv_ne
+            np.ndarray densities, density_sum, stopping_coeff, target_ti, target_velocity, interaction_energy
             Species species
             BeamStoppingRate coeff
-            int target_z
-            Vector3D target_velocity, interaction_velocity
+            int target_z, i
 
-        # z-weighted density sum
-        density_sum = 0
-        for species, _ in self._stopping_data:
-            density_sum += species.element.atomic_number**2 * species.distribution.density(x, y, z)
+        # sample the species densities once, they are needed for the z-weighted density sum and the stopping sum
+        densities = np.empty((len(self._stopping_data), points.shape[0]))
+        density_sum = np.zeros(points.shape[0])
+        for i, (species, _) in enumerate(self._stopping_data):
+            densities[i] = species.distribution.density_points(points)
+            density_sum += species.element.atomic_number**2 * densities[i]
 
         # stopping coefficient
-        stopping_coeff = 0
-        for species, coeff in self._stopping_data:
+        stopping_coeff = np.zeros(points.shape[0])
+        for i, (species, coeff) in enumerate(self._stopping_data):
 
             # sample species distribution
             target_z = species.element.atomic_number
-            target_ne = species.distribution.density(x, y, z) * target_z
-            target_ti = species.distribution.effective_temperature(x, y, z)
-            target_velocity = species.distribution.bulk_velocity(x, y, z)
+            target_ti = species.distribution.effective_temperature_points(points)
+            target_velocity = species.distribution.bulk_velocity_points(points)
 
             # calculate mean beam interaction energy
-            interaction_velocity = beam_velocity - target_velocity
-            interaction_speed = interaction_velocity.length
-            interaction_energy = EvAmuToMS.inv(interaction_speed)
-
-            # species equivalent electron density
-            target_equiv_ne = density_sum / target_z
+            target_velocity[:, 0] -= beam_velocity.x
+            target_velocity[:, 1] -= beam_velocity.y
+            target_velocity[:, 2] -= beam_velocity.z
+            interaction_energy = EvAmuToMS.inv(np.sqrt((target_velocity**2).sum(axis=1)))
 
-            stopping_coeff += target_ne * coeff.evaluate(interaction_energy, target_equiv_ne, target_ti)
+            # species equivalent electron density is density_sum / target_z
+            stopping_coeff += densities[i] * target_z * coeff.evaluate_array(interaction_energy, density_sum / target_z, target_ti)
 
         return stopping_coeff
 
@@ -301,3 +409,4 @@ cdef class SingleRayAttenuator(BeamAttenuator):
         # reset cached data
         self._density = None
         self._stopping_data = None
+        self._table = None
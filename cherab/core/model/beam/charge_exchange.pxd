@@ -30,11 +30,16 @@ cdef class BeamCXLine(BeamModel):
         Species _target_species
         double _wavelength
         BeamCXRate _ground_beam_rate
-        list _excited_beam_data
+        list _excited_beam_rates, _population_rates, _species
+        int _num_species
+        double[::1] _species_z, _charge_density, _interaction_energy, _temperature
+        double _density_sum, _total_charge_density
 
     cdef double _composite_cx_rate(self, double x, double y, double z, double interaction_energy,
                                           Vector3D donor_velocity, double receiver_temperature, double receiver_density) except? -1e999
 
-    cdef double _beam_population(self, double x, double y, double z, Vector3D beam_velocity, list population_data) except? -1e999
+    cdef int _sample_species(self, double x, double y, double z, Vector3D beam_velocity) except -1
+
+    cdef double _beam_population(self, int metastable) except? -1e999
 
     cdef int _populate_cache(self) except -1
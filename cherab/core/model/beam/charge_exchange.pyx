@@ -21,6 +21,7 @@
 """Calculate CX emission with ADAS beam coefficients with beam"""
 
 from scipy import constants
+import numpy as np
 
 from libc.math cimport exp, sqrt, M_PI as pi
 from numpy cimport ndarray
@@ -28,7 +29,7 @@ cimport cython
 from raysect.optical.material.emitter.inhomogeneous import NumericalIntegrator
 
 from cherab.core cimport Species, Plasma, Beam, Element, BeamPopulationRate
-from cherab.core.model.lineshape import doppler_shift, thermal_broadening, add_gaussian_line
+from cherab.core.model.lineshape cimport doppler_shift, thermal_broadening, add_gaussian_line, line_in_band
 from cherab.core.utility.constants cimport RECIP_4_PI, ELEMENTARY_CHARGE, ATOMIC_MASS
 
 cdef double RECIP_ELEMENTARY_CHARGE = 1 / ELEMENTARY_CHARGE
@@ -77,7 +78,9 @@ cdef class BeamCXLine(BeamModel):
         self._target_species = None
         self._wavelength = 0.0
         self._ground_beam_rate = None
-        self._excited_beam_data = None
+        self._excited_beam_rates = None
+        self._population_rates = None
+        self._species = None
 
     @property
     def line(self):
@@ -88,6 +91,15 @@ cdef class BeamCXLine(BeamModel):
         # the data cache depends on the line configuration
         self._line = value
         self._change()
+        self.notifier.notify()
+
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength):
+
+        # cache data on first run
+        if self._target_species is None:
+            self._populate_cache()
+
+        return line_in_band(self._wavelength, min_wavelength, max_wavelength)
 
     # todo: escape early if data is not suitable for a calculation
     # todo: carefully review changes to maths
@@ -109,6 +121,10 @@ cdef class BeamCXLine(BeamModel):
         if self._target_species is None:
             self._populate_cache()
 
+        # skip the calculation if the line is outside the spectral range
+        if not line_in_band(self._wavelength, spectrum.min_wavelength, spectrum.max_wavelength):
+            return spectrum
+
         # obtain donor density from beam
         donor_density = self._beam.density(beam_point.x, beam_point.y, beam_point.z)
 
@@ -182,7 +198,7 @@ cdef class BeamCXLine(BeamModel):
         cdef:
             double z_effective, b_field, rate, total_population, population, effective_rate
             BeamCXRate cx_rate
-            list population_data
+            int metastable
 
         # calculate z_effective and the B-field magnitude
         z_effective = self._plasma.z_effective(x, y, z)
@@ -199,10 +215,15 @@ cdef class BeamCXLine(BeamModel):
         # starts at 1 as populations are measured relative to the ground state
         total_population = 1
 
+        # the plasma species are sampled once and shared by all the excited states
+        if self._excited_beam_rates:
+            self._sample_species(x, y, z, donor_velocity)
+
         # rates for the excited states (metastable > 1)
-        for cx_rate, population_data in self._excited_beam_data:
+        for metastable in range(len(self._excited_beam_rates)):
 
-            population = self._beam_population(x, y, z, donor_velocity, population_data)
+            cx_rate = self._excited_beam_rates[metastable]
+            population = self._beam_population(metastable)
 
             effective_rate = cx_rate.evaluate(interaction_energy,
                                               receiver_temperature,
@@ -221,58 +242,84 @@ cdef class BeamCXLine(BeamModel):
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
-    cdef double _beam_population(self, double x, double y, double z, Vector3D beam_velocity, list population_data) except? -1e999:
+    @cython.initializedcheck(False)
+    cdef int _sample_species(self, double x, double y, double z, Vector3D beam_velocity) except -1:
         """
-        Calculates the relative beam population.
+        Samples the plasma species required by the beam population calculation.
 
-        See www.adas.ac.uk/man/chap3-04.pdf equation 4.4.7 and notes for details on this calculation.
-        Note: As we have access to ni for each species, we have done away with the impurity fractions
-        used in the above document
+        Fills the species charge density, temperature and beam interaction
+        energy arrays and calculates the z-weighted density sum and the total
+        charge density in a single pass over the species.
 
         :param x: The plasma space x coordinate in meters.
         :param y: The plasma space y coordinate in meters.
         :param z: The plasma space z coordinate in meters.
         :param beam_velocity: A Vector defining the beam particle velocity in m/s.
-        :param population_data: A list of tuples containing the species and associated beam coefficients.
-        :return: The relative beam population.
         """
 
         cdef:
-            double density_sum, pop_coeff, total_ne, target_ne, target_ti
-            double interaction_speed, interaction_energy, target_equiv_ne
-            int target_z
-            Vector3D target_velocity, interaction_velocity
+            int index
+            double density, target_z
             Species species
-            BeamPopulationRate coeff
+            Vector3D interaction_velocity
 
-        # z-weighted density sum
-        density_sum = 0
-        for species, _ in population_data:
-            density_sum += species.element.atomic_number**2 * species.distribution.density(x, y, z)
+        self._density_sum = 0
+        self._total_charge_density = 0
+        for index in range(self._num_species):
 
-        # combine population coefficients
-        pop_coeff = 0
-        total_ne = 0
-        for species, coeff in population_data:
+            species = self._species[index]
+            target_z = self._species_z[index]
 
-            target_z = species.element.atomic_number
-            target_ne = species.distribution.density(x, y, z) * target_z
-            target_ti = species.distribution.effective_temperature(x, y, z)
-            target_velocity = species.distribution.bulk_velocity(x, y, z)
+            density = species.distribution.density(x, y, z)
+            self._temperature[index] = species.distribution.effective_temperature(x, y, z)
 
             # calculate mean beam interaction energy
-            interaction_velocity = beam_velocity.sub(target_velocity)
-            interaction_speed = interaction_velocity.get_length()
-            interaction_energy = ms_to_evamu(interaction_speed)
+            interaction_velocity = beam_velocity.sub(species.distribution.bulk_velocity(x, y, z))
+            self._interaction_energy[index] = ms_to_evamu(interaction_velocity.get_length())
 
-            # species equivalent electron density
-            target_equiv_ne = density_sum / target_z
+            # z-weighted density sum and charge density
+            self._charge_density[index] = density * target_z
+            self._density_sum += density * target_z * target_z
+            self._total_charge_density += density * target_z
 
-            pop_coeff += target_ne * coeff.evaluate(interaction_energy, target_equiv_ne, target_ti)
-            total_ne += target_ne
+        return 0
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cdef double _beam_population(self, int metastable) except? -1e999:
+        """
+        Calculates the relative beam population.
+
+        See www.adas.ac.uk/man/chap3-04.pdf equation 4.4.7 and notes for details on this calculation.
+        Note: As we have access to ni for each species, we have done away with the impurity fractions
+        used in the above document
+
+        The plasma species must have been sampled with _sample_species().
+
+        :param metastable: The index of the excited metastable in the excited beam rates list.
+        :return: The relative beam population.
+        """
+
+        cdef:
+            int index, offset
+            double pop_coeff
+            BeamPopulationRate coeff
+
+        # combine population coefficients
+        pop_coeff = 0
+        offset = metastable * self._num_species
+        for index in range(self._num_species):
+
+            # species equivalent electron density is the z-weighted density sum / target_z
+            coeff = self._population_rates[offset + index]
+            pop_coeff += self._charge_density[index] * coeff.evaluate(self._interaction_energy[index],
+                                                                      self._density_sum / self._species_z[index],
+                                                                      self._temperature[index])
 
         # normalise charge density weighted sum
-        return pop_coeff / total_ne
+        return pop_coeff / self._total_charge_density
 
     cdef int _populate_cache(self) except -1:
 
@@ -281,7 +328,7 @@ cdef class BeamCXLine(BeamModel):
             int receiver_ionisation
             tuple transition
             Species species
-            list rates, population_data
+            list rates
             BeamCXRate rate
             BeamPopulationRate coeff
 
@@ -310,16 +357,28 @@ cdef class BeamCXLine(BeamModel):
         # obtain cx rates
         rates = self._atomic_data.beam_cx_rate(donor_element, receiver_element, receiver_ionisation, transition)
 
+        # plasma species with which the beam interacts
+        self._species = list(self._plasma.composition)
+        self._num_species = len(self._species)
+        self._species_z = np.array([species.element.atomic_number for species in self._species], dtype=np.float64)
+
+        # per-point species sample buffers
+        self._charge_density = np.zeros(self._num_species)
+        self._interaction_energy = np.zeros(self._num_species)
+        self._temperature = np.zeros(self._num_species)
+
         # obtain beam population coefficients for each rate and assemble data
         # the data is assembled to make access efficient by linking the relevant rates and coefficients together:
         #
         #   ground_beam_rate = qeff(m=1)
-        #   excited_beam_data = [
-        #       (qeff(m=2), [(species, pop_coeff(m=2)),...]),
-        #       (qeff(m=3), [(species, pop_coeff(m=3)),...]),
+        #   excited_beam_rates = [qeff(m=2), qeff(m=3), ...]
+        #   population_rates = [
+        #       pop_coeff(m=2, species[0]), pop_coeff(m=2, species[1]), ...,
+        #       pop_coeff(m=3, species[0]), pop_coeff(m=3, species[1]), ...,
         #       etc...
         #   ]
-        self._excited_beam_data = []
+        self._excited_beam_rates = []
+        self._population_rates = []
         for rate in rates:
             if rate.donor_metastable == 1:
 
@@ -330,16 +389,12 @@ cdef class BeamCXLine(BeamModel):
             else:
 
                 # obtain population coefficients for all plasma species with which the beam interacts
-                population_data = []
-                for species in self._plasma.composition:
-
-                    # bundle coefficient with its species
+                for species in self._species:
                     coeff = self._atomic_data.beam_population_rate(donor_element, rate.donor_metastable,
                                                                    species.element, species.ionisation)
-                    population_data.append((species, coeff))
+                    self._population_rates.append(coeff)
 
-                # link each rate with its population data
-                self._excited_beam_data.append((rate, population_data))
+                self._excited_beam_rates.append(rate)
 
     def _change(self):
 
@@ -347,5 +402,7 @@ cdef class BeamCXLine(BeamModel):
         self._target_species = None
         self._wavelength = 0.0
         self._ground_beam_rate = None
-        self._excited_beam_data = None
+        self._excited_beam_rates = None
+        self._population_rates = None
+        self._species = None
 
@@ -20,12 +20,17 @@ from raysect.optical cimport Spectrum, Point3D, Vector3D
 from cherab.core.atomic.line cimport Line
 from cherab.core.species cimport Species
 from cherab.core.plasma.node cimport Plasma
+from cherab.core.plasma.state cimport PlasmaState
 
 cpdef double doppler_shift(double wavelength, Vector3D observation_direction, Vector3D velocity)
 
 cpdef double thermal_broadening(double wavelength, double temperature, double atomic_weight)
 
-cpdef Spectrum add_gaussian_line(double radiance, double wavelength, double sigma, Spectrum spectrum)
+cdef double fast_erf(double x) nogil
+
+cpdef bint line_in_band(double wavelength, double min_wavelength, double max_wavelength)
+
+cpdef Spectrum add_gaussian_line(double radiance, double wavelength, double sigma, Spectrum spectrum, double cutoff_sigma=*)
 
 
 cdef class LineShapeModel:
@@ -38,13 +43,38 @@ cdef class LineShapeModel:
 
     cpdef Spectrum add_line(self, double radiance, Point3D point, Vector3D direction, Spectrum spectrum)
 
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength)
+
+    cdef Spectrum add_line_state(self, double radiance, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum)
+
 
 cdef class GaussianLine(LineShapeModel):
-    pass
+
+    cdef readonly double cutoff_sigma
+
+    cdef Spectrum _add_line(self, double radiance, double te, Vector3D ion_velocity, Vector3D direction, Spectrum spectrum)
+
+
+cdef class MultipletLineShape(LineShapeModel):
+
+    cdef:
+        readonly double cutoff_sigma
+        double[::1] _wavelengths, _ratios
+        int _components
+
+    cdef Spectrum _add_multiplet(self, double radiance, double te, Vector3D ion_velocity, Vector3D direction, Spectrum spectrum)
+
+    cdef double _integral(self, double wavelength, double shift, double relative_sigma, double cutoff) nogil
 
 
 cdef class StarkBroadenedLine(LineShapeModel):
 
     cdef double _aij, _bij, _cij
 
-    pass
+    cdef Spectrum _add_line(self, double radiance, double ne, double te, Spectrum spectrum)
+
+
+cdef class StarkDopplerLine(StarkBroadenedLine):
+
+    cdef Spectrum _add_convolved_line(self, double radiance, double ne, double te, double ti,
+                                      Vector3D ion_velocity, Vector3D direction, Spectrum spectrum)
@@ -16,9 +16,10 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-from libc.math cimport sqrt, erf, M_SQRT2, floor, ceil, fabs
+import numpy as np
+
+from libc.math cimport INFINITY, sqrt, erf, exp, log, pow, sin, sinh, asinh, copysign, M_PI, M_SQRT2, M_2_SQRTPI, floor, ceil, fabs
 from cherab.core.utility.constants cimport ATOMIC_MASS, ELEMENTARY_CHARGE, SPEED_OF_LIGHT
-from raysect.optical.spectrum cimport new_spectrum
 cimport cython
 
 
@@ -59,18 +60,104 @@ cpdef double thermal_broadening(double wavelength, double temperature, double at
 # the number of standard deviations outside the rest wavelength the line is considered to add negligible value (including a margin for safety)
 DEF GAUSSIAN_CUTOFF_SIGMA=10.0
 
+# the maximum plausible Doppler shift plus line width as a fraction of the rest wavelength, this covers the
+# cutoff of a Gaussian line of hydrogen at 100 keV and the Stark broadening of the high-n Balmer lines
+DEF MAX_RELATIVE_LINE_WIDTH=0.05
+
+
+cpdef bint line_in_band(double wavelength, double min_wavelength, double max_wavelength):
+    """
+    Tests if a line may contribute to the specified wavelength band.
+
+    The line is assumed to extend MAX_RELATIVE_LINE_WIDTH (5%) of its
+    rest wavelength either side of the rest wavelength.
 
-cpdef Spectrum add_gaussian_line(double radiance, double wavelength, double sigma, Spectrum spectrum):
+    :param wavelength: The rest wavelength of the line in nm.
+    :param min_wavelength: The lower wavelength of the band in nm.
+    :param max_wavelength: The upper wavelength of the band in nm.
+    :return: False if the line cannot contribute to the band, True otherwise.
+    """
+
+    cdef double margin = MAX_RELATIVE_LINE_WIDTH * wavelength
+    return wavelength + margin >= min_wavelength and wavelength - margin <= max_wavelength
+
+# tabulated error function: erf(x) is sampled on [0, ERF_TABLE_LIMIT] with ERF_TABLE_RESOLUTION samples per unit,
+# cubic Hermite interpolation of the table has a maximum absolute error below 1e-9, |erf(x)| = 1 - 2e-17 at the limit
+DEF ERF_TABLE_LIMIT=6.0
+DEF ERF_TABLE_RESOLUTION=64
+DEF ERF_TABLE_SIZE=385
+
+cdef double _erf_table[ERF_TABLE_SIZE]
+cdef double _erf_slope_table[ERF_TABLE_SIZE]
+
+
+@cython.cdivision(True)
+cdef void _build_erf_table():
+
+    cdef:
+        int i
+        double x
+
+    # slopes are scaled by the sample spacing for the Hermite basis
+    for i in range(ERF_TABLE_SIZE):
+        x = i / <double> ERF_TABLE_RESOLUTION
+        _erf_table[i] = erf(x)
+        _erf_slope_table[i] = M_2_SQRTPI * exp(-x * x) / ERF_TABLE_RESOLUTION
+
+_build_erf_table()
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double fast_erf(double x) nogil:
+    """
+    Evaluates the error function from a lookup table.
+
+    The maximum absolute error is below 1e-9.
+
+    :param x: The function argument.
+    :return: erf(x)
+    """
+
+    cdef:
+        int i
+        double ax, t, u
+
+    ax = fabs(x)
+    if ax >= ERF_TABLE_LIMIT:
+        return copysign(1.0, x)
+
+    t = ax * ERF_TABLE_RESOLUTION
+    i = <int> t
+    t -= i
+    u = 1 - t
+
+    # cubic Hermite interpolation
+    return copysign(
+        u * u * ((1 + 2 * t) * _erf_table[i] + t * _erf_slope_table[i]) +
+        t * t * ((3 - 2 * t) * _erf_table[i + 1] - u * _erf_slope_table[i + 1]),
+        x
+    )
+
+
+@cython.cdivision(True)
+cpdef Spectrum add_gaussian_line(double radiance, double wavelength, double sigma, Spectrum spectrum, double cutoff_sigma=GAUSSIAN_CUTOFF_SIGMA):
     """
     Adds a Gaussian line to the given spectrum and returns the new spectrum.
 
     The formula used is based on the following definite integral:
     \frac{1}{\sigma \sqrt{2 \pi}} \int_{\lambda_0}^{\lambda_1} \exp(-\frac{(x-\mu)^2}{2\sigma^2}) dx = \frac{1}{2} \left[ -Erf(\frac{a-\mu}{\sqrt{2}\sigma}) +Erf(\frac{b-\mu}{\sqrt{2}\sigma}) \right]
 
+    The error function is evaluated from a lookup table with an absolute
+    error below 1e-9, see fast_erf().
+
     :param float radiance: Intensity of the line in radiance.
     :param float wavelength: central wavelength of the line in nm.
     :param float sigma: width of the line in nm.
     :param Spectrum spectrum: the current spectrum to which the gaussian line is added.
+    :param float cutoff_sigma: the number of standard deviations either side of the
+      line centre beyond which the line is neglected (default=10).
     :return:
     """
 
@@ -84,11 +171,11 @@ cpdef Spectrum add_gaussian_line(double radiance, double wavelength, double sigm
         return spectrum
 
     # calculate and check end of limits
-    cutoff_lower_wavelength = wavelength - GAUSSIAN_CUTOFF_SIGMA * sigma
+    cutoff_lower_wavelength = wavelength - cutoff_sigma * sigma
     if spectrum.max_wavelength < cutoff_lower_wavelength:
         return spectrum
 
-    cutoff_upper_wavelength = wavelength + GAUSSIAN_CUTOFF_SIGMA * sigma
+    cutoff_upper_wavelength = wavelength + cutoff_sigma * sigma
     if spectrum.min_wavelength > cutoff_upper_wavelength:
         return spectrum
 
@@ -99,11 +186,11 @@ cpdef Spectrum add_gaussian_line(double radiance, double wavelength, double sigm
     # add line to spectrum
     temp = M_SQRT2 * sigma
     lower_wavelength = spectrum.min_wavelength + start * spectrum.delta_wavelength
-    lower_integral = erf((lower_wavelength - wavelength) / temp)
+    lower_integral = fast_erf((lower_wavelength - wavelength) / temp)
     for i in range(start, end):
 
         upper_wavelength = spectrum.min_wavelength + spectrum.delta_wavelength * (i + 1)
-        upper_integral = erf((upper_wavelength - wavelength) / temp)
+        upper_integral = fast_erf((upper_wavelength - wavelength) / temp)
 
         spectrum.samples_mv[i] += radiance * 0.5 * (upper_integral - lower_integral) / spectrum.delta_wavelength
 
@@ -133,20 +220,60 @@ cdef class LineShapeModel:
     cpdef Spectrum add_line(self, double radiance, Point3D point, Vector3D direction, Spectrum spectrum):
         raise NotImplementedError('Child lineshape class must implement this method.')
 
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength):
+        """
+        Tests if the line may contribute to the specified wavelength band.
+
+        Emission models use this test to skip the plasma sampling for lines
+        outside the observed band. Child classes may override this method if
+        the line shape extends further than the default bound, see
+        line_in_band().
+
+        :param min_wavelength: The lower wavelength of the band in nm.
+        :param max_wavelength: The upper wavelength of the band in nm.
+        :return: False if the line cannot contribute to the band, True otherwise.
+        """
+
+        return line_in_band(self.wavelength, min_wavelength, max_wavelength)
+
+    cdef Spectrum add_line_state(self, double radiance, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+        """
+        Adds the line using plasma parameters cached in a PlasmaState.
+
+        Child classes may override this method to avoid re-sampling the
+        plasma, by default add_line() is called.
+        """
+
+        return self.add_line(radiance, point, direction, spectrum)
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.initializedcheck(False)
 @cython.cdivision(True)
 cdef class GaussianLine(LineShapeModel):
+    """
+    Produces Gaussian line shape.
 
-    def __init__(self, Line line, double wavelength, Species target_species, Plasma plasma):
+    :param Line line: The emission line object for this line shape.
+    :param float wavelength: The rest wavelength for this emission line.
+    :param Species target_species: The target plasma species that is emitting.
+    :param Plasma plasma: The emitting plasma object.
+    :param float cutoff_sigma: The number of standard deviations either side of the
+      line centre beyond which the line is neglected (default=10).
+    """
+
+    def __init__(self, Line line, double wavelength, Species target_species, Plasma plasma, double cutoff_sigma=GAUSSIAN_CUTOFF_SIGMA):
 
         super().__init__(line, wavelength, target_species, plasma)
 
+        if cutoff_sigma <= 0:
+            raise ValueError('The cutoff sigma must be greater than zero.')
+        self.cutoff_sigma = cutoff_sigma
+
     cpdef Spectrum add_line(self, double radiance, Point3D point, Vector3D direction, Spectrum spectrum):
 
-        cdef double te, sigma, shifted_wavelength
+        cdef double te
         cdef Vector3D ion_velocity
 
         te = self.plasma.get_electron_distribution().effective_temperature(point.x, point.y, point.z)
@@ -155,13 +282,270 @@ cdef class GaussianLine(LineShapeModel):
 
         ion_velocity = self.target_species.distribution.bulk_velocity(point.x, point.y, point.z)
 
+        return self._add_line(radiance, te, ion_velocity, direction, spectrum)
+
+    cdef Spectrum add_line_state(self, double radiance, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double te
+        cdef Vector3D ion_velocity
+
+        te = state.electron_temperature()
+        if te <= 0.0:
+            return spectrum
+
+        ion_velocity = state.ion_velocity(state.species_index(self.target_species))
+
+        return self._add_line(radiance, te, ion_velocity, direction, spectrum)
+
+    cdef Spectrum _add_line(self, double radiance, double te, Vector3D ion_velocity, Vector3D direction, Spectrum spectrum):
+
+        cdef double sigma, shifted_wavelength
+
         # calculate emission line central wavelength, doppler shifted along observation direction
         shifted_wavelength = doppler_shift(self.wavelength, direction, ion_velocity)
 
         # calculate the line width
         sigma = thermal_broadening(self.wavelength, te, self.line.element.atomic_weight)
 
-        return add_gaussian_line(radiance, shifted_wavelength, sigma, spectrum)
+        return add_gaussian_line(radiance, shifted_wavelength, sigma, spectrum, self.cutoff_sigma)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+@cython.cdivision(True)
+cdef class MultipletLineShape(LineShapeModel):
+    """
+    Produces a multiplet of Gaussian line shapes.
+
+    The multiplet components share the Doppler shift and the thermal broadening
+    of the emitting species, the plasma is sampled once and all components are
+    added to the spectrum in a single sweep over the spectral bins. The
+    rest wavelength of the line is not used, the component wavelengths are
+    taken from the multiplet.
+
+    The multiplet is specified as a 2xN array with the component wavelengths
+    in nm in the first row and their relative intensities in the second row,
+    e.g. [[403.5, 404.1, 404.3], [0.2, 0.5, 0.3]]. The relative intensities
+    are normalised to sum to one.
+
+    :param Line line: The emission line object for this line shape.
+    :param float wavelength: The rest wavelength for this emission line.
+    :param Species target_species: The target plasma species that is emitting.
+    :param Plasma plasma: The emitting plasma object.
+    :param multiplet: A 2xN array of the component wavelengths and relative intensities.
+    :param float cutoff_sigma: The number of standard deviations either side of each
+      component beyond which the component is neglected (default=10).
+    """
+
+    def __init__(self, Line line, double wavelength, Species target_species, Plasma plasma,
+                 object multiplet, double cutoff_sigma=GAUSSIAN_CUTOFF_SIGMA):
+
+        super().__init__(line, wavelength, target_species, plasma)
+
+        multiplet = np.array(multiplet, dtype=np.float64)
+        if multiplet.ndim != 2 or multiplet.shape[0] != 2 or multiplet.shape[1] == 0:
+            raise ValueError('The multiplet must be a 2xN array of component wavelengths and relative intensities.')
+
+        if (multiplet[0] <= 0).any():
+            raise ValueError('The multiplet component wavelengths must be greater than zero.')
+
+        if (multiplet[1] < 0).any() or multiplet[1].sum() <= 0:
+            raise ValueError('The multiplet relative intensities must be positive and not all zero.')
+
+        if cutoff_sigma <= 0:
+            raise ValueError('The cutoff sigma must be greater than zero.')
+
+        self._wavelengths = np.ascontiguousarray(multiplet[0])
+        self._ratios = np.ascontiguousarray(multiplet[1] / multiplet[1].sum())
+        self._components = multiplet.shape[1]
+        self.cutoff_sigma = cutoff_sigma
+
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength):
+
+        cdef int k
+
+        for k in range(self._components):
+            if line_in_band(self._wavelengths[k], min_wavelength, max_wavelength):
+                return True
+        return False
+
+    cpdef Spectrum add_line(self, double radiance, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double te
+        cdef Vector3D ion_velocity
+
+        te = self.plasma.get_electron_distribution().effective_temperature(point.x, point.y, point.z)
+        if te <= 0.0:
+            return spectrum
+
+        ion_velocity = self.target_species.distribution.bulk_velocity(point.x, point.y, point.z)
+
+        return self._add_multiplet(radiance, te, ion_velocity, direction, spectrum)
+
+    cdef Spectrum add_line_state(self, double radiance, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double te
+        cdef Vector3D ion_velocity
+
+        te = state.electron_temperature()
+        if te <= 0.0:
+            return spectrum
+
+        ion_velocity = state.ion_velocity(state.species_index(self.target_species))
+
+        return self._add_multiplet(radiance, te, ion_velocity, direction, spectrum)
+
+    cdef Spectrum _add_multiplet(self, double radiance, double te, Vector3D ion_velocity, Vector3D direction, Spectrum spectrum):
+
+        cdef double shift, relative_sigma, cutoff, lower_limit, upper_limit, centre, width
+        cdef double cutoff_lower_wavelength, cutoff_upper_wavelength
+        cdef double upper_wavelength, lower_integral, upper_integral
+        cdef int start, end, i, k
+
+        # the Doppler shift and the thermal broadening are both proportional to the component wavelength
+        shift = doppler_shift(1.0, direction, ion_velocity)
+        relative_sigma = thermal_broadening(1.0, te, self.line.element.atomic_weight)
+        if relative_sigma <= 0:
+            return spectrum
+
+        # the range of wavelengths covered by the multiplet
+        lower_limit = INFINITY
+        upper_limit = -INFINITY
+        for k in range(self._components):
+            centre = self._wavelengths[k] * shift
+            width = self.cutoff_sigma * relative_sigma * self._wavelengths[k]
+            lower_limit = min(lower_limit, centre - width)
+            upper_limit = max(upper_limit, centre + width)
+
+        # calculate and check end of limits
+        if spectrum.max_wavelength < lower_limit or spectrum.min_wavelength > upper_limit:
+            return spectrum
+
+        start = max(0, <int> floor((lower_limit - spectrum.min_wavelength) / spectrum.delta_wavelength))
+        end = min(spectrum.bins, <int> ceil((upper_limit - spectrum.min_wavelength) / spectrum.delta_wavelength))
+
+        # each bin integral is the sum of the component erf integrals, components are
+        # clamped beyond their cutoff so they only contribute to bins inside their range
+        cutoff = self.cutoff_sigma / M_SQRT2
+        lower_integral = self._integral(spectrum.min_wavelength + start * spectrum.delta_wavelength, shift, relative_sigma, cutoff)
+        for i in range(start, end):
+
+            upper_wavelength = spectrum.min_wavelength + spectrum.delta_wavelength * (i + 1)
+            upper_integral = self._integral(upper_wavelength, shift, relative_sigma, cutoff)
+
+            spectrum.samples_mv[i] += radiance * 0.5 * (upper_integral - lower_integral) / spectrum.delta_wavelength
+
+            lower_integral = upper_integral
+
+        return spectrum
+
+    cdef double _integral(self, double wavelength, double shift, double relative_sigma, double cutoff) nogil:
+        """
+        Returns the sum of the component error functions at the given wavelength.
+        """
+
+        cdef double x, integral = 0
+        cdef int k
+
+        for k in range(self._components):
+
+            x = (wavelength - self._wavelengths[k] * shift) / (M_SQRT2 * relative_sigma * self._wavelengths[k])
+            if x <= -cutoff:
+                integral -= self._ratios[k]
+            elif x >= cutoff:
+                integral += self._ratios[k]
+            else:
+                integral += self._ratios[k] * fast_erf(x)
+
+        return integral
+
+
+# tabulated cumulative integral of the Stark line shape 1 / (1 + |x|^2.5), where x is the wavelength offset in
+# units of the half width at half maximum: sampled on [0, STARK_TABLE_LIMIT] with STARK_TABLE_RESOLUTION samples
+# per unit, the cubic Hermite interpolation has a maximum absolute error below 1e-7, the limit covers the line cutoff
+DEF STARK_TABLE_LIMIT=20.0
+DEF STARK_TABLE_RESOLUTION=32
+DEF STARK_TABLE_SIZE=641
+DEF STARK_TABLE_SUBDIVISIONS=16
+
+cdef double _stark_table[STARK_TABLE_SIZE]
+cdef double _stark_slope_table[STARK_TABLE_SIZE]
+
+
+@cython.cdivision(True)
+cdef inline double _stark_profile(double x) nogil:
+    return 1 / (1 + pow(x, 2.5))
+
+
+@cython.cdivision(True)
+cdef void _build_stark_table():
+
+    cdef:
+        int i, j
+        double a, h, integral
+
+    _stark_table[0] = 0
+    _stark_slope_table[0] = _stark_profile(0) / STARK_TABLE_RESOLUTION
+
+    # composite Simpson integration over each table interval
+    h = 1 / <double> (STARK_TABLE_RESOLUTION * STARK_TABLE_SUBDIVISIONS)
+    for i in range(1, STARK_TABLE_SIZE):
+
+        a = (i - 1) / <double> STARK_TABLE_RESOLUTION
+        integral = _stark_profile(a) + _stark_profile(a + STARK_TABLE_SUBDIVISIONS * h)
+        for j in range(1, STARK_TABLE_SUBDIVISIONS):
+            integral += (4 if j % 2 else 2) * _stark_profile(a + j * h)
+
+        # slopes are scaled by the sample spacing for the Hermite basis
+        _stark_table[i] = _stark_table[i - 1] + integral * h / 3
+        _stark_slope_table[i] = _stark_profile(i / <double> STARK_TABLE_RESOLUTION) / STARK_TABLE_RESOLUTION
+
+_build_stark_table()
+
+
+@cython.cdivision(True)
+cdef inline double _stark_tail(double x) nogil:
+    """
+    Returns the integral of 1 / (1 + t^2.5) from x to infinity, for x >= STARK_TABLE_LIMIT.
+
+    The integrand is expanded in powers of 1 / t^2.5, the first omitted term is below 1e-12.
+    """
+
+    cdef double u = pow(x, -2.5)
+    return pow(x, -1.5) * (1 / 1.5 - u * (1 / 4.0 - u / 6.5))
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double _stark_cumulative(double x) nogil:
+    """
+    Returns the integral of 1 / (1 + |t|^2.5) from 0 to x.
+
+    Beyond |x| = STARK_TABLE_LIMIT the integral is extended with its asymptotic
+    expansion, the bins at the ends of the line cutoff may extend past the table.
+    """
+
+    cdef:
+        int i
+        double ax, t, u
+
+    ax = fabs(x)
+    if ax >= STARK_TABLE_LIMIT:
+        return copysign(_stark_table[STARK_TABLE_SIZE - 1] + _stark_tail(STARK_TABLE_LIMIT) - _stark_tail(ax), x)
+
+    t = ax * STARK_TABLE_RESOLUTION
+    i = <int> t
+    t -= i
+    u = 1 - t
+
+    # cubic Hermite interpolation
+    return copysign(
+        u * u * ((1 + 2 * t) * _stark_table[i] + t * _stark_slope_table[i]) +
+        t * t * ((3 - 2 * t) * _stark_table[i + 1] - u * _stark_slope_table[i + 1]),
+        x
+    )
 
 
 @cython.boundscheck(False)
@@ -208,11 +592,7 @@ cdef class StarkBroadenedLine(LineShapeModel):
 
     cpdef Spectrum add_line(self, double radiance, Point3D point, Vector3D direction, Spectrum spectrum):
 
-        cdef double ne, te, lambda_1_2, lambda_5_2, wvl
-        cdef double cutoff_lower_wavelength, cutoff_upper_wavelength
-        cdef double lower_value, lower_wavelength, upper_value, upper_wavelength
-        cdef int start, end, i
-        cdef Spectrum raw_lineshape
+        cdef double ne, te
 
         ne = self.plasma.get_electron_distribution().density(point.x, point.y, point.z)
         if ne <= 0.0:
@@ -222,6 +602,29 @@ cdef class StarkBroadenedLine(LineShapeModel):
         if te <= 0.0:
             return spectrum
 
+        return self._add_line(radiance, ne, te, spectrum)
+
+    cdef Spectrum add_line_state(self, double radiance, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double ne, te
+
+        ne = state.electron_density()
+        if ne <= 0.0:
+            return spectrum
+
+        te = state.electron_temperature()
+        if te <= 0.0:
+            return spectrum
+
+        return self._add_line(radiance, ne, te, spectrum)
+
+    cdef Spectrum _add_line(self, double radiance, double ne, double te, Spectrum spectrum):
+
+        cdef double lambda_1_2, half_width, scale
+        cdef double cutoff_lower_wavelength, cutoff_upper_wavelength
+        cdef double lower_cumulative, upper_cumulative
+        cdef int start, end, i
+
         lambda_1_2 = self._cij * ne**self._aij / (te**self._bij)
 
         # calculate and check end of limits
@@ -237,27 +640,252 @@ cdef class StarkBroadenedLine(LineShapeModel):
         start = max(0, <int> floor((cutoff_lower_wavelength - spectrum.min_wavelength) / spectrum.delta_wavelength))
         end = min(spectrum.bins, <int> ceil((cutoff_upper_wavelength - spectrum.min_wavelength) / spectrum.delta_wavelength))
 
-        # TODO - replace with cumulative integrals
-        # add line to spectrum
-        raw_lineshape = spectrum.new_spectrum()
+        # the line shape is 1 / (|dl|^2.5 + (lambda_1_2 / 2)^2.5) normalised over the range of bins it is added to,
+        # the bin integrals are the differences of its tabulated cumulative integral
+        half_width = 0.5 * lambda_1_2
+        lower_cumulative = _stark_cumulative((spectrum.min_wavelength + start * spectrum.delta_wavelength - self.wavelength) / half_width)
+        upper_cumulative = _stark_cumulative((spectrum.min_wavelength + end * spectrum.delta_wavelength - self.wavelength) / half_width)
+        if upper_cumulative <= lower_cumulative:
+            return spectrum
+
+        scale = radiance / ((upper_cumulative - lower_cumulative) * spectrum.delta_wavelength)
 
-        lower_wavelength = raw_lineshape.min_wavelength + start * raw_lineshape.delta_wavelength
-        lower_value = 1 / ((fabs(lower_wavelength - self.wavelength))**2.5 + (0.5*lambda_1_2)**2.5)
+        # add line to spectrum
         for i in range(start, end):
 
-            upper_wavelength = raw_lineshape.min_wavelength + raw_lineshape.delta_wavelength * (i + 1)
-            upper_value = 1 / ((fabs(upper_wavelength - self.wavelength))**2.5 + (0.5*lambda_1_2)**2.5)
+            upper_cumulative = _stark_cumulative((spectrum.min_wavelength + spectrum.delta_wavelength * (i + 1) - self.wavelength) / half_width)
+            spectrum.samples_mv[i] += scale * (upper_cumulative - lower_cumulative)
+            lower_cumulative = upper_cumulative
+
+        return spectrum
+
+
+# tabulated cumulative integral of the Stark line shape convolved with a Doppler Gaussian, the offset x is in units of
+# the sum of the Stark and Doppler half widths at half maximum and rows are sampled uniformly in the fraction of that
+# sum due to Stark broadening: rows are interpolated linearly, x with cubic Hermite interpolation, the maximum absolute
+# error of the unit normalised cumulative integral is around 2e-4, the limit covers the line cutoff
+DEF VOIGT_TABLE_LIMIT=20.0
+DEF VOIGT_TABLE_RESOLUTION=16
+DEF VOIGT_TABLE_SIZE=321
+DEF VOIGT_TABLE_RATIOS=41
+DEF VOIGT_QUADRATURE_POINTS=800
+DEF VOIGT_QUADRATURE_LIMIT=1e4
+
+cdef double _voigt_table[VOIGT_TABLE_RATIOS][VOIGT_TABLE_SIZE]
+cdef double _voigt_slope_table[VOIGT_TABLE_RATIOS][VOIGT_TABLE_SIZE]
+cdef bint _voigt_table_built = False
+
+
+@cython.cdivision(True)
+cdef void _build_voigt_table():
+
+    global _voigt_table_built
+
+    cdef:
+        int i, j, k
+        double ratio, sigma, stark_width, x, a, b, du, norm, cumulative, profile
+        double nodes[VOIGT_QUADRATURE_POINTS]
+        double weights[VOIGT_QUADRATURE_POINTS]
+
+    # integral of the Stark line shape over the real line
+    norm = 2 * (M_PI / 2.5) / sin(M_PI / 2.5)
+
+    # the convolution is integrated over the Stark profile, the nodes are concentrated about the line centre
+    # and extend far into the wings, the weights include the normalised Stark profile
+    du = asinh(VOIGT_QUADRATURE_LIMIT) / (VOIGT_QUADRATURE_POINTS - 1)
+    for k in range(VOIGT_QUADRATURE_POINTS):
+        nodes[k] = sinh(k * du)
+    for k in range(VOIGT_QUADRATURE_POINTS):
+        if k == 0:
+            weights[k] = 0.5 * (nodes[1] - nodes[0])
+        elif k == VOIGT_QUADRATURE_POINTS - 1:
+            weights[k] = 0.5 * (nodes[k] - nodes[k - 1])
+        else:
+            weights[k] = 0.5 * (nodes[k + 1] - nodes[k - 1])
+        weights[k] *= _stark_profile(nodes[k]) / norm
+
+    # slopes are scaled by the sample spacing for the Hermite basis
+    for j in range(VOIGT_TABLE_RATIOS):
+
+        ratio = j / <double> (VOIGT_TABLE_RATIOS - 1)
+        stark_width = ratio
+        sigma = (1 - ratio) / sqrt(2 * log(2))
+
+        for i in range(VOIGT_TABLE_SIZE):
+
+            x = i / <double> VOIGT_TABLE_RESOLUTION
+
+            if j == 0:
+                # pure Doppler broadening
+                cumulative = 0.5 * fast_erf(x / (M_SQRT2 * sigma))
+                profile = exp(-0.5 * (x / sigma)**2) / (sigma * sqrt(2 * M_PI))
+
+            elif j == VOIGT_TABLE_RATIOS - 1:
+                # pure Stark broadening
+                cumulative = _stark_cumulative(x) / norm
+                profile = _stark_profile(x) / norm
+
+            else:
+                cumulative = 0
+                profile = 0
+                for k in range(VOIGT_QUADRATURE_POINTS):
+                    a = (x - stark_width * nodes[k]) / (M_SQRT2 * sigma)
+                    b = (x + stark_width * nodes[k]) / (M_SQRT2 * sigma)
+                    cumulative += weights[k] * 0.5 * (fast_erf(a) + fast_erf(b))
+                    profile += weights[k] * (exp(-a * a) + exp(-b * b))
+                profile /= sigma * sqrt(2 * M_PI)
+
+            _voigt_table[j][i] = cumulative
+            _voigt_slope_table[j][i] = profile / VOIGT_TABLE_RESOLUTION
+
+    _voigt_table_built = True
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double _voigt_cumulative(double ratio, double x) nogil:
+    """
+    Returns the integral of the unit normalised Stark-Doppler line shape from 0 to x.
 
-            raw_lineshape.samples_mv[i] += 0.5 * (upper_value + lower_value)
+    The integral is clamped beyond |x| = VOIGT_TABLE_LIMIT.
 
-            lower_wavelength = upper_wavelength
-            lower_value = upper_value
+    :param ratio: The fraction of the half width due to Stark broadening, in [0, 1].
+    :param x: The wavelength offset in units of the sum of the half widths.
+    """
 
-        # perform normalisation
-        raw_lineshape.div_scalar(raw_lineshape.total())
+    cdef:
+        int i, j
+        double ax, r, t, u, lower, upper
 
+    r = ratio * (VOIGT_TABLE_RATIOS - 1)
+    j = min(<int> r, VOIGT_TABLE_RATIOS - 2)
+    r -= j
+
+    ax = fabs(x)
+    if ax >= VOIGT_TABLE_LIMIT:
+        lower = _voigt_table[j][VOIGT_TABLE_SIZE - 1]
+        upper = _voigt_table[j + 1][VOIGT_TABLE_SIZE - 1]
+        return copysign((1 - r) * lower + r * upper, x)
+
+    t = ax * VOIGT_TABLE_RESOLUTION
+    i = <int> t
+    t -= i
+    u = 1 - t
+
+    # cubic Hermite interpolation along each row
+    lower = (u * u * ((1 + 2 * t) * _voigt_table[j][i] + t * _voigt_slope_table[j][i]) +
+             t * t * ((3 - 2 * t) * _voigt_table[j][i + 1] - u * _voigt_slope_table[j][i + 1]))
+
+    upper = (u * u * ((1 + 2 * t) * _voigt_table[j + 1][i] + t * _voigt_slope_table[j + 1][i]) +
+             t * t * ((3 - 2 * t) * _voigt_table[j + 1][i + 1] - u * _voigt_slope_table[j + 1][i + 1]))
+
+    return copysign((1 - r) * lower + r * upper, x)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+@cython.cdivision(True)
+cdef class StarkDopplerLine(StarkBroadenedLine):
+    """
+    Produces a Stark broadened line shape convolved with Doppler broadening.
+
+    The Stark line shape of StarkBroadenedLine is convolved with the Gaussian
+    thermal broadening of the target species and shifted by the target species
+    bulk velocity. The convolution is not evaluated per sample, instead the
+    cumulative integral of the convolved line shape is tabulated once as a
+    function of the relative Stark width and the wavelength offset, so adding
+    the line costs one table lookup per spectral bin.
+
+    The line is normalised over the range of bins it is added to.
+
+    :param Line line: The emission line object for this line shape.
+    :param float wavelength: The rest wavelength for this emission line.
+    :param Species target_species: The target plasma species that is emitting.
+    :param Plasma plasma: The emitting plasma object.
+    """
+
+    def __init__(self, Line line, double wavelength, Species target_species, Plasma plasma):
+
+        super().__init__(line, wavelength, target_species, plasma)
+
+        if not _voigt_table_built:
+            _build_voigt_table()
+
+    cpdef Spectrum add_line(self, double radiance, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double ne, te, ti
+        cdef Vector3D ion_velocity
+
+        ne = self.plasma.get_electron_distribution().density(point.x, point.y, point.z)
+        te = self.plasma.get_electron_distribution().effective_temperature(point.x, point.y, point.z)
+        ti = self.target_species.distribution.effective_temperature(point.x, point.y, point.z)
+        ion_velocity = self.target_species.distribution.bulk_velocity(point.x, point.y, point.z)
+
+        return self._add_convolved_line(radiance, ne, te, ti, ion_velocity, direction, spectrum)
+
+    cdef Spectrum add_line_state(self, double radiance, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef int index
+
+        index = state.species_index(self.target_species)
+        return self._add_convolved_line(
+            radiance, state.electron_density(), state.electron_temperature(),
+            state.ion_temperature(index), state.ion_velocity(index), direction, spectrum
+        )
+
+    cdef Spectrum _add_convolved_line(self, double radiance, double ne, double te, double ti,
+                                      Vector3D ion_velocity, Vector3D direction, Spectrum spectrum):
+
+        cdef double stark_width, doppler_width, half_width, ratio, shifted_wavelength, scale
+        cdef double cutoff_lower_wavelength, cutoff_upper_wavelength
+        cdef double lower_cumulative, upper_cumulative
+        cdef int start, end, i
+
+        # half widths at half maximum of the Stark and Doppler broadening
+        stark_width = 0
+        if ne > 0.0 and te > 0.0:
+            stark_width = 0.5 * self._cij * ne**self._aij / (te**self._bij)
+
+        doppler_width = 0
+        if ti > 0.0:
+            doppler_width = sqrt(2 * log(2)) * thermal_broadening(self.wavelength, ti, self.line.element.atomic_weight)
+
+        half_width = stark_width + doppler_width
+        if half_width <= 0:
+            return spectrum
+        ratio = stark_width / half_width
+
+        # calculate emission line central wavelength, doppler shifted along observation direction
+        shifted_wavelength = doppler_shift(self.wavelength, direction, ion_velocity)
+
+        # calculate and check end of limits
+        cutoff_lower_wavelength = shifted_wavelength - VOIGT_TABLE_LIMIT * half_width
+        if spectrum.max_wavelength < cutoff_lower_wavelength:
+            return spectrum
+
+        cutoff_upper_wavelength = shifted_wavelength + VOIGT_TABLE_LIMIT * half_width
+        if spectrum.min_wavelength > cutoff_upper_wavelength:
+            return spectrum
+
+        # locate range of bins where there is significant contribution from the line
+        start = max(0, <int> floor((cutoff_lower_wavelength - spectrum.min_wavelength) / spectrum.delta_wavelength))
+        end = min(spectrum.bins, <int> ceil((cutoff_upper_wavelength - spectrum.min_wavelength) / spectrum.delta_wavelength))
+
+        # the bin integrals are the differences of the tabulated cumulative integral
+        lower_cumulative = _voigt_cumulative(ratio, (spectrum.min_wavelength + start * spectrum.delta_wavelength - shifted_wavelength) / half_width)
+        upper_cumulative = _voigt_cumulative(ratio, (spectrum.min_wavelength + end * spectrum.delta_wavelength - shifted_wavelength) / half_width)
+        if upper_cumulative <= lower_cumulative:
+            return spectrum
+
+        scale = radiance / ((upper_cumulative - lower_cumulative) * spectrum.delta_wavelength)
+
+        # add line to spectrum
         for i in range(start, end):
-            # Radiance ???
-            spectrum.samples_mv[i] += radiance * raw_lineshape.samples_mv[i]
+
+            upper_cumulative = _voigt_cumulative(ratio, (spectrum.min_wavelength + spectrum.delta_wavelength * (i + 1) - shifted_wavelength) / half_width)
+            spectrum.samples_mv[i] += scale * (upper_cumulative - lower_cumulative)
+            lower_cumulative = upper_cumulative
 
         return spectrum
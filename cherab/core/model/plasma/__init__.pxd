@@ -1,3 +1,4 @@
 from cherab.core.model.plasma.bremsstrahlung cimport Bremsstrahlung
 from cherab.core.model.plasma.impact_excitation cimport ExcitationLine
 from cherab.core.model.plasma.recombination cimport RecombinationLine
+from cherab.core.model.plasma.total_radiated_power cimport TotalRadiatedPower
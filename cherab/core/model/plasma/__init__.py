@@ -1,6 +1,4 @@
 from .bremsstrahlung import Bremsstrahlung
 from .impact_excitation import ExcitationLine
 from .recombination import RecombinationLine
-
-# TODO: requires reading in future release
-# from .total_radiated_power import TotalRadiatedPower
+from .total_radiated_power import TotalRadiatedPower
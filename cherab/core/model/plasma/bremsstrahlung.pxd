@@ -17,6 +17,7 @@
 # under the Licence.
 
 from cherab.core.atomic cimport Line, ImpactExcitationRate
+from raysect.optical cimport Spectrum
 from cherab.core.plasma cimport PlasmaModel
 from cherab.core.species cimport Species
 
@@ -28,5 +29,12 @@ cdef class Bremsstrahlung(PlasmaModel):
         double _wavelength
         Species _target_species
         ImpactExcitationRate _rates
+        int _cached_bins
+        double _cached_min_wavelength, _cached_max_wavelength
+        double[::1] _recip_wavelength, _bin_weight
+
+    cdef Spectrum _add_emission(self, double ne, double te, double z_effective, Spectrum spectrum)
+
+    cdef int _cache_wavelengths(self, Spectrum spectrum) except -1
 
     cdef double _bremsstrahlung(self, double wvl, double te, double ne, double zeff)
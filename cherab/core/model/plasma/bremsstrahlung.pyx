@@ -17,13 +17,19 @@
 # under the Licence.
 
 from raysect.optical cimport Spectrum, Point3D, Vector3D
+from cherab.core cimport Plasma, AtomicData
+from cherab.core.plasma cimport PlasmaState
 from cherab.core.utility.constants cimport RECIP_4_PI, ELEMENTARY_CHARGE, SPEED_OF_LIGHT, PLANCK_CONSTANT
-from libc.math cimport sqrt, log, exp
+from libc.math cimport sqrt, log, exp, fabs
+from numpy import empty
 cimport cython
 
 
 cdef double PH_TO_J_FACTOR = PLANCK_CONSTANT * SPEED_OF_LIGHT * 1e9
 
+# exponents smaller than this give exp(x) == 1.0 in double precision
+DEF NEGLIGIBLE_EXPONENT = 1e-17
+
 
 # todo: doppler shift?
 cdef class Bremsstrahlung(PlasmaModel):
@@ -39,16 +45,23 @@ cdef class Bremsstrahlung(PlasmaModel):
     where the emission :math:`\\epsilon (\\lambda)` is in units of radiance (ph/s/sr/m^3/nm).
     """
 
+    def __init__(self, Plasma plasma=None, AtomicData atomic_data=None):
+
+        super().__init__(plasma, atomic_data)
+
+        # wavelength factors are calculated on first use
+        self._cached_bins = 0
+        self._cached_min_wavelength = 0
+        self._cached_max_wavelength = 0
+        self._recip_wavelength = None
+        self._bin_weight = None
+
     def __repr__(self):
         return '<PlasmaModel - Bremsstrahlung>'
 
     cpdef Spectrum emission(self, Point3D point, Vector3D direction, Spectrum spectrum):
 
-        cdef:
-            double ne, te, z_effective
-            double lower_wavelength, upper_wavelength
-            double lower_sample, upper_sample
-            int i
+        cdef double ne, te, z_effective
 
         ne = self._plasma.electron_distribution.density(point.x, point.y, point.z)
         if ne == 0:
@@ -60,22 +73,109 @@ cdef class Bremsstrahlung(PlasmaModel):
         if z_effective == 0:
             return spectrum
 
+        return self._add_emission(ne, te, z_effective, spectrum)
+
+    cdef Spectrum emission_state(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double ne, te, z_effective
+
+        ne = state.electron_density()
+        if ne == 0:
+            return spectrum
+        te = state.electron_temperature()
+        if te == 0:
+            return spectrum
+        z_effective = state.z_effective()
+        if z_effective == 0:
+            return spectrum
+
+        return self._add_emission(ne, te, z_effective, spectrum)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    @cython.cdivision(True)
+    cdef Spectrum _add_emission(self, double ne, double te, double z_effective, Spectrum spectrum):
+
+        cdef:
+            double gaunt_factor, scale, exp_factor, recip_wavelength
+            double lower_sample, upper_sample
+            int i
+
+        self._cache_wavelengths(spectrum)
+
+        # the wavelength independent terms of the bremsstrahlung equation, see _bremsstrahlung()
+        gaunt_factor = 0.6183 * log(te) - 0.0821
+        scale = 0.95e-19 * RECIP_4_PI * gaunt_factor * ne * ne * z_effective / sqrt(te) * PH_TO_J_FACTOR
+        exp_factor = - PLANCK_CONSTANT * SPEED_OF_LIGHT / te
+
         # numerically integrate using trapezium rule
         # todo: add sub-sampling to increase numerical accuracy
-        lower_wavelength = spectrum.min_wavelength
-        lower_sample = self._bremsstrahlung(lower_wavelength, te, ne, z_effective)
-        for i in range(spectrum.bins):
+        if fabs(exp_factor * self._recip_wavelength[0]) < NEGLIGIBLE_EXPONENT:
+
+            # the exponential term is exactly one at double precision for all wavelengths
+            for i in range(spectrum.bins):
+                spectrum.samples_mv[i] += scale * self._bin_weight[i]
+
+        else:
 
-            upper_wavelength = spectrum.min_wavelength + spectrum.delta_wavelength * i
-            upper_sample = self._bremsstrahlung(upper_wavelength, te, ne, z_effective)
+            recip_wavelength = self._recip_wavelength[0]
+            lower_sample = exp(exp_factor * recip_wavelength) * recip_wavelength * recip_wavelength
+            for i in range(spectrum.bins):
 
-            spectrum.samples_mv[i] += 0.5 * (lower_sample + upper_sample)
+                recip_wavelength = self._recip_wavelength[i]
+                upper_sample = exp(exp_factor * recip_wavelength) * recip_wavelength * recip_wavelength
 
-            lower_wavelength = upper_wavelength
-            lower_sample = upper_sample
+                spectrum.samples_mv[i] += 0.5 * scale * (lower_sample + upper_sample)
+
+                lower_sample = upper_sample
 
         return spectrum
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    @cython.cdivision(True)
+    cdef int _cache_wavelengths(self, Spectrum spectrum) except -1:
+        """
+        Caches the wavelength dependent factors of the spectral samples.
+
+        The factors are only recalculated when the spectral range or the
+        number of spectral bins changes.
+        """
+
+        cdef:
+            double recip_wavelength, lower_factor, upper_factor
+            int i
+
+        if (spectrum.bins == self._cached_bins and spectrum.min_wavelength == self._cached_min_wavelength
+                and spectrum.max_wavelength == self._cached_max_wavelength):
+            return 0
+
+        self._recip_wavelength = empty(spectrum.bins)
+        self._bin_weight = empty(spectrum.bins)
+
+        # the samples are evaluated at the lower edge of each bin, the
+        # first bin uses a single sample
+        lower_factor = 0
+        for i in range(spectrum.bins):
+
+            recip_wavelength = 1 / (spectrum.min_wavelength + spectrum.delta_wavelength * i)
+            upper_factor = recip_wavelength * recip_wavelength
+            if i == 0:
+                lower_factor = upper_factor
+
+            self._recip_wavelength[i] = recip_wavelength
+            self._bin_weight[i] = 0.5 * (lower_factor + upper_factor)
+
+            lower_factor = upper_factor
+
+        self._cached_bins = spectrum.bins
+        self._cached_min_wavelength = spectrum.min_wavelength
+        self._cached_max_wavelength = spectrum.max_wavelength
+
+        return 0
+
     @cython.cdivision(True)
     cdef double _bremsstrahlung(self, double wvl, double te, double ne, double zeff):
         """
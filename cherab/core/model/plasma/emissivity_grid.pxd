@@ -0,0 +1,58 @@
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+from raysect.optical cimport Spectrum, Point3D, Vector3D
+
+from cherab.core.atomic.rates cimport _PECRate
+from cherab.core.math cimport Function2D
+from cherab.core.plasma cimport Plasma, PlasmaState, PlasmaModel
+from cherab.core.species cimport Species
+from cherab.core.model.lineshape cimport LineShapeModel
+
+
+cdef class LineEmissivityGrid:
+
+    cdef:
+        readonly object r, z
+        readonly bint valid
+        LineShapeModel _lineshape
+        double _min_r, _max_r, _min_z, _max_z
+        double _wavelength, _cutoff_sigma
+        bint _gaussian
+        Function2D _radiance, _sigma, _velocity_r, _velocity_phi, _velocity_z
+
+    cdef int build(self, Plasma plasma, Species target_species, _PECRate rates, LineShapeModel lineshape) except -1
+
+    cdef void invalidate(self)
+
+    cdef bint inside(self, double x, double y, double z)
+
+    cdef Spectrum add_emission(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum)
+
+
+cdef class EmissivityGridModel(PlasmaModel):
+
+    cdef:
+        LineEmissivityGrid _emissivity_grid
+
+    cdef bint _grid_inside(self, Point3D point)
+
+    cdef Spectrum _grid_emission(self, Species target_species, _PECRate rates, LineShapeModel lineshape,
+                                 PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum)
+
+    cdef void _invalidate_grid(self)
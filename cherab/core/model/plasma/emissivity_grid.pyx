@@ -0,0 +1,286 @@
+# Copyright 2016-2018 Euratom
+# Copyright 2016-2018 United Kingdom Atomic Energy Authority
+# Copyright 2016-2018 Centro de Investigaciones Energéticas, Medioambientales y Tecnológicas
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by the
+# European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+# https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the Licence for the specific language governing permissions and limitations
+# under the Licence.
+
+import numpy as np
+from libc.math cimport sqrt
+from raysect.optical cimport new_vector3d
+
+from cherab.core.distribution cimport DistributionFunction
+from cherab.core.math.interpolators cimport Interpolate2DLinear
+from cherab.core.model.lineshape cimport doppler_shift, thermal_broadening, add_gaussian_line, GaussianLine
+from cherab.core.utility.constants cimport RECIP_4_PI
+cimport cython
+
+
+cdef class LineEmissivityGrid:
+    """
+    Line emission tabulated on an axisymmetric (R, Z) grid.
+
+    The radiance of a line is sampled once on the grid nodes in the xz plane
+    and linearly interpolated thereafter. If the line shape is a GaussianLine,
+    the line width and the cylindrical components of the emitting species
+    velocity are tabulated too, so the line is added without sampling the
+    plasma. Other line shapes are called with the interpolated radiance.
+
+    The plasma is assumed to be axisymmetric around the z-axis. The grid is
+    sampled by build() and must be rebuilt if the plasma is modified.
+
+    :param r: Array of R node coordinates in meters.
+    :param z: Array of Z node coordinates in meters.
+    """
+
+    def __init__(self, object r, object z):
+
+        r = np.array(r, dtype=np.float64)
+        z = np.array(z, dtype=np.float64)
+
+        for axis in (r, z):
+            if axis.ndim != 1 or axis.shape[0] < 2:
+                raise ValueError('The emissivity grid coordinates must be 1D arrays with at least two values.')
+
+        if r.min() < 0:
+            raise ValueError('The radial coordinates of the emissivity grid cannot be negative.')
+
+        self.r = r
+        self.z = z
+        self._min_r = r.min()
+        self._max_r = r.max()
+        self._min_z = z.min()
+        self._max_z = z.max()
+        self.invalidate()
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int build(self, Plasma plasma, Species target_species, _PECRate rates, LineShapeModel lineshape) except -1:
+        """
+        Samples the line emission on the grid nodes.
+
+        :param Plasma plasma: The emitting plasma.
+        :param Species target_species: The species whose density scales the emission.
+        :param _PECRate rates: The photon emissivity coefficient of the line.
+        :param LineShapeModel lineshape: The line shape of the line.
+        """
+
+        cdef:
+            int i, j
+            double[::1] r_view, z_view
+            double[:, ::1] ne_view, te_view, ni_view, vr_view, vphi_view, vz_view
+            DistributionFunction electrons, ions
+            Vector3D velocity
+
+        r = self.r
+        z = self.z
+
+        self._lineshape = lineshape
+        self._gaussian = type(lineshape) is GaussianLine
+        self._wavelength = lineshape.wavelength
+        self._cutoff_sigma = (<GaussianLine> lineshape).cutoff_sigma if self._gaussian else 0
+
+        shape = (r.shape[0], z.shape[0])
+        ne = np.zeros(shape)
+        te = np.zeros(shape)
+        ni = np.zeros(shape)
+        ne_view = ne
+        te_view = te
+        ni_view = ni
+
+        r_view = r
+        z_view = z
+        electrons = plasma.get_electron_distribution()
+        ions = target_species.distribution
+
+        # sample in the xz plane, the x coordinate is the major radius
+        for i in range(r_view.shape[0]):
+            for j in range(z_view.shape[0]):
+                ne_view[i, j] = electrons.density(r_view[i], 0, z_view[j])
+                te_view[i, j] = electrons.effective_temperature(r_view[i], 0, z_view[j])
+                ni_view[i, j] = ions.density(r_view[i], 0, z_view[j])
+
+        # only evaluate the rates where the line is emitted
+        radiance = np.zeros(shape)
+        valid = (ne > 0) & (te > 0) & (ni > 0)
+        radiance[valid] = RECIP_4_PI * rates.evaluate_array(ne[valid], te[valid]) * ne[valid] * ni[valid]
+        self._radiance = Interpolate2DLinear(r, z, radiance)
+
+        if not self._gaussian:
+            self.valid = True
+            return 0
+
+        # the thermal width scales with the square root of the temperature
+        sigma = np.zeros(shape)
+        sigma[valid] = thermal_broadening(1.0, 1.0, lineshape.line.element.atomic_weight) * self._wavelength * np.sqrt(te[valid])
+        self._sigma = Interpolate2DLinear(r, z, sigma)
+
+        # in the xz plane the x, y and z velocity components are the R, phi and Z components
+        vr = np.zeros(shape)
+        vphi = np.zeros(shape)
+        vz = np.zeros(shape)
+        vr_view = vr
+        vphi_view = vphi
+        vz_view = vz
+        for i in range(r_view.shape[0]):
+            for j in range(z_view.shape[0]):
+                velocity = ions.bulk_velocity(r_view[i], 0, z_view[j])
+                vr_view[i, j] = velocity.x
+                vphi_view[i, j] = velocity.y
+                vz_view[i, j] = velocity.z
+
+        self._velocity_r = Interpolate2DLinear(r, z, vr)
+        self._velocity_phi = Interpolate2DLinear(r, z, vphi)
+        self._velocity_z = Interpolate2DLinear(r, z, vz)
+
+        self.valid = True
+        return 0
+
+    cdef void invalidate(self):
+        """
+        Discards the sampled data, the grid must be rebuilt before use.
+        """
+
+        self.valid = False
+        self._lineshape = None
+        self._radiance = None
+        self._sigma = None
+        self._velocity_r = None
+        self._velocity_phi = None
+        self._velocity_z = None
+
+    cdef bint inside(self, double x, double y, double z):
+        """
+        Returns True if the point lies inside the grid.
+        """
+
+        cdef double r = sqrt(x * x + y * y)
+        return self._min_r <= r <= self._max_r and self._min_z <= z <= self._max_z
+
+    @cython.cdivision(True)
+    cdef Spectrum add_emission(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+        """
+        Adds the interpolated line emission at a point inside the grid.
+
+        :param state: Plasma parameters cached at the point, may be None.
+        :param point: Point in plasma space.
+        :param direction: Direction in plasma space.
+        :param spectrum: Spectrum to which emission should be added.
+        :return: Updated Spectrum object.
+        """
+
+        cdef:
+            double r, radiance, sigma, cos_phi, sin_phi, vr, vphi, shifted_wavelength
+            Vector3D velocity
+
+        r = sqrt(point.x * point.x + point.y * point.y)
+
+        radiance = self._radiance.evaluate(r, point.z)
+        if radiance <= 0.0:
+            return spectrum
+
+        if not self._gaussian:
+            if state is None:
+                return self._lineshape.add_line(radiance, point, direction, spectrum)
+            return self._lineshape.add_line_state(radiance, state, point, direction, spectrum)
+
+        sigma = self._sigma.evaluate(r, point.z)
+        if sigma <= 0.0:
+            return spectrum
+
+        # rotate the tabulated velocity from the xz plane to the point
+        if r > 0:
+            cos_phi = point.x / r
+            sin_phi = point.y / r
+        else:
+            cos_phi = 1.0
+            sin_phi = 0.0
+
+        vr = self._velocity_r.evaluate(r, point.z)
+        vphi = self._velocity_phi.evaluate(r, point.z)
+        velocity = new_vector3d(vr * cos_phi - vphi * sin_phi, vr * sin_phi + vphi * cos_phi, self._velocity_z.evaluate(r, point.z))
+
+        shifted_wavelength = doppler_shift(self._wavelength, direction, velocity)
+        return add_gaussian_line(radiance, shifted_wavelength, sigma, spectrum, self._cutoff_sigma)
+
+
+cdef class EmissivityGridModel(PlasmaModel):
+    """
+    Base class for line emission models that support a LineEmissivityGrid.
+
+    Sub-classes check _grid_inside() before sampling the plasma, call
+    _grid_emission() for points inside the grid and call _invalidate_grid()
+    when the plasma or the atomic data is modified.
+    """
+
+    def set_emissivity_grid(self, object r, object z):
+        """
+        Enables a precomputed (R, Z) grid for the line emission.
+
+        For an axisymmetric plasma the line emission only depends on the major
+        radius and height. With an emissivity grid enabled the line radiance
+        is sampled once on the grid nodes and linearly interpolated
+        thereafter. For the GaussianLine line shape the line width and the
+        emitting species velocity are tabulated too. Points outside the grid
+        fall back to the direct calculation.
+
+        The grid is sampled lazily on first use and is resampled if the plasma
+        or the atomic data is modified.
+
+        :param r: Array of R node coordinates in meters.
+        :param z: Array of Z node coordinates in meters.
+        """
+
+        self._emissivity_grid = LineEmissivityGrid(r, z)
+
+    def clear_emissivity_grid(self):
+        """
+        Disables the emissivity grid, see set_emissivity_grid().
+        """
+
+        self._emissivity_grid = None
+
+    cdef bint _grid_inside(self, Point3D point):
+        """
+        Returns True if an emissivity grid is set and covers the point.
+        """
+
+        return self._emissivity_grid is not None and self._emissivity_grid.inside(point.x, point.y, point.z)
+
+    cdef Spectrum _grid_emission(self, Species target_species, _PECRate rates, LineShapeModel lineshape,
+                                 PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+        """
+        Adds the line emission interpolated from the grid, sampling the grid first if required.
+
+        :param target_species: The species whose density scales the emission.
+        :param rates: The photon emissivity coefficient of the line.
+        :param lineshape: The line shape of the line.
+        :param state: Plasma parameters cached at the point, may be None.
+        :param point: Point in plasma space.
+        :param direction: Direction in plasma space.
+        :param spectrum: Spectrum to which emission should be added.
+        :return: Updated Spectrum object.
+        """
+
+        if not self._emissivity_grid.valid:
+            self._emissivity_grid.build(self._plasma, target_species, rates, lineshape)
+        return self._emissivity_grid.add_emission(state, point, direction, spectrum)
+
+    cdef void _invalidate_grid(self):
+        """
+        Forces the emissivity grid, if set, to be resampled on next use.
+        """
+
+        if self._emissivity_grid is not None:
+            self._emissivity_grid.invalidate()
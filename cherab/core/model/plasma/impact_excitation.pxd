@@ -16,13 +16,15 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from raysect.optical cimport Spectrum, Point3D, Vector3D
 from cherab.core.atomic cimport Line, ImpactExcitationRate
-from cherab.core.plasma cimport PlasmaModel
+from cherab.core.plasma cimport PlasmaState
 from cherab.core.species cimport Species
 from cherab.core.model.lineshape cimport LineShapeModel
+from cherab.core.model.plasma.emissivity_grid cimport EmissivityGridModel
 
 
-cdef class ExcitationLine(PlasmaModel):
+cdef class ExcitationLine(EmissivityGridModel):
 
     cdef:
         Line _line
@@ -31,5 +33,9 @@ cdef class ExcitationLine(PlasmaModel):
         ImpactExcitationRate _rates
         LineShapeModel _lineshape
         object _lineshape_class
+        list _lineshape_args
+        dict _lineshape_kwargs
 
     cdef int _populate_cache(self) except -1
+
+    cdef Spectrum _add_emission(self, double ne, double te, double ni, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum)
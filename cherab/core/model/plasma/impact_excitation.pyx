@@ -22,9 +22,10 @@ from cherab.core.model.lineshape cimport GaussianLine, LineShapeModel
 from cherab.core.utility.constants cimport RECIP_4_PI
 
 
-cdef class ExcitationLine(PlasmaModel):
+cdef class ExcitationLine(EmissivityGridModel):
 
-    def __init__(self, Line line, Plasma plasma=None, AtomicData atomic_data=None, object lineshape=None):
+    def __init__(self, Line line, Plasma plasma=None, AtomicData atomic_data=None, object lineshape=None,
+                 object lineshape_args=None, object lineshape_kwargs=None):
 
         super().__init__(plasma, atomic_data)
 
@@ -34,20 +35,39 @@ cdef class ExcitationLine(PlasmaModel):
         if not issubclass(self._lineshape_class, LineShapeModel):
             raise TypeError("The attribute lineshape must be a subclass of LineShapeModel.")
 
+        # additional arguments passed to the line shape constructor
+        self._lineshape_args = list(lineshape_args or [])
+        self._lineshape_kwargs = dict(lineshape_kwargs or {})
+
         # ensure that cache is initialised
         self._change()
 
     def __repr__(self):
         return '<ExcitationLine: element={}, ionisation={}, transition={}>'.format(self._line.element.name, self._line.ionisation, self._line.transition)
 
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength):
+
+        # cache data on first run
+        if self._target_species is None:
+            self._populate_cache()
+
+        return self._lineshape.in_band(min_wavelength, max_wavelength)
+
     cpdef Spectrum emission(self, Point3D point, Vector3D direction, Spectrum spectrum):
 
-        cdef double ne, ni, te, radiance
+        cdef double ne, ni, te
 
         # cache data on first run
         if self._target_species is None:
             self._populate_cache()
 
+        # skip sampling the plasma if the line is outside the spectral range
+        if not self._lineshape.in_band(spectrum.min_wavelength, spectrum.max_wavelength):
+            return spectrum
+
+        if self._grid_inside(point):
+            return self._grid_emission(self._target_species, self._rates, self._lineshape, None, point, direction, spectrum)
+
         ne = self._plasma.get_electron_distribution().density(point.x, point.y, point.z)
         if ne <= 0.0:
             return spectrum
@@ -60,9 +80,46 @@ cdef class ExcitationLine(PlasmaModel):
         if ni <= 0.0:
             return spectrum
 
+        return self._add_emission(ne, te, ni, None, point, direction, spectrum)
+
+    cdef Spectrum emission_state(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double ne, ni, te
+
+        # cache data on first run
+        if self._target_species is None:
+            self._populate_cache()
+
+        # skip sampling the plasma if the line is outside the spectral range
+        if not self._lineshape.in_band(spectrum.min_wavelength, spectrum.max_wavelength):
+            return spectrum
+
+        if self._grid_inside(point):
+            return self._grid_emission(self._target_species, self._rates, self._lineshape, state, point, direction, spectrum)
+
+        ne = state.electron_density()
+        if ne <= 0.0:
+            return spectrum
+
+        te = state.electron_temperature()
+        if te <= 0.0:
+            return spectrum
+
+        ni = state.ion_density(state.species_index(self._target_species))
+        if ni <= 0.0:
+            return spectrum
+
+        return self._add_emission(ne, te, ni, state, point, direction, spectrum)
+
+    cdef Spectrum _add_emission(self, double ne, double te, double ni, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef double radiance
+
         # add emission line to spectrum
         radiance = RECIP_4_PI * self._rates.evaluate(ne, te) * ne * ni
-        return self._lineshape.add_line(radiance, point, direction, spectrum)
+        if state is None:
+            return self._lineshape.add_line(radiance, point, direction, spectrum)
+        return self._lineshape.add_line_state(radiance, state, point, direction, spectrum)
 
     cdef int _populate_cache(self) except -1:
 
@@ -87,7 +144,8 @@ cdef class ExcitationLine(PlasmaModel):
         self._wavelength = self._atomic_data.wavelength(self._line.element, self._line.ionisation, self._line.transition)
 
         # instance line shape renderer
-        self._lineshape = self._lineshape_class(self._line, self._wavelength, self._target_species, self._plasma)
+        self._lineshape = self._lineshape_class(self._line, self._wavelength, self._target_species, self._plasma,
+                                               *self._lineshape_args, **self._lineshape_kwargs)
 
     def _change(self):
 
@@ -96,3 +154,6 @@ cdef class ExcitationLine(PlasmaModel):
         self._wavelength = 0.0
         self._rates = None
         self._lineshape = None
+
+        # the emissivity grid is resampled on next use
+        self._invalidate_grid()
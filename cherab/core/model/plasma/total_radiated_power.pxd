@@ -16,20 +16,22 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-# TODO: requires reimplementation in future release
+from raysect.optical cimport Spectrum
+from cherab.core.atomic.elements cimport Element
+from cherab.core.atomic.rates cimport RadiatedPower, StageResolvedLineRadiation
+from cherab.core.plasma cimport PlasmaModel
+from cherab.core.species cimport Species
 
-# from cherab.core.atomic.elements cimport Element
-# from cherab.core.atomic.rates cimport StageResolvedLineRadiation
-# from cherab.core.plasma cimport PlasmaModel
-# from cherab.core.species cimport Species
-#
-#
-# cdef class TotalRadiatedPower(PlasmaModel):
-#
-#     cdef:
-#         Element _element
-#         int _ionisation
-#         Species _target_species
-#         StageResolvedLineRadiation _plt_rate, _prb_rate
-#
-#     cdef int _populate_cache(self) except -1
+
+cdef class TotalRadiatedPower(PlasmaModel):
+
+    cdef:
+        Element _element
+        object _ionisation
+        list _species
+        RadiatedPower _total_rate
+        StageResolvedLineRadiation _line_rate
+
+    cdef Spectrum _add_emission(self, double ne, double te, double ni, Spectrum spectrum)
+
+    cdef int _populate_cache(self) except -1
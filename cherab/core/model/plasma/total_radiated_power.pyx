@@ -16,75 +16,166 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
-# TODO: requires reimplementation in future release
+from raysect.optical cimport Spectrum, Point3D, Vector3D
+from cherab.core cimport Plasma, AtomicData
+from cherab.core.atomic cimport Element
+from cherab.core.plasma cimport PlasmaState
+from cherab.core.utility.constants cimport RECIP_4_PI
+cimport cython
 
-# from raysect.optical cimport Spectrum, Point3D, Vector3D
-# from cherab.core cimport Plasma, AtomicData
-# from cherab.core.utility.constants cimport RECIP_4_PI
-#
-#
-# cdef class TotalRadiatedPower(PlasmaModel):
-#
-#     def __init__(self, Element element, int ionisation, Plasma plasma=None, AtomicData atomic_data=None):
-#
-#         super().__init__(plasma, atomic_data)
-#
-#         self._element = element
-#         self._ionisation = ionisation
-#
-#         # ensure that cache is initialised
-#         self._change()
-#
-#     cpdef Spectrum emission(self, Point3D point, Vector3D direction, Spectrum spectrum):
-#
-#         cdef:
-#             int i
-#             double ne, ni, te, plt_radiance, prb_radiance
-#
-#         # cache data on first run
-#         if self._target_species is None:
-#             self._populate_cache()
-#
-#         ne = self._plasma.get_electron_distribution().density(point.x, point.y, point.z)
-#         if ne <= 0.0:
-#             return spectrum
-#
-#         te = self._plasma.get_electron_distribution().effective_temperature(point.x, point.y, point.z)
-#         if te <= 0.0:
-#             return spectrum
-#
-#         ni = self._target_species.distribution.density(point.x, point.y, point.z)
-#         if ni <= 0.0:
-#             return spectrum
-#
-#         # add emission to spectrum
-#         plt_radiance = RECIP_4_PI * self._plt_rate.evaluate(ne, te) * ne * ni / (spectrum.max_wavelength - spectrum.min_wavelength)
-#         prb_radiance = RECIP_4_PI * self._prb_rate.evaluate(ne, te) * ne * ni / (spectrum.max_wavelength - spectrum.min_wavelength)
-#         for i in range(spectrum.bins):
-#             spectrum.samples_mv[i] += plt_radiance + prb_radiance
-#
-#         return spectrum
-#
-#     cdef int _populate_cache(self) except -1:
-#
-#         # sanity checks
-#         if self._plasma is None or self._atomic_data is None:
-#             raise RuntimeError("The emission model is not connected to a plasma object.")
-#
-#         # locate target species
-#         try:
-#             self._target_species = self._plasma.composition.get(self._element, self._ionisation)
-#         except ValueError:
-#             raise RuntimeError("The plasma object does not contain the ion species for the specified line "
-#                                "(element={}, ionisation={}).".format(self._element.symbol, self._ionisation))
-#
-#         # obtain rate function
-#         self._plt_rate = self._atomic_data.stage_resolved_line_radiation_rate(self._element, self._ionisation)
-#         self._prb_rate = self._atomic_data.stage_resolved_continuum_radiation_rate(self._element, self._ionisation)
-#
-#     def _change(self):
-#
-#         # clear cache to force regeneration on first use
-#         self._target_species = None
-#         self._plt_rate = None
-#         self._prb_rate = None
+
+cdef class TotalRadiatedPower(PlasmaModel):
+    """
+    Emitter that calculates the power radiated by a plasma impurity.
+
+    If an ionisation stage is specified, the line radiation of that stage is
+    calculated from the stage resolved line radiation rate and the density of
+    the corresponding plasma species. Otherwise the total radiated power of
+    the element is calculated from the total radiated power rate and the sum
+    of the densities of all the plasma species of the element.
+
+    The radiated power is spread uniformly over the spectral range of the
+    observed spectrum, the total of the spectrum is therefore the radiated
+    power in W/m^3/str.
+
+    :param Element element: The radiating element.
+    :param int ionisation: The ionisation stage, if None the total radiated power
+      of all the ionisation stages is calculated (default=None).
+    :param Plasma plasma: The plasma to which this emission model is attached.
+    :param AtomicData atomic_data: The atomic data provider for this model.
+    """
+
+    def __init__(self, Element element not None, object ionisation=None, Plasma plasma=None, AtomicData atomic_data=None):
+
+        super().__init__(plasma, atomic_data)
+
+        if ionisation is not None and ionisation < 0:
+            raise ValueError("Charge state must be neutral or positive.")
+
+        self._element = element
+        self._ionisation = ionisation
+
+        # ensure that cache is initialised
+        self._change()
+
+    def __repr__(self):
+        if self._ionisation is None:
+            return '<TotalRadiatedPower: element={}>'.format(self._element.name)
+        return '<TotalRadiatedPower: element={}, ionisation={}>'.format(self._element.name, self._ionisation)
+
+    @property
+    def element(self):
+        return self._element
+
+    @property
+    def ionisation(self):
+        return self._ionisation
+
+    cpdef Spectrum emission(self, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef:
+            double ne, te, ni
+            Species species
+
+        # cache data on first run
+        if self._species is None:
+            self._populate_cache()
+
+        ne = self._plasma.get_electron_distribution().density(point.x, point.y, point.z)
+        if ne <= 0.0:
+            return spectrum
+
+        te = self._plasma.get_electron_distribution().effective_temperature(point.x, point.y, point.z)
+        if te <= 0.0:
+            return spectrum
+
+        ni = 0
+        for species in self._species:
+            ni += species.distribution.density(point.x, point.y, point.z)
+        if ni <= 0.0:
+            return spectrum
+
+        return self._add_emission(ne, te, ni, spectrum)
+
+    cdef Spectrum emission_state(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+
+        cdef:
+            int i
+            double ne, te, ni
+
+        # cache data on first run
+        if self._species is None:
+            self._populate_cache()
+
+        ne = state.electron_density()
+        if ne <= 0.0:
+            return spectrum
+
+        te = state.electron_temperature()
+        if te <= 0.0:
+            return spectrum
+
+        ni = 0
+        for i in range(len(self._species)):
+            ni += state.ion_density(state.species_index(self._species[i]))
+        if ni <= 0.0:
+            return spectrum
+
+        return self._add_emission(ne, te, ni, spectrum)
+
+    @cython.cdivision(True)
+    cdef Spectrum _add_emission(self, double ne, double te, double ni, Spectrum spectrum):
+
+        cdef:
+            int i
+            double rate, radiance
+
+        if self._ionisation is None:
+            rate = self._total_rate.evaluate(ne, te)
+        else:
+            rate = self._line_rate.evaluate(ne, te)
+
+        # spectral radiance in W/m^3/str/nm, uniform over the spectral range
+        radiance = RECIP_4_PI * rate * ne * ni / (spectrum.max_wavelength - spectrum.min_wavelength)
+
+        for i in range(spectrum.bins):
+            spectrum.samples_mv[i] += radiance
+
+        return spectrum
+
+    cdef int _populate_cache(self) except -1:
+
+        cdef Species species
+
+        # sanity checks
+        if self._plasma is None or self._atomic_data is None:
+            raise RuntimeError("The emission model is not connected to a plasma object.")
+
+        # locate the radiating species and obtain rate function
+        if self._ionisation is None:
+
+            species_list = [species for species in self._plasma.composition if species.element == self._element]
+            if not species_list:
+                raise RuntimeError("The plasma object does not contain any ion species for the specified element "
+                                   "(element={}).".format(self._element.symbol))
+
+            self._total_rate = self._atomic_data.radiated_power_rate(self._element, 'total')
+
+        else:
+
+            try:
+                species_list = [self._plasma.composition.get(self._element, self._ionisation)]
+            except ValueError:
+                raise RuntimeError("The plasma object does not contain the ion species for the specified element "
+                                   "(element={}, ionisation={}).".format(self._element.symbol, self._ionisation))
+
+            self._line_rate = self._atomic_data.stage_resolved_line_radiation_rate(self._element, self._ionisation)
+
+        self._species = species_list
+
+    def _change(self):
+
+        # clear cache to force regeneration on first use
+        self._species = None
+        self._total_rate = None
+        self._line_rate = None
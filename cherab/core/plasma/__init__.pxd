@@ -18,3 +18,4 @@
 
 from cherab.core.plasma.node cimport Plasma
 from cherab.core.plasma.model cimport PlasmaModel
+from cherab.core.plasma.state cimport PlasmaState
@@ -18,3 +18,4 @@
 
 from .node import Plasma
 from .model import PlasmaModel
+from .state import PlasmaState
@@ -20,6 +20,7 @@ from raysect.optical cimport World, Primitive, Ray, Spectrum, SpectralFunction,
 from raysect.optical.material.emitter cimport InhomogeneousVolumeEmitter
 
 from cherab.core.plasma cimport Plasma
+from cherab.core.plasma.state cimport PlasmaState
 from cherab.core.atomic cimport AtomicData
 
 
@@ -29,5 +30,11 @@ cdef class PlasmaMaterial(InhomogeneousVolumeEmitter):
         Plasma _plasma
         AtomicData _atomic_data
         AffineMatrix3D _local_to_plasma
-        list _models
+        PlasmaState _state
+        list _models, _active_models
+        double _band_min_wavelength, _band_max_wavelength
+
+    cdef object __weakref__
+
+    cdef int _select_models(self, Spectrum spectrum) except -1
 
@@ -32,6 +32,9 @@ cdef class PlasmaMaterial(InhomogeneousVolumeEmitter):
         self._atomic_data = atomic_data
         self._local_to_plasma = local_to_plasma
 
+        # plasma parameters are sampled once per point and shared between the models
+        self._state = PlasmaState(plasma)
+
         # validate
         for model in models:
             if not isinstance(model, PlasmaModel):
@@ -44,21 +47,61 @@ cdef class PlasmaMaterial(InhomogeneousVolumeEmitter):
 
         self._models = models
 
+        # models outside the observed spectral band are skipped, the selection must be
+        # rebuilt if the plasma or a model is modified
+        self._active_models = None
+        self._plasma.notifier.add(self._change)
+        for model in models:
+            model.notifier.add(self._change)
+
     cpdef Spectrum emission_function(self, Point3D point, Vector3D direction, Spectrum spectrum,
                                      World world, Ray ray, Primitive primitive,
                                      AffineMatrix3D to_local, AffineMatrix3D to_world):
 
         cdef PlasmaModel model
 
+        # skip models that can not emit in the spectral range
+        if (self._active_models is None or spectrum.min_wavelength != self._band_min_wavelength
+                or spectrum.max_wavelength != self._band_max_wavelength):
+            self._select_models(spectrum)
+
+        if not self._active_models:
+            return spectrum
+
         # perform coordinate transform to plasma space if required
         if self._local_to_plasma:
             point = point.transform(self._local_to_plasma)
             direction = direction.transform(self._local_to_plasma)
 
+        self._state.set_point(point.x, point.y, point.z)
+
         # call each model and accumulate spectrum
-        for model in self._models:
-            spectrum = model.emission(point, direction, spectrum)
+        for model in self._active_models:
+            spectrum = model.emission_state(self._state, point, direction, spectrum)
 
         return spectrum
 
+    cdef int _select_models(self, Spectrum spectrum) except -1:
+        """
+        Selects the models that may emit in the band of the spectrum.
+
+        The selection is cached until the spectral range changes.
+        """
+
+        cdef PlasmaModel model
+
+        self._active_models = []
+        for model in self._models:
+            if model.in_band(spectrum.min_wavelength, spectrum.max_wavelength):
+                self._active_models.append(model)
+
+        self._band_min_wavelength = spectrum.min_wavelength
+        self._band_max_wavelength = spectrum.max_wavelength
+        return 0
+
+    def _change(self):
+
+        # clear the model selection to force regeneration on next use
+        self._active_models = None
+
 
@@ -19,15 +19,21 @@
 from raysect.optical cimport Spectrum, Point3D, Vector3D
 
 from cherab.core.plasma.node cimport Plasma
+from cherab.core.plasma.state cimport PlasmaState
 from cherab.core.atomic cimport AtomicData
 
 
 cdef class PlasmaModel:
 
     cdef:
+        readonly object notifier
         Plasma _plasma
         AtomicData _atomic_data
 
     cdef object __weakref__
 
     cpdef Spectrum emission(self, Point3D point, Vector3D direction, Spectrum spectrum)
+
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength)
+
+    cdef Spectrum emission_state(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum)
@@ -16,10 +16,16 @@
 # See the Licence for the specific language governing permissions and limitations
 # under the Licence.
 
+from cherab.core.utility import Notifier
+
+
 cdef class PlasmaModel:
 
     def __init__(self, Plasma plasma=None, AtomicData atomic_data=None):
 
+        # must notify the plasma material if the model properties change, affecting the spectral band
+        self.notifier = Notifier()
+
         self._plasma = plasma
         self._atomic_data = atomic_data
 
@@ -44,6 +50,7 @@ cdef class PlasmaModel:
 
         # inform model source data has changed
         self._change()
+        self.notifier.notify()
 
     @property
     def atomic_data(self):
@@ -56,6 +63,7 @@ cdef class PlasmaModel:
 
         # inform model source data has changed
         self._change()
+        self.notifier.notify()
 
     cpdef Spectrum emission(self, Point3D point, Vector3D direction, Spectrum spectrum):
         """
@@ -76,6 +84,46 @@ cdef class PlasmaModel:
 
         raise NotImplementedError('Virtual method must be implemented in a sub-class.')
 
+    cpdef bint in_band(self, double min_wavelength, double max_wavelength):
+        """
+        Tests if the model may emit in the specified wavelength band.
+
+        Models with a limited spectral extent, such as emission lines, should
+        override this method. The PlasmaMaterial skips the models that cannot
+        emit in the band of the observed spectrum. Models must call
+        notifier.notify() if a change of their properties moves the band.
+
+        By default the model is assumed to emit at all wavelengths.
+
+        :param min_wavelength: The lower wavelength of the band in nm.
+        :param max_wavelength: The upper wavelength of the band in nm.
+        :return: False if the model cannot emit in the band, True otherwise.
+        """
+
+        return True
+
+    cdef Spectrum emission_state(self, PlasmaState state, Point3D point, Vector3D direction, Spectrum spectrum):
+        """
+        Calculate the emission for a point in the plasma using cached plasma parameters.
+
+        The PlasmaMaterial calls this method instead of emission(). The
+        supplied PlasmaState has already been moved to the point and holds
+        the plasma parameters shared between all the models attached to the
+        plasma. Cython models should override this method to obtain the
+        plasma parameters from the state rather than sampling the plasma
+        directly.
+
+        By default the state is ignored and emission() is called.
+
+        :param state: Plasma parameters cached at the point.
+        :param point: Point in plasma space.
+        :param direction: Direction in plasma space.
+        :param spectrum: Spectrum to which emission should be added.
+        :return: Updated Spectrum object.
+        """
+
+        return self.emission(point, direction, spectrum)
+
     def _change(self):
         """
         Called if the plasma properties or the atomic data source changes.
@@ -22,7 +22,7 @@ from raysect.optical.material.emitter.inhomogeneous cimport VolumeIntegrator
 from cherab.core.atomic cimport AtomicData, Element
 from cherab.core.distribution cimport DistributionFunction
 from cherab.core.species cimport Species
-from cherab.core.math cimport VectorFunction3D
+from cherab.core.math cimport Function3D, VectorFunction3D
 from cherab.core.plasma.model cimport PlasmaModel
 
 
@@ -67,6 +67,10 @@ cdef class Plasma(Node):
         AffineMatrix3D _geometry_transform
         ModelManager _models
         VolumeIntegrator _integrator
+        tuple _grid_axes
+        bint _grid_axisymmetric, _grid_valid
+        double _grid_min_x, _grid_max_x, _grid_min_y, _grid_max_y, _grid_min_z, _grid_max_z
+        Function3D _grid_ni, _grid_nz, _grid_nz2
 
     cdef object __weakref__
 
@@ -78,7 +82,15 @@ cdef class Plasma(Node):
 
     cpdef double z_effective(self, double x, double y, double z) except -1
 
-    cpdef double ion_density(self, double x, double y, double z)
+    cpdef double ion_density(self, double x, double y, double z) except? -1e999
+
+    cdef double _ion_density(self, double x, double y, double z) except? -1e999
+
+    cdef bint _inside_grid(self, double x, double y, double z)
+
+    cdef int _build_grid(self) except -1
+
+    cdef int _charge_moments(self, double x, double y, double z, double *sum_nz, double *sum_nz2) except -1
 
 
 
@@ -20,11 +20,15 @@
 from cherab.core.utility import Notifier
 
 from cherab.core.species import SpeciesNotFound
+from numpy import array, zeros, float64
 from raysect.optical cimport AffineMatrix3D
 from raysect.optical.material.emitter.inhomogeneous cimport NumericalIntegrator
 
 from cherab.core.math cimport Function3D, autowrap_function3d
 from cherab.core.math cimport VectorFunction3D, autowrap_vectorfunction3d
+from cherab.core.math.mappers cimport AxisymmetricMapper
+from cherab.core.math.interpolators cimport Interpolate2DLinear, Interpolate3DLinear
+from libc.math cimport sqrt
 from cherab.core.distribution cimport DistributionFunction
 from cherab.core.plasma.material cimport PlasmaMaterial
 cimport cython
@@ -169,7 +173,15 @@ cdef class Plasma(Node):
 
         # setup plasma composition handler and pass through notifications
         self._composition = Composition()
-        self._composition.notifier.add(self._modified)
+        self._composition.notifier.add(self._composition_modified)
+
+        # optional precomputed composition grid, see set_composition_grid()
+        self._grid_axes = None
+        self._grid_axisymmetric = False
+        self._grid_valid = False
+        self._grid_ni = None
+        self._grid_nz = None
+        self._grid_nz2 = None
 
         # atomic data source passed to emission models
         self._atomic_data = None
@@ -223,6 +235,61 @@ cdef class Plasma(Node):
     cdef Composition get_composition(self):
         return self._composition
 
+    def set_composition_grid(self, object x, object y, object z=None):
+        """
+        Enables a precomputed grid for z_effective() and ion_density().
+
+        Both methods sum over every species in the composition on each call,
+        which is expensive for plasmas containing many impurity stages. With a
+        composition grid enabled the required species sums are sampled once on
+        the grid nodes and linearly interpolated thereafter. Points outside the
+        grid fall back to the direct calculation.
+
+        If only x and y are supplied the grid is axisymmetric around the
+        z-axis, x and y are then the R and Z node coordinates respectively.
+        If z is also supplied a full 3D grid with nodes at x, y and z is used.
+
+        The grid is sampled lazily on first use and is resampled if the plasma
+        composition is modified.
+
+        :param x: Array of x (or R) node coordinates in meters.
+        :param y: Array of y (or Z) node coordinates in meters.
+        :param z: Optional array of z node coordinates in meters.
+        """
+
+        cdef tuple axes
+
+        if z is None:
+            axes = (array(x, dtype=float64), array(y, dtype=float64))
+        else:
+            axes = (array(x, dtype=float64), array(y, dtype=float64), array(z, dtype=float64))
+
+        for axis in axes:
+            if axis.ndim != 1 or axis.shape[0] < 2:
+                raise ValueError('The composition grid coordinates must be 1D arrays with at least two values.')
+
+        if z is None and axes[0].min() < 0:
+            raise ValueError('The radial coordinates of an axisymmetric composition grid cannot be negative.')
+
+        self._grid_axes = axes
+        self._grid_axisymmetric = z is None
+        self._grid_min_x = axes[0].min()
+        self._grid_max_x = axes[0].max()
+        self._grid_min_y = axes[1].min()
+        self._grid_max_y = axes[1].max()
+        if z is not None:
+            self._grid_min_z = axes[2].min()
+            self._grid_max_z = axes[2].max()
+        self._invalidate_grid()
+
+    def clear_composition_grid(self):
+        """
+        Disables the composition grid, see set_composition_grid().
+        """
+
+        self._grid_axes = None
+        self._invalidate_grid()
+
     @cython.cdivision(True)
     cpdef double z_effective(self, double x, double y, double z) except -1:
         """
@@ -240,26 +307,22 @@ cdef class Plasma(Node):
         :raises ValueError: If plasma does not contain any ionised species.
         """
 
-        cdef:
-            double ion_density, sum_nz, sum_nz2
-            Species species
+        cdef double sum_nz, sum_nz2
 
-        sum_nz = 0
-        sum_nz2 = 0
-        for species in self._composition:
-            if species.ionisation > 0:
-                density = species.distribution.density(x, y, z)
-                sum_nz += density * species.ionisation
-                sum_nz2 += density * species.ionisation * species.ionisation
+        if self._inside_grid(x, y, z):
+            if not self._grid_valid:
+                self._build_grid()
+            sum_nz = self._grid_nz.evaluate(x, y, z)
+            sum_nz2 = self._grid_nz2.evaluate(x, y, z)
+        else:
+            self._charge_moments(x, y, z, &sum_nz, &sum_nz2)
 
         if sum_nz2 == 0:
             raise ValueError('Plasma does not contain any ionised species.')
 
         return sum_nz2 / sum_nz
 
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    cpdef double ion_density(self, double x, double y, double z):
+    cpdef double ion_density(self, double x, double y, double z) except? -1e999:
         """
         Calculates the total ion density of the plasma.
 
@@ -272,6 +335,15 @@ cdef class Plasma(Node):
         :return: Total ion density in m^-3.
         """
 
+        if self._inside_grid(x, y, z):
+            if not self._grid_valid:
+                self._build_grid()
+            return self._grid_ni.evaluate(x, y, z)
+
+        return self._ion_density(x, y, z)
+
+    cdef double _ion_density(self, double x, double y, double z) except? -1e999:
+
         cdef:
             double ion_density = 0.0
             Species species
@@ -280,6 +352,111 @@ cdef class Plasma(Node):
             ion_density += species.distribution.density(x, y, z)
         return ion_density
 
+    cdef int _charge_moments(self, double x, double y, double z, double *sum_nz, double *sum_nz2) except -1:
+
+        cdef:
+            double density
+            Species species
+
+        sum_nz[0] = 0
+        sum_nz2[0] = 0
+        for species in self._composition:
+            if species.ionisation > 0:
+                density = species.distribution.density(x, y, z)
+                sum_nz[0] += density * species.ionisation
+                sum_nz2[0] += density * species.ionisation * species.ionisation
+        return 0
+
+    cdef bint _inside_grid(self, double x, double y, double z):
+
+        cdef double r
+
+        if self._grid_axes is None:
+            return False
+
+        if self._grid_axisymmetric:
+            r = sqrt(x * x + y * y)
+            return self._grid_min_x <= r <= self._grid_max_x and self._grid_min_y <= z <= self._grid_max_y
+
+        return (self._grid_min_x <= x <= self._grid_max_x and
+                self._grid_min_y <= y <= self._grid_max_y and
+                self._grid_min_z <= z <= self._grid_max_z)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _build_grid(self) except -1:
+
+        cdef:
+            int i, j, k
+            double[::1] x, y, z
+            double[:, ::1] ni_2d, nz_2d, nz2_2d
+            double[:, :, ::1] ni_3d, nz_3d, nz2_3d
+            double sum_nz, sum_nz2
+
+        x = self._grid_axes[0]
+        y = self._grid_axes[1]
+
+        if self._grid_axisymmetric:
+
+            ni = zeros((x.shape[0], y.shape[0]))
+            nz = zeros((x.shape[0], y.shape[0]))
+            nz2 = zeros((x.shape[0], y.shape[0]))
+            ni_2d = ni
+            nz_2d = nz
+            nz2_2d = nz2
+
+            # sample in the xz plane, x and y are the R and Z coordinates
+            for i in range(x.shape[0]):
+                for j in range(y.shape[0]):
+                    ni_2d[i, j] = self._ion_density(x[i], 0, y[j])
+                    self._charge_moments(x[i], 0, y[j], &sum_nz, &sum_nz2)
+                    nz_2d[i, j] = sum_nz
+                    nz2_2d[i, j] = sum_nz2
+
+            self._grid_ni = AxisymmetricMapper(Interpolate2DLinear(self._grid_axes[0], self._grid_axes[1], ni))
+            self._grid_nz = AxisymmetricMapper(Interpolate2DLinear(self._grid_axes[0], self._grid_axes[1], nz))
+            self._grid_nz2 = AxisymmetricMapper(Interpolate2DLinear(self._grid_axes[0], self._grid_axes[1], nz2))
+
+        else:
+
+            z = self._grid_axes[2]
+
+            ni = zeros((x.shape[0], y.shape[0], z.shape[0]))
+            nz = zeros((x.shape[0], y.shape[0], z.shape[0]))
+            nz2 = zeros((x.shape[0], y.shape[0], z.shape[0]))
+            ni_3d = ni
+            nz_3d = nz
+            nz2_3d = nz2
+
+            for i in range(x.shape[0]):
+                for j in range(y.shape[0]):
+                    for k in range(z.shape[0]):
+                        ni_3d[i, j, k] = self._ion_density(x[i], y[j], z[k])
+                        self._charge_moments(x[i], y[j], z[k], &sum_nz, &sum_nz2)
+                        nz_3d[i, j, k] = sum_nz
+                        nz2_3d[i, j, k] = sum_nz2
+
+            self._grid_ni = Interpolate3DLinear(self._grid_axes[0], self._grid_axes[1], self._grid_axes[2], ni)
+            self._grid_nz = Interpolate3DLinear(self._grid_axes[0], self._grid_axes[1], self._grid_axes[2], nz)
+            self._grid_nz2 = Interpolate3DLinear(self._grid_axes[0], self._grid_axes[1], self._grid_axes[2], nz2)
+
+        self._grid_valid = True
+        return 0
+
+    def _invalidate_grid(self):
+
+        # grid is resampled on next use
+        self._grid_valid = False
+        self._grid_ni = None
+        self._grid_nz = None
+        self._grid_nz2 = None
+
+    def _composition_modified(self):
+
+        # species densities have changed, composition grid must be resampled
+        self._invalidate_grid()
+        self._modified()
+
     @property
     def geometry(self):
         return self._geometry